@@ -0,0 +1,84 @@
+# atualizacao_precos.py - Benchmark de reajuste produto a produto: arrays contíguos x lista em blocos
+#
+# Cada atualização remove a entrada do preço antigo e inclui a do preço novo na
+# lista da categoria, como faz o índice por categoria ao mudar o preço de um produto.
+#
+# Execução: python -m benchmarks.atualizacao_precos [tamanhos_categoria...]
+import random
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from src.ecommerce import SistemaEcommerce
+from src.indices import ListaPrecos
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+ATUALIZACOES = 20_000
+
+
+class ListaPrecosContigua:
+    """Lista da categoria em dois arrays inteiros, como era antes dos blocos"""
+
+    def __init__(self, precos: array, linhas: array):
+        self.precos = precos
+        self.linhas = linhas
+
+    def _posicao(self, preco: float, linha: int) -> int:
+        inicio = bisect_left(self.precos, preco)
+        fim = bisect_right(self.precos, preco, inicio)
+        return bisect_left(self.linhas, linha, inicio, fim)
+
+    def inserir(self, preco: float, linha: int):
+        posicao = self._posicao(preco, linha)
+        self.precos.insert(posicao, preco)
+        self.linhas.insert(posicao, linha)
+
+    def remover(self, preco: float, linha: int):
+        posicao = self._posicao(preco, linha)
+        del self.precos[posicao]
+        del self.linhas[posicao]
+
+
+def medir(lista, precos, mudancas) -> float:
+    """Microssegundos por atualização de preço"""
+    precos = list(precos)
+    inicio = time.perf_counter()
+    for linha, novo in mudancas:
+        lista.remover(precos[linha], linha)
+        lista.inserir(novo, linha)
+        precos[linha] = novo
+    return (time.perf_counter() - inicio) / len(mudancas) * 1e6
+
+
+def medir_sistema(tamanho: int, mudancas) -> float:
+    """Microssegundos por atribuição a Produto.preco, com o índice por categoria montado"""
+    sistema = SistemaEcommerce()
+    sistema.produtos.inserir_lote((i, f"P{i}", "", float(i % 5000), 1, "Geral") for i in range(tamanho))
+    sistema.buscar_por_categoria("Geral", limite=1)
+    produtos = [sistema.obter_produto(linha) for linha, _ in mudancas]
+    inicio = time.perf_counter()
+    for produto, (_, novo) in zip(produtos, mudancas):
+        produto.preco = novo
+    return (time.perf_counter() - inicio) / len(mudancas) * 1e6
+
+
+def main(tamanhos):
+    aleatorio = random.Random(1)
+    print(f"{ATUALIZACOES} atualizações de preço por tamanho de categoria (µs por atualização)")
+    print(f"{'produtos':>10} | {'contígua':>9} | {'blocos':>7} | {'Produto.preco':>13}")
+    for tamanho in tamanhos:
+        precos = [float(i % 5000) for i in range(tamanho)]
+        entradas = sorted(zip(precos, range(tamanho)))
+        mudancas = [(aleatorio.randrange(tamanho), float(aleatorio.randrange(5000)))
+                    for _ in range(ATUALIZACOES)]
+
+        contigua = ListaPrecosContigua(array("d", [p for p, _ in entradas]), array("q", [l for _, l in entradas]))
+        blocos = ListaPrecos()
+        blocos.substituir(array("d", [p for p, _ in entradas]), array("q", [l for _, l in entradas]))
+        print(f"{tamanho:>10} | {medir(contigua, precos, mudancas):>9.2f} | {medir(blocos, precos, mudancas):>7.2f} | "
+              f"{medir_sistema(tamanho, mudancas):>13.2f}")
+
+
+if __name__ == "__main__":
+    main([int(t) for t in sys.argv[1:]] or TAMANHOS_PADRAO)
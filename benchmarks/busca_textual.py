@@ -0,0 +1,72 @@
+# busca_textual.py - Benchmark de latência da busca textual (p50/p99 por consulta)
+#
+# Meta: p99 abaixo de 1 ms com 1M de produtos em um núcleo.
+#
+# Execução: python -m benchmarks.busca_textual [quantidade_produtos]
+import random
+import sys
+import time
+
+from src.busca import IndiceTextual
+from src.catalogo import CatalogoColunar
+
+MARCAS = ["Dell", "Samsung", "Logitech", "Acer", "Positivo", "Multilaser", "Intelbras", "Philco"]
+TIPOS = ["Notebook", "Mouse", "Teclado", "Monitor", "Câmera", "Fone", "Cadeira", "Impressora"]
+ADJETIVOS = ["sem fio", "gamer", "ergonômico", "portátil", "compacto", "profissional", "óptico"]
+
+
+def montar_catalogo(quantidade: int) -> CatalogoColunar:
+    aleatorio = random.Random(42)
+    catalogo = CatalogoColunar()
+    for i in range(quantidade):
+        tipo, marca = aleatorio.choice(TIPOS), aleatorio.choice(MARCAS)
+        catalogo.inserir(i, f"{tipo} {marca} {i}", f"{tipo} {aleatorio.choice(ADJETIVOS)} da {marca}",
+                         10.0, 1, tipo)
+    return catalogo
+
+
+def consultas(quantidade_produtos: int, quantidade: int):
+    aleatorio = random.Random(7)
+    geradores = [
+        lambda: f"{aleatorio.choice(TIPOS)} {aleatorio.randrange(quantidade_produtos)}",
+        lambda: f"{aleatorio.choice(TIPOS)} {aleatorio.choice(MARCAS)}",
+        lambda: f"{aleatorio.choice(TIPOS)} {aleatorio.choice(MARCAS)[:3]}",
+        lambda: aleatorio.choice(ADJETIVOS)[:4],
+        lambda: "ergonomico gamer",
+    ]
+    return [aleatorio.choice(geradores)() for _ in range(quantidade)]
+
+
+def percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def main(quantidade_produtos: int):
+    inicio = time.perf_counter()
+    catalogo = montar_catalogo(quantidade_produtos)
+    indice = IndiceTextual(catalogo)
+    print(f"catálogo + índice com {quantidade_produtos} produtos: {time.perf_counter() - inicio:.1f}s")
+
+    # Tempo de relógio inclui preempções do sistema operacional; o tempo de CPU
+    # da thread mede só o custo da consulta
+    relogio, cpu = [], []
+    for consulta in consultas(quantidade_produtos, 10_000):
+        inicio, inicio_cpu = time.perf_counter(), time.thread_time()
+        indice.buscar(consulta, limite=20)
+        cpu.append((time.thread_time() - inicio_cpu) * 1000)
+        relogio.append((time.perf_counter() - inicio) * 1000)
+    for nome, latencias in (("relógio", relogio), ("cpu", cpu)):
+        print(f"buscar ({nome}): p50 {percentil(latencias, 0.50):.3f} ms | "
+              f"p99 {percentil(latencias, 0.99):.3f} ms | máx {max(latencias):.3f} ms")
+
+    latencias = []
+    for consulta in consultas(quantidade_produtos, 10_000):
+        inicio = time.perf_counter()
+        indice.completar(consulta.split()[-1][:2])
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    print(f"completar (relógio): p50 {percentil(latencias, 0.50):.3f} ms | p99 {percentil(latencias, 0.99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
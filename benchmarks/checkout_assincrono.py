@@ -0,0 +1,66 @@
+# checkout_assincrono.py - Benchmark de checkout com gateway lento: bloqueante x asyncio
+#
+# Simula um gateway com latência fixa. O checkout bloqueante espera cada
+# resposta na thread; o assíncrono mantém até `max_simultaneos` chamadas em
+# andamento numa única thread.
+#
+# Execução: python -m benchmarks.checkout_assincrono [checkouts] [latencia_ms]
+import asyncio
+import sys
+import time
+
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce
+from src.gateway import ClientePagamentos, GatewayLocal
+
+
+def preparar(checkouts: int):
+    sistema = SistemaEcommerce()
+    sistema.adicionar_produto(Produto(1, "Produto", "", 10.0, checkouts, "Geral"))
+    carrinhos = []
+    for _ in range(checkouts):
+        carrinho = Carrinho()
+        carrinho.adicionar_item(sistema.obter_produto(1), 1)
+        carrinhos.append(carrinho)
+    return sistema, carrinhos
+
+
+def bloqueante(checkouts: int, latencia: float) -> float:
+    sistema, carrinhos = preparar(checkouts)
+    processar = sistema.sistema_pagamento.processar_pagamento
+
+    def gateway_bloqueante(*argumentos):
+        time.sleep(latencia)
+        return processar(*argumentos)
+
+    sistema.sistema_pagamento.processar_pagamento = gateway_bloqueante
+    inicio = time.perf_counter()
+    for carrinho in carrinhos:
+        sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A")
+    return time.perf_counter() - inicio
+
+
+def assincrono(checkouts: int, latencia: float, max_simultaneos: int) -> float:
+    sistema, carrinhos = preparar(checkouts)
+    sistema.gateway = ClientePagamentos(GatewayLocal(latencia=latencia), max_simultaneos=max_simultaneos)
+
+    async def todos():
+        await asyncio.gather(*(sistema.criar_pedido_async(carrinho, MetodoPagamento.PIX, "Rua A")
+                               for carrinho in carrinhos))
+
+    inicio = time.perf_counter()
+    asyncio.run(todos())
+    return time.perf_counter() - inicio
+
+
+def main(checkouts: int, latencia: float):
+    print(f"{checkouts} checkouts, gateway com {latencia * 1e3:.0f} ms de latência")
+    tempo = bloqueante(checkouts, latencia)
+    print(f"  bloqueante (1 thread):      {tempo:6.2f} s  {checkouts / tempo:8.0f} checkouts/s")
+    for max_simultaneos in (10, 100, 1000):
+        tempo = assincrono(checkouts, latencia, max_simultaneos)
+        print(f"  asyncio, até {max_simultaneos:>4} em voo:   {tempo:6.2f} s  {checkouts / tempo:8.0f} checkouts/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         float(sys.argv[2]) / 1e3 if len(sys.argv) > 2 else 0.02)
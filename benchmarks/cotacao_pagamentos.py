@@ -0,0 +1,52 @@
+# cotacao_pagamentos.py - Benchmark de precificação: chamadas por valor x cotação vetorizada
+#
+# Cada valor é cotado em 13 opções (PIX, cartão à vista e 2x a 12x); uma
+# cotação é um valor em uma opção. O laço com uma chamada por opção é medido
+# numa amostra e extrapolado, porque levaria minutos no volume completo.
+#
+# Execução: python -m benchmarks.cotacao_pagamentos [cotacoes]
+import random
+import sys
+import time
+
+from src.ecommerce import SistemaPagamento
+
+OPCOES = 13
+BLOCO = 250_000  # valores por chamada de cotar_valores
+AMOSTRA = 100_000  # valores medidos no laço por chamada
+
+
+def por_chamada(pagamento: SistemaPagamento, valores):
+    for valor in valores:
+        pagamento.calcular_valor_pix(valor)
+        pagamento.calcular_valor_cartao_vista(valor)
+        for parcelas in range(2, 13):
+            pagamento.calcular_valor_cartao_parcelado(valor, parcelas)
+
+
+def main(cotacoes: int):
+    pagamento = SistemaPagamento()
+    num_valores = -(-cotacoes // OPCOES)
+    gerador = random.Random(42)
+    bloco = [round(gerador.uniform(1, 10_000), 2) for _ in range(min(BLOCO, num_valores))]
+
+    amostra = bloco[:AMOSTRA]
+    inicio = time.perf_counter()
+    por_chamada(pagamento, amostra)
+    antes = (time.perf_counter() - inicio) * num_valores / len(amostra)
+
+    inicio = time.perf_counter()
+    restantes = num_valores
+    while restantes > 0:
+        pagamento.cotar_valores(bloco[:restantes])
+        restantes -= len(bloco)
+    depois = time.perf_counter() - inicio
+
+    print(f"{num_valores * OPCOES:,} cotações ({num_valores:,} valores x {OPCOES} opções)")
+    print(f"  uma chamada por opção (extrapolado): {antes:7.2f} s  ({num_valores * OPCOES / antes / 1e6:5.1f} M/s)")
+    print(f"  cotar_valores em blocos:             {depois:7.2f} s  ({num_valores * OPCOES / depois / 1e6:5.1f} M/s)"
+          f"  {antes / depois:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,65 @@
+# despacho_pagamentos.py - Benchmark de processar_pagamento: cadeia if/elif x registro de formas de pagamento
+#
+# A cadeia compara o método com cada membro de MetodoPagamento em ordem; o
+# registro encontra a FormaPagamento num dict e ela calcula com constantes
+# pré-calculadas. Mede cada método separado e uma mistura, com o melhor de
+# várias repetições.
+#
+# Execução: python -m benchmarks.despacho_pagamentos [pagamentos]
+import random
+import sys
+import time
+
+from src.ecommerce import MetodoPagamento, SistemaPagamento
+
+REPETICOES = 7
+
+
+class SistemaCadeia(SistemaPagamento):
+    """processar_pagamento como era antes do registro"""
+
+    def processar_pagamento(self, valor: float, metodo: MetodoPagamento, parcelas: int = 1):
+        if metodo == MetodoPagamento.CARTAO_VISTA:
+            valor_final = self.calcular_valor_cartao_vista(valor)
+            return {"valor_final": valor_final, "aprovado": True}
+        elif metodo == MetodoPagamento.CARTAO_PARCELADO:
+            resultado = self.calcular_valor_cartao_parcelado(valor, parcelas)
+            resultado["aprovado"] = True
+            return resultado
+        elif metodo == MetodoPagamento.PIX:
+            valor_final = self.calcular_valor_pix(valor)
+            return {"valor_final": valor_final, "aprovado": True}
+
+
+def medir(processadores, pagamentos):
+    """Melhor tempo de cada processador, alternando-os a cada repetição para dividir o ruído"""
+    melhores = [float("inf")] * len(processadores)
+    for _ in range(REPETICOES):
+        for posicao, processar in enumerate(processadores):
+            inicio = time.perf_counter()
+            for valor, metodo, parcelas in pagamentos:
+                processar(valor, metodo, parcelas)
+            melhores[posicao] = min(melhores[posicao], time.perf_counter() - inicio)
+    return melhores
+
+
+def main(quantidade: int):
+    sistema, cadeia = SistemaPagamento(), SistemaCadeia()
+    gerador = random.Random(42)
+    valores = [round(gerador.uniform(1, 5_000), 2) for _ in range(quantidade)]
+    cenarios = {
+        "cartão à vista": [(valor, MetodoPagamento.CARTAO_VISTA, 1) for valor in valores],
+        "parcelado": [(valor, MetodoPagamento.CARTAO_PARCELADO, gerador.randint(2, 12)) for valor in valores],
+        "PIX": [(valor, MetodoPagamento.PIX, 1) for valor in valores],
+    }
+    cenarios["mistura"] = [gerador.choice(linhas) for linhas in zip(*cenarios.values())]
+
+    print(f"{quantidade:,} pagamentos por cenário (melhor de {REPETICOES})")
+    for nome, pagamentos in cenarios.items():
+        antes, depois = medir([cadeia.processar_pagamento, sistema.processar_pagamento], pagamentos)
+        print(f"  {nome:<15} cadeia {antes * 1e9 / quantidade:5.0f} ns  registro {depois * 1e9 / quantidade:5.0f} ns"
+              f"  {antes / depois:4.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,99 @@
+# dinheiro.py - Benchmark de valores monetários: float x Decimal x centavos inteiros
+#
+# Mede a soma de preços, o valor PIX e o parcelamento em 3x de cada valor.
+# float passa por SistemaPagamento, um valor por chamada. Decimal e
+# "centavos" (ints) usam funções soltas com as mesmas regras de
+# arredondamento, um valor por chamada, para comparar os dois tipos em pé de
+# igualdade. A coluna "lote" é SistemaPagamento.calcular_centavos_*, o
+# caminho usado para lotes de centavos. Também conta quantas somas parciais
+# em float já não batem com o total exato.
+#
+# Execução: python -m benchmarks.dinheiro [valores]
+import random
+import sys
+import time
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+
+from src.ecommerce import SistemaPagamento
+
+CENTAVO = Decimal("0.01")
+DESCONTO_PIX = Decimal("0.10")
+JUROS = Decimal("0.05")
+
+
+def valor_pix_decimal(valor: Decimal) -> Decimal:
+    return valor - (valor * DESCONTO_PIX).quantize(CENTAVO, ROUND_DOWN)
+
+
+def valor_parcelado_decimal(valor: Decimal, parcelas: int) -> dict:
+    valor_com_juros = (valor * (1 + JUROS * (parcelas - 1))).quantize(CENTAVO, ROUND_HALF_UP)
+    return {"valor_total": valor_com_juros, "valor_parcela": valor_com_juros / parcelas, "parcelas": parcelas}
+
+
+def valor_pix_centavos(centavos: int) -> int:
+    return centavos - centavos // 10
+
+
+def valor_parcelado_centavos(centavos: int, parcelas: int) -> dict:
+    # total * (20 + parcelas - 1) / 20, com meio centavo arredondado para cima
+    valor_com_juros = (centavos * (19 + parcelas) + 10) // 20
+    return {"valor_total": valor_com_juros, "valor_parcela": -(-valor_com_juros // parcelas), "parcelas": parcelas}
+
+
+def medir(funcao, repeticoes: int = 5) -> float:
+    """Menor tempo entre as repetições, para descontar a variação da máquina"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main(quantidade: int):
+    gerador = random.Random(42)
+    centavos = [gerador.randint(100, 1_000_000) for _ in range(quantidade)]
+    valores = {
+        "float": [c / 100 for c in centavos],
+        "Decimal": [Decimal(c).scaleb(-2) for c in centavos],
+    }
+    pagamento = SistemaPagamento()
+    operacoes = {
+        "soma": {
+            "float": lambda: sum(valores["float"]),
+            "Decimal": lambda: sum(valores["Decimal"], Decimal(0)),
+            "centavos": lambda: sum(centavos),
+        },
+        "PIX": {
+            "float": lambda: [pagamento.calcular_valor_pix(v) for v in valores["float"]],
+            "Decimal": lambda: [valor_pix_decimal(v) for v in valores["Decimal"]],
+            "centavos": lambda: [valor_pix_centavos(c) for c in centavos],
+            "lote": lambda: pagamento.calcular_centavos_pix(centavos),
+        },
+        "parcelado 3x": {
+            "float": lambda: [pagamento.calcular_valor_cartao_parcelado(v, 3) for v in valores["float"]],
+            "Decimal": lambda: [valor_parcelado_decimal(v, 3) for v in valores["Decimal"]],
+            "centavos": lambda: [valor_parcelado_centavos(c, 3) for c in centavos],
+            "lote": lambda: pagamento.calcular_centavos_cartao_parcelado(centavos, 3),
+        },
+    }
+
+    print(f"{quantidade:,} valores")
+    for operacao, funcoes in operacoes.items():
+        tempos = {nome: medir(funcao) for nome, funcao in funcoes.items()}
+        linha = "  ".join(f"{nome} {tempo * 1e3:6.1f} ms" for nome, tempo in tempos.items())
+        razoes = ", ".join(f"{nome}/Decimal: {tempos[nome] / tempos['Decimal']:.2f}x"
+                           for nome in ("centavos", "lote") if nome in tempos)
+        print(f"  {operacao:<13} {linha}  ({razoes})")
+
+    divergentes = 0
+    acumulado_float, acumulado_exato = 0.0, 0
+    for valor in centavos:
+        acumulado_float += valor / 100
+        acumulado_exato += valor
+        divergentes += acumulado_float != acumulado_exato / 100
+    print(f"  somas parciais em float diferentes do total exato: {divergentes:,} de {quantidade:,}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
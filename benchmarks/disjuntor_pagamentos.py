@@ -0,0 +1,103 @@
+# disjuntor_pagamentos.py - Benchmark de checkout com provedor degradado: sem x com disjuntor
+#
+# Várias threads fazem checkouts enquanto o provedor de pagamento passa por
+# três fases: saudável, degradado (lento e falhando) e recuperado. Sem
+# disjuntor, cada checkout da fase degradada espera o provedor; com ele, o
+# circuito abre, os checkouts falham na hora e sondas detectam a recuperação.
+#
+# Execução: python -m benchmarks.disjuntor_pagamentos [threads] [segundos_degradado] [latencia_ms]
+import random
+import sys
+import threading
+import time
+
+from src.disjuntor import CircuitoAbertoError, Disjuntor, Retentativas
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce
+
+
+class ProvedorDegradavel:
+    def __init__(self, processar, latencia_degradado: float):
+        self.processar = processar
+        self.latencia_degradado = latencia_degradado
+        self.degradado = False
+        self.chamadas = 0
+        self._aleatorio = random.Random(1)
+
+    def __call__(self, *argumentos):
+        self.chamadas += 1
+        if self.degradado:
+            time.sleep(self.latencia_degradado)
+            if self._aleatorio.random() < 0.5:
+                raise ConnectionError("Provedor de pagamento instável")
+        else:
+            time.sleep(0.001)
+        return self.processar(*argumentos)
+
+
+def executar(threads: int, degradado: float, latencia: float, com_disjuntor: bool):
+    if com_disjuntor:
+        sistema = SistemaEcommerce(
+            disjuntor=Disjuntor(limite_latencia=latencia / 4, janela=1.0, minimo_chamadas=10, tempo_aberto=0.2),
+            retentativas=Retentativas(espera_base=0.01, espera_maxima=0.05))
+    else:
+        sistema = SistemaEcommerce()
+    sistema.adicionar_produto(Produto(1, "Produto", "", 10.0, 10 ** 9, "Geral"))
+    produto = sistema.obter_produto(1)
+    provedor = ProvedorDegradavel(sistema.sistema_pagamento.processar_pagamento, latencia)
+    sistema.sistema_pagamento.processar_pagamento = provedor
+
+    contagem = {"pedidos": 0, "recusados": 0, "erros": 0}
+    tempos_degradado = []
+    trava = threading.Lock()
+    parar = threading.Event()
+
+    def cliente():
+        while not parar.is_set():
+            carrinho = Carrinho()
+            carrinho.adicionar_item(produto, 1)
+            na_degradacao = provedor.degradado
+            inicio = time.perf_counter()
+            try:
+                sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A")
+                resultado = "pedidos"
+            except CircuitoAbertoError:
+                resultado = "recusados"
+            except ConnectionError:
+                resultado = "erros"
+            tempo = time.perf_counter() - inicio
+            with trava:
+                contagem[resultado] += 1
+                if na_degradacao:
+                    tempos_degradado.append(tempo)
+            time.sleep(0.01)  # intervalo entre checkouts do mesmo cliente
+
+    trabalhadores = [threading.Thread(target=cliente) for _ in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    time.sleep(0.5)
+    provedor.degradado = True
+    time.sleep(degradado)
+    provedor.degradado = False
+    time.sleep(1.0)
+    parar.set()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+
+    tempos_degradado.sort()
+    mediana = tempos_degradado[len(tempos_degradado) // 2] if tempos_degradado else 0.0
+    return contagem, provedor.chamadas, mediana, len(tempos_degradado)
+
+
+def main(threads: int, degradado: float, latencia: float):
+    print(f"{threads} threads, provedor degradado por {degradado:.1f} s com {latencia * 1e3:.0f} ms e 50% de erros")
+    for nome, com_disjuntor in (("sem disjuntor", False), ("com disjuntor", True)):
+        contagem, chamadas, mediana, checkouts = executar(threads, degradado, latencia, com_disjuntor)
+        print(f"  {nome}: {contagem['pedidos']:6} pedidos  {contagem['erros']:5} erros  "
+              f"{contagem['recusados']:7} recusas rápidas  {chamadas:6} chamadas ao provedor  "
+              f"degradado: {checkouts:6} checkouts, mediana {mediana * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 2.0,
+         float(sys.argv[3]) / 1e3 if len(sys.argv) > 3 else 0.2)
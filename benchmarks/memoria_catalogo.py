@@ -0,0 +1,70 @@
+# memoria_catalogo.py - Benchmark de memória: dict de objetos x catálogo colunar
+#
+# Execução: python -m benchmarks.memoria_catalogo [quantidades...]
+import sys
+import tracemalloc
+
+from src.catalogo import CatalogoColunar
+from src.ecommerce import Produto
+
+QUANTIDADES_PADRAO = [10_000, 100_000, 1_000_000]
+
+
+class ProdutoLegado:
+    """Produto com __dict__, como era guardado antes do catálogo colunar"""
+
+    def __init__(self, id, nome, descricao, preco, quantidade_estoque, categoria):
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.preco = preco
+        self.quantidade_estoque = quantidade_estoque
+        self.categoria = categoria
+
+
+def dados_produto(i: int):
+    """Gera os campos de um produto sintético"""
+    return (i, f"Produto {i}", f"Descrição do produto {i}", 10.0 + i * 0.01, 100 + i % 50,
+            f"Categoria {i % 50}")
+
+
+def construir_legado(quantidade: int):
+    produtos = {}
+    for i in range(quantidade):
+        produto = ProdutoLegado(*dados_produto(i))
+        produtos[produto.id] = produto
+    return produtos
+
+
+def construir_colunar(quantidade: int):
+    catalogo = CatalogoColunar(Produto)
+    for i in range(quantidade):
+        catalogo.inserir(*dados_produto(i))
+    return catalogo
+
+
+def medir(construir, quantidade: int) -> int:
+    """Retorna os bytes alocados (e mantidos) pela estrutura construída
+
+    Tudo que construir importa já está carregado, para que só a estrutura entre na medição.
+    """
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    estrutura = construir(quantidade)
+    usado = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del estrutura
+    return usado
+
+
+def main(quantidades):
+    print(f"{'produtos':>10} | {'dict (MB)':>10} | {'colunar (MB)':>12} | {'B/produto':>17} | {'economia':>8}")
+    for quantidade in quantidades:
+        legado = medir(construir_legado, quantidade)
+        colunar = medir(construir_colunar, quantidade)
+        print(f"{quantidade:>10} | {legado / 2**20:>10.1f} | {colunar / 2**20:>12.1f} | "
+              f"{legado // quantidade:>7} -> {colunar // quantidade:>6} | {1 - colunar / legado:>8.0%}")
+
+
+if __name__ == "__main__":
+    main([int(q) for q in sys.argv[1:]] or QUANTIDADES_PADRAO)
@@ -0,0 +1,69 @@
+# objetos_compactos.py - Benchmark de bytes por objeto e vazão de criação (__slots__ x __dict__)
+#
+# Execução: python -m benchmarks.objetos_compactos [quantidade]
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.ecommerce import Produto, ItemCarrinho, Pedido, MetodoPagamento, StatusPedido
+
+
+class ProdutoLegado:
+    def __init__(self, id, nome, descricao, preco, quantidade_estoque, categoria):
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.preco = preco
+        self.quantidade_estoque = quantidade_estoque
+        self.categoria = categoria
+
+
+class PedidoLegado:
+    def __init__(self, id_pedido, itens, metodo_pagamento, valor_total, endereco_entrega):
+        self.id_pedido = id_pedido
+        self.itens = itens
+        self.metodo_pagamento = metodo_pagamento
+        self.valor_total = valor_total
+        self.endereco_entrega = endereco_entrega
+        self.status = StatusPedido.PENDENTE
+        self.data_criacao = datetime.now()
+        self.data_pagamento = None
+        self.data_envio = None
+
+
+CASOS = [
+    ("Produto (__dict__)", lambda i: ProdutoLegado(i, "Produto", "Descrição", 50.0, 100, "Categoria")),
+    ("Produto (__slots__)", lambda i: Produto(i, "Produto", "Descrição", 50.0, 100, "Categoria")),
+    ("item (dict)", lambda i: {"produto": None, "quantidade": i}),
+    ("ItemCarrinho", lambda i: ItemCarrinho(None, i)),
+    ("Pedido (__dict__)", lambda i: PedidoLegado("id", None, MetodoPagamento.PIX, 100.0, "Endereço")),
+    ("Pedido (__slots__)", lambda i: Pedido("id", None, MetodoPagamento.PIX, 100.0, "Endereço")),
+]
+
+
+def medir(criar, quantidade: int):
+    """Retorna (bytes por objeto, objetos criados por segundo)"""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    objetos = [criar(i) for i in range(quantidade)]
+    bytes_por_objeto = (tracemalloc.get_traced_memory()[0] - base) / quantidade
+    tracemalloc.stop()
+    del objetos
+
+    inicio = time.perf_counter()
+    objetos = [criar(i) for i in range(quantidade)]
+    vazao = quantidade / (time.perf_counter() - inicio)
+    return bytes_por_objeto, vazao
+
+
+def main(quantidade: int):
+    # Os bytes incluem a referência na lista e o int de cada objeto, iguais para todos os casos
+    print(f"{'tipo':<20} | {'B/objeto':>8} | {'objetos/s':>12}")
+    for nome, criar in CASOS:
+        bytes_por_objeto, vazao = medir(criar, quantidade)
+        print(f"{nome:<20} | {bytes_por_objeto:>8.0f} | {vazao:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,51 @@
+# pagamentos_lote.py - Benchmark de liquidação: processar_pagamento em laço x lote colunar
+#
+# Mede tempo e pico de memória (tracemalloc) para reprocessar pagamentos
+# guardando todos os resultados, como faz um job de liquidação.
+#
+# Execução: python -m benchmarks.pagamentos_lote [pagamentos ...]
+import random
+import sys
+import time
+import tracemalloc
+
+from src.ecommerce import MetodoPagamento, SistemaPagamento
+
+
+def gerar(quantidade: int):
+    gerador = random.Random(42)
+    metodos = list(MetodoPagamento)
+    valores = [round(gerador.uniform(1, 10_000), 2) for _ in range(quantidade)]
+    escolhidos = [gerador.choice(metodos) for _ in range(quantidade)]
+    parcelas = [gerador.randint(2, 12) for _ in range(quantidade)]
+    return valores, escolhidos, parcelas
+
+
+def em_laco(pagamento: SistemaPagamento, valores, metodos, parcelas):
+    return [pagamento.processar_pagamento(valor, metodo, num_parcelas)
+            for valor, metodo, num_parcelas in zip(valores, metodos, parcelas)]
+
+
+def medir(funcao, *argumentos):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*argumentos)
+    tempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del resultado
+    return tempo, pico / 1e6
+
+
+def main(tamanhos):
+    pagamento = SistemaPagamento()
+    for quantidade in tamanhos:
+        colunas = gerar(quantidade)
+        antes, memoria_antes = medir(em_laco, pagamento, *colunas)
+        depois, memoria_depois = medir(pagamento.processar_pagamentos, *colunas)
+        print(f"{quantidade:>9,} pagamentos: laço {antes * 1e3:7.1f} ms / {memoria_antes:6.1f} MB"
+              f" | lote {depois * 1e3:7.1f} ms / {memoria_depois:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main([int(valor) for valor in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,91 @@
+# promocoes_carrinho.py - Benchmark de precificação com milhares de promoções: avaliação ingênua x compilada
+#
+# A avaliação ingênua percorre todas as regras para cada linha do carrinho;
+# o MotorPromocoes consulta só a tabela compilada da categoria da linha. Os
+# dois chegam ao mesmo total.
+#
+# Execução: python -m benchmarks.promocoes_carrinho [regras] [linhas]
+import random
+import sys
+import time
+
+from src.dinheiro import para_centavos
+from src.ecommerce import Carrinho, Produto
+from src.promocoes import DescontoCategoria, LeveXPagueY, MotorPromocoes, PrecoPorQuantidade
+
+CATEGORIAS = 500
+
+
+def gerar_regras(quantidade: int, gerador: random.Random):
+    regras = []
+    for _ in range(quantidade):
+        categoria = None if gerador.random() < 0.01 else f"cat{gerador.randrange(CATEGORIAS)}"
+        tipo = gerador.random()
+        if tipo < 0.4:
+            regras.append(DescontoCategoria(gerador.choice([0.05, 0.10, 0.15, 0.20]), categoria))
+        elif tipo < 0.7:
+            regras.append(PrecoPorQuantidade({gerador.randint(2, 5): 0.05, gerador.randint(6, 20): 0.25}, categoria))
+        else:
+            leve = gerador.randint(2, 6)
+            regras.append(LeveXPagueY(leve, gerador.randint(1, leve - 1), categoria))
+    return regras
+
+
+def precificar_ingenuo(regras, carrinho: Carrinho) -> int:
+    """Total em centavos avaliando cada regra em cada linha, com a mesma política do motor"""
+    total = 0
+    for item in carrinho.itens.values():
+        preco = para_centavos(item.produto.preco)
+        quantidade = item.quantidade
+        valor = preco * quantidade
+        melhor = 0
+        for regra in regras:
+            if regra.categoria is not None and regra.categoria != item.produto.categoria:
+                continue
+            if isinstance(regra, DescontoCategoria):
+                percentual = regra.percentual
+            elif isinstance(regra, PrecoPorQuantidade):
+                percentual = max((p for q, p in regra.faixas.items() if quantidade >= q), default=0)
+            else:
+                melhor = max(melhor, preco * (quantidade // regra.leve) * (regra.leve - regra.pague))
+                continue
+            melhor = max(melhor, int(valor * percentual))
+        total += valor - melhor
+    return total
+
+
+def main(num_regras: int, linhas: int):
+    gerador = random.Random(42)
+    regras = gerar_regras(num_regras, gerador)
+    carrinhos = []
+    for _ in range(50):
+        carrinho = Carrinho()
+        for produto_id in gerador.sample(range(100_000), linhas):
+            produto = Produto(produto_id, "", "", round(gerador.uniform(1, 500), 2), 1000,
+                              f"cat{gerador.randrange(CATEGORIAS)}")
+            carrinho.adicionar_item(produto, gerador.randint(1, 12))
+        carrinhos.append(carrinho)
+
+    inicio = time.perf_counter()
+    motor = MotorPromocoes(regras)
+    motor.compilar()
+    compilacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    ingenuos = [precificar_ingenuo(regras, carrinho) for carrinho in carrinhos]
+    ingenuo = (time.perf_counter() - inicio) / len(carrinhos)
+
+    inicio = time.perf_counter()
+    compilados = [motor.precificar(carrinho).total.centavos for carrinho in carrinhos]
+    compilado = (time.perf_counter() - inicio) / len(carrinhos)
+
+    assert ingenuos == compilados
+    print(f"{num_regras:,} regras em {CATEGORIAS} categorias, carrinhos de {linhas} linhas")
+    print(f"  compilação (uma vez):    {compilacao * 1e3:9.2f} ms")
+    print(f"  ingênuo, por carrinho:   {ingenuo * 1e3:9.2f} ms")
+    print(f"  compilado, por carrinho: {compilado * 1e3:9.3f} ms  {ingenuo / compilado:,.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,47 @@
+# reajuste_precos.py - Benchmark de reajuste em massa: laço por Produto x reajustar_precos
+#
+# Execução: python -m benchmarks.reajuste_precos [quantidade_produtos]
+import sys
+import time
+
+from src.ecommerce import SistemaEcommerce
+
+CATEGORIAS = ["Eletrônicos", "Informática", "Casa", "Esporte", "Livros"]
+
+
+def montar(quantidade: int) -> SistemaEcommerce:
+    sistema = SistemaEcommerce()
+    sistema.produtos.inserir_lote(
+        (i, f"Produto {i}", "", float(i % 5000) + 0.99, 100, CATEGORIAS[i % len(CATEGORIAS)])
+        for i in range(quantidade))
+    # Índice por preço montado, como em um sistema que já atende buscas
+    sistema.buscar_por_categoria("Casa", limite=1)
+    return sistema
+
+
+def medir(descricao: str, funcao):
+    inicio = time.perf_counter()
+    funcao()
+    print(f"{descricao}: {time.perf_counter() - inicio:.2f}s")
+
+
+def main(quantidade: int):
+    sistema = montar(quantidade)
+    print(f"{quantidade} produtos")
+
+    # O laço atualiza o índice produto a produto; mede-se uma amostra e extrapola
+    amostra = min(quantidade, 20_000)
+    inicio = time.perf_counter()
+    for produto_id in range(amostra):
+        produto = sistema.obter_produto(produto_id)
+        produto.preco = round(produto.preco * 1.05, 2)
+    estimado = (time.perf_counter() - inicio) * quantidade / amostra
+    print(f"laço por Produto, +5% em tudo: ~{estimado:.1f}s (estimado por {amostra} produtos)")
+    medir("reajustar_precos, +5% em tudo", lambda: sistema.reajustar_precos(1.05))
+    medir("reajustar_precos, -10% em Eletrônicos", lambda: sistema.reajustar_precos(0.9, categoria="Eletrônicos"))
+    deltas = {i: 10 for i in range(0, quantidade, 10)}
+    medir(f"ajustar_estoques, {len(deltas)} deltas", lambda: sistema.ajustar_estoques(deltas))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
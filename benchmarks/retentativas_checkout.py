@@ -0,0 +1,50 @@
+# retentativas_checkout.py - Benchmark de tempestade de novas tentativas: com e sem chave de idempotência
+#
+# Cada cliente reenvia o mesmo checkout várias vezes, como faz quem não recebe
+# a resposta a tempo. Sem chave, cada reenvio cobra, baixa estoque e cria um
+# pedido; com chave, os reenvios recebem o id do primeiro pedido.
+#
+# Execução: python -m benchmarks.retentativas_checkout [checkouts] [tentativas] [latencia_ms]
+import sys
+import time
+
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce
+
+
+def executar(checkouts: int, tentativas: int, latencia: float, com_chave: bool):
+    sistema = SistemaEcommerce()
+    sistema.adicionar_produto(Produto(1, "Produto", "", 10.0, checkouts * tentativas, "Geral"))
+    produto = sistema.obter_produto(1)
+    processar = sistema.sistema_pagamento.processar_pagamento
+    chamadas = 0
+
+    def gateway_lento(*argumentos):
+        nonlocal chamadas
+        chamadas += 1
+        time.sleep(latencia)
+        return processar(*argumentos)
+
+    sistema.sistema_pagamento.processar_pagamento = gateway_lento
+    inicio = time.perf_counter()
+    for cliente in range(checkouts):
+        chave = f"checkout-{cliente}" if com_chave else None
+        for _ in range(tentativas):
+            carrinho = Carrinho()  # o cliente reenvia o mesmo carrinho
+            carrinho.adicionar_item(produto, 1)
+            sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A", chave_idempotencia=chave)
+    tempo = time.perf_counter() - inicio
+    baixado = checkouts * tentativas - produto.quantidade_estoque
+    return tempo, chamadas, len(sistema.pedidos), baixado
+
+
+def main(checkouts: int, tentativas: int, latencia: float):
+    print(f"{checkouts} checkouts x {tentativas} tentativas, gateway com {latencia * 1e3:.0f} ms de latência")
+    for nome, com_chave in (("sem chave", False), ("com chave", True)):
+        tempo, chamadas, pedidos, baixado = executar(checkouts, tentativas, latencia, com_chave)
+        print(f"  {nome}: {tempo:6.2f} s  {chamadas:5} cobranças  {pedidos:5} pedidos  {baixado:5} unidades baixadas")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+         float(sys.argv[3]) / 1e3 if len(sys.argv) > 3 else 0.002)
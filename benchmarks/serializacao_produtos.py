@@ -0,0 +1,44 @@
+# serializacao_produtos.py - Benchmark de páginas de listagem: json.dumps a cada pedido x cache
+#
+# Execução: python -m benchmarks.serializacao_produtos [quantidade_produtos]
+import json
+import random
+import sys
+import time
+
+from src.ecommerce import SistemaEcommerce
+
+CATEGORIAS = ["Eletrônicos", "Informática", "Casa", "Esporte", "Livros"]
+TAMANHO_PAGINA = 50
+
+
+def main(quantidade: int):
+    sistema = SistemaEcommerce()
+    sistema.produtos.inserir_lote(
+        (i, f"Produto {i}", f"Descrição do produto {i}", float(i % 5000) + 0.99, i % 100,
+         CATEGORIAS[i % len(CATEGORIAS)]) for i in range(quantidade))
+    aleatorio = random.Random(42)
+    # Tráfego concentrado nas primeiras páginas, como em listagens reais
+    paginas = [sistema.buscar_por_categoria(aleatorio.choice(CATEGORIAS),
+                                            inicio=TAMANHO_PAGINA * int(aleatorio.expovariate(0.2)),
+                                            limite=TAMANHO_PAGINA)
+               for _ in range(2000)]
+
+    inicio = time.perf_counter()
+    for pagina in paginas:
+        json.dumps([produto.obter_informacoes() for produto in pagina], ensure_ascii=False).encode("utf-8")
+    sem_cache = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for pagina in paginas:
+        sistema.serializar_produtos(pagina)
+    com_cache = time.perf_counter() - inicio
+
+    print(f"{len(paginas)} páginas de {TAMANHO_PAGINA} produtos")
+    print(f"json.dumps a cada pedido: {sem_cache * 1000 / len(paginas):.3f} ms/página")
+    print(f"cache de serialização:    {com_cache * 1000 / len(paginas):.3f} ms/página "
+          f"({sem_cache / com_cache:.1f}x, {len(sistema.serializacao)} entradas)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,59 @@
+# sessao_carrinho.py - Benchmark do carrinho na sessão: pickle e JSON x formato binário
+#
+# Mede o tamanho do payload e o tempo de gravar e ler o carrinho a cada
+# requisição. Na leitura binária os produtos não são buscados (ficam para o
+# primeiro uso), como numa requisição que só altera quantidades.
+#
+# Execução: python -m benchmarks.sessao_carrinho [linhas ...]
+import json
+import pickle
+import sys
+import time
+
+from src.ecommerce import Carrinho, ItemCarrinho, Produto, SistemaEcommerce
+
+REPETICOES = 2000
+
+
+def medir(funcao, argumento) -> float:
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao(argumento)
+    return (time.perf_counter() - inicio) * 1e6 / REPETICOES
+
+
+def json_gravar(carrinho: Carrinho) -> bytes:
+    return json.dumps([[produto_id, item.quantidade] for produto_id, item in carrinho.itens.items()]).encode()
+
+
+def json_ler(sistema: SistemaEcommerce):
+    def ler(dados: bytes) -> Carrinho:
+        carrinho = Carrinho()
+        carrinho._restaurar({produto_id: ItemCarrinho(sistema.obter_produto(produto_id), quantidade)
+                             for produto_id, quantidade in json.loads(dados)})
+        return carrinho
+    return ler
+
+
+def main(tamanhos):
+    sistema = SistemaEcommerce()
+    for i in range(max(tamanhos)):
+        sistema.adicionar_produto(Produto(i, f"Produto {i}", f"Descrição do produto {i}", 10.0 + i % 50, 1000,
+                                          f"Categoria {i % 20}"))
+    for num_linhas in tamanhos:
+        carrinho = Carrinho()
+        carrinho.adicionar_itens((sistema.obter_produto(i), 1 + i % 3) for i in range(num_linhas))
+        formatos = [
+            ("pickle", pickle.dumps, pickle.loads),
+            ("json", json_gravar, json_ler(sistema)),
+            ("binário", sistema.serializar_carrinho, sistema.restaurar_carrinho),
+        ]
+        print(f"{num_linhas} linhas:")
+        for nome, gravar, ler in formatos:
+            dados = gravar(carrinho)
+            print(f"  {nome:<8} {len(dados):>8} bytes | gravar {medir(gravar, carrinho):8.1f} µs"
+                  f" | ler {medir(ler, dados):8.1f} µs")
+
+
+if __name__ == "__main__":
+    main([int(valor) for valor in sys.argv[1:]] or [10, 100, 1000])
@@ -0,0 +1,51 @@
+# snapshot_catalogo.py - Benchmark de partida a frio: snapshot mmap vs. reconstrução do catálogo
+#
+# Execução: python -m benchmarks.snapshot_catalogo [quantidade_produtos]
+import os
+import sys
+import tempfile
+import time
+
+from src.catalogo import CatalogoColunar
+from src.ecommerce import SistemaEcommerce
+from src.snapshot import abrir_snapshot, salvar_snapshot
+
+CATEGORIAS = ["Eletrônicos", "Informática", "Casa", "Esporte", "Livros"]
+
+
+def registros(quantidade: int):
+    for i in range(quantidade):
+        yield (i, f"Produto {i}", f"Descrição do produto {i}", float(i % 5000) + 0.99,
+               i % 100, CATEGORIAS[i % len(CATEGORIAS)])
+
+
+def main(quantidade: int):
+    inicio = time.perf_counter()
+    catalogo = CatalogoColunar()
+    catalogo.inserir_lote(registros(quantidade))
+    print(f"reconstrução de {quantidade} produtos: {time.perf_counter() - inicio:.2f}s")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "catalogo.snap")
+        inicio = time.perf_counter()
+        salvar_snapshot(catalogo, caminho)
+        print(f"salvar snapshot: {time.perf_counter() - inicio:.2f}s "
+              f"({os.path.getsize(caminho) / 1024 ** 2:.1f} MB)")
+
+        inicio = time.perf_counter()
+        aberto = abrir_snapshot(caminho)
+        print(f"abrir snapshot: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+        inicio = time.perf_counter()
+        produto = aberto[quantidade // 2]
+        print(f"primeira leitura ({produto.nome}): {(time.perf_counter() - inicio) * 1000:.3f} ms")
+
+        inicio = time.perf_counter()
+        sistema = SistemaEcommerce.de_snapshot(caminho)
+        sistema.buscar_por_categoria("Casa", limite=10)
+        print(f"primeira busca por categoria (constrói o índice): {time.perf_counter() - inicio:.2f}s")
+        del aberto, sistema, produto
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
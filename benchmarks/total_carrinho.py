@@ -0,0 +1,45 @@
+# total_carrinho.py - Benchmark do total do carrinho: varredura a cada operação x total incremental
+#
+# Simula o frontend, que pede o total depois de cada inclusão ou remoção.
+#
+# Execução: python -m benchmarks.total_carrinho [linhas ...]
+import sys
+import time
+
+from src.ecommerce import Carrinho, Produto
+
+OPERACOES = 2000
+
+
+def varredura(carrinho: Carrinho) -> float:
+    total = 0
+    for item in carrinho.itens.values():
+        total += item.produto.preco * item.quantidade
+    return total
+
+
+def medir(num_linhas: int, calcular) -> float:
+    produtos = [Produto(i, f"Produto {i}", "", 10.0 + i % 7, 10 ** 6, "B2B") for i in range(num_linhas)]
+    carrinho = Carrinho()
+    for produto in produtos:
+        carrinho.adicionar_item(produto, 1)
+    inicio = time.perf_counter()
+    for i in range(OPERACOES):
+        if i % 2:
+            carrinho.remover_item(i % num_linhas, 1)
+        else:
+            carrinho.adicionar_item(produtos[i % num_linhas], 1)
+        calcular(carrinho)
+    return (time.perf_counter() - inicio) * 1e6 / OPERACOES
+
+
+def main(tamanhos):
+    for num_linhas in tamanhos:
+        antes = medir(num_linhas, varredura)
+        depois = medir(num_linhas, Carrinho.calcular_valor_total)
+        print(f"{num_linhas:>6} linhas: varredura {antes:8.1f} µs/op | incremental {depois:6.1f} µs/op "
+              f"({antes / depois:.0f}x)")
+
+
+if __name__ == "__main__":
+    main([int(valor) for valor in sys.argv[1:]] or [500, 5000])
@@ -0,0 +1,336 @@
+# busca.py - Índice invertido para busca textual de produtos
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+_PALAVRA = re.compile(r"\w+")
+
+# Acima de tantas expansões, conferir o prefixo no texto da linha é mais barato
+# que consultar as postagens de cada termo expandido
+MAX_CONSULTAS_GRUPO = 8
+
+# Termos presentes em mais de 1/64 das linhas ganham também um bitmap: ele não
+# ocupa mais que o array de linhas e permite interseções com operações em C.
+# O bitmap é uma lista de inteiros de BITS_BLOCO bits, para que ligar um bit ou
+# cruzar dois bitmaps não precise converter o bitmap inteiro a cada operação.
+FRACAO_BITMAP = 64
+MINIMO_BITMAP = 1024
+BITS_BLOCO = 4096
+
+
+class _TabelaSemAcento(dict):
+    """Tabela para str.translate que remove acentos, preenchida sob demanda por caractere"""
+
+    def __missing__(self, codigo: int) -> str:
+        decomposto = unicodedata.normalize("NFKD", chr(codigo))
+        valor = "".join(c for c in decomposto if not unicodedata.combining(c))
+        self[codigo] = valor
+        return valor
+
+
+_SEM_ACENTO = _TabelaSemAcento()
+
+
+def normalizar(texto: str) -> str:
+    """Converte para minúsculas e remove acentos ("Eletrônicos" -> "eletronicos")"""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return texto.translate(_SEM_ACENTO)
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Quebra o texto normalizado em palavras"""
+    return _PALAVRA.findall(normalizar(texto))
+
+
+class Vocabulario:
+    """Termos em ordem alfabética para completar prefixos
+
+    Termos novos entram em uma lista pendente pequena, que é mesclada à lista
+    principal quando passa de 1/8 do tamanho dela; assim cada inclusão custa
+    O(log n) amortizado, mesmo durante cargas grandes. Um conjunto com os termos
+    vivos evita duplicatas; termos descartados saem das listas quando passam de
+    1/8 dos vivos, para o vocabulário não crescer com a troca de textos.
+    """
+
+    def __init__(self, termos=()):
+        self._termos = set(termos)
+        self._principal: List[str] = sorted(self._termos)
+        self._pendentes: List[str] = []
+        self._descartados = set()
+
+    def __contains__(self, termo: str) -> bool:
+        return termo in self._termos
+
+    def __len__(self) -> int:
+        return len(self._termos)
+
+    def adicionar(self, termo: str):
+        if termo in self._termos:
+            return
+        self._termos.add(termo)
+        if termo in self._descartados:
+            # Ainda está nas listas; basta voltar a valer
+            self._descartados.discard(termo)
+            return
+        insort(self._pendentes, termo)
+        if len(self._pendentes) > max(64, len(self._principal) // 8):
+            self._mesclar()
+
+    def adicionar_varios(self, termos: List[str]):
+        novos = []
+        for termo in set(termos):
+            if termo in self._termos:
+                continue
+            self._termos.add(termo)
+            if termo in self._descartados:
+                self._descartados.discard(termo)
+            else:
+                novos.append(termo)
+        self._pendentes = sorted(self._pendentes + novos)
+        if len(self._pendentes) > max(64, len(self._principal) // 8):
+            self._mesclar()
+
+    def descartar(self, termo: str):
+        """Tira o termo das sugestões; as listas são compactadas quando os descartados se acumulam"""
+        if termo not in self._termos:
+            return
+        self._termos.discard(termo)
+        self._descartados.add(termo)
+        if len(self._descartados) > max(64, len(self._termos) // 8):
+            descartados = self._descartados
+            self._principal = [termo for termo in self._principal if termo not in descartados]
+            self._pendentes = [termo for termo in self._pendentes if termo not in descartados]
+            self._descartados = set()
+
+    def _mesclar(self):
+        # Duas sequências já ordenadas: o sort do Python as intercala em O(n)
+        self._principal = sorted(self._principal + self._pendentes)
+        self._pendentes = []
+
+    def com_prefixo(self, prefixo: str) -> Iterator[str]:
+        """Percorre em ordem alfabética, sem repetições, os termos que começam com o prefixo"""
+        fontes = []
+        for termos in (self._principal, self._pendentes):
+            inicio = bisect_left(termos, prefixo)
+            fontes.append(self._enquanto_prefixo(termos, inicio, prefixo))
+        anterior = None
+        for termo in heapq.merge(*fontes):
+            if termo != anterior and termo in self._termos:
+                yield termo
+            anterior = termo
+
+    @staticmethod
+    def _enquanto_prefixo(termos: List[str], inicio: int, prefixo: str) -> Iterator[str]:
+        for posicao in range(inicio, len(termos)):
+            termo = termos[posicao]
+            if not termo.startswith(prefixo):
+                return
+            yield termo
+
+
+class IndiceTextual:
+    """Índice invertido sobre nome e descrição dos produtos do catálogo
+
+    Cada termo aponta para um array ordenado com as linhas que o contêm; termos
+    frequentes mantêm também um bitmap. Uma consulta é o AND de seus termos; o
+    último pode ser tratado como prefixo para busca enquanto o usuário digita. O
+    índice observa o catálogo e é atualizado incrementalmente quando produtos são
+    incluídos ou têm o texto alterado.
+    """
+
+    def __init__(self, catalogo):
+        self._catalogo = catalogo
+        self._postagens: Dict[str, array] = {}
+        self._bitmaps: Dict[str, List[int]] = {}
+        self._vocabulario = Vocabulario()
+        self.ao_inserir_lote(0, len(catalogo))
+        catalogo.observar(self)
+
+    def _termos_da_linha(self, linha: int, nome: Optional[str] = None,
+                         descricao: Optional[str] = None) -> set:
+        if nome is None:
+            nome = self._catalogo.nomes[linha]
+        if descricao is None:
+            descricao = self._catalogo.descricoes[linha]
+        return set(tokenizar(nome)) | set(tokenizar(descricao))
+
+    def ao_inserir_lote(self, inicio: int, fim: int):
+        """Indexa linhas novas de uma vez; como são as maiores linhas, só há anexos aos arrays"""
+        postagens = self._postagens
+        bitmaps = self._bitmaps
+        minimo_bitmap = self._minimo_bitmap()
+        termos_novos = []
+        for linha in range(inicio, fim):
+            bloco, bit = divmod(linha, BITS_BLOCO)
+            for termo in self._termos_da_linha(linha):
+                lista = postagens.get(termo)
+                if lista is None:
+                    postagens[termo] = array("q", [linha])
+                    termos_novos.append(termo)
+                    continue
+                lista.append(linha)
+                bitmap = bitmaps.get(termo)
+                if bitmap is not None:
+                    if len(bitmap) <= bloco:
+                        bitmap.extend([0] * (bloco - len(bitmap) + 1))
+                    bitmap[bloco] |= 1 << bit
+                elif len(lista) >= minimo_bitmap:
+                    self._criar_bitmap(termo)
+        self._vocabulario.adicionar_varios(termos_novos)
+
+    def _minimo_bitmap(self) -> int:
+        return max(MINIMO_BITMAP, len(self._catalogo) // FRACAO_BITMAP)
+
+    def _criar_bitmap(self, termo: str):
+        bitmap = [0] * (len(self._catalogo) // BITS_BLOCO + 1)
+        for linha in self._postagens[termo]:
+            bloco, bit = divmod(linha, BITS_BLOCO)
+            bitmap[bloco] |= 1 << bit
+        self._bitmaps[termo] = bitmap
+
+    def _incluir(self, termo: str, linha: int):
+        lista = self._postagens.get(termo)
+        if lista is None:
+            self._postagens[termo] = array("q", [linha])
+            self._vocabulario.adicionar(termo)
+        elif not lista or lista[-1] < linha:
+            lista.append(linha)
+        else:
+            posicao = bisect_left(lista, linha)
+            if posicao == len(lista) or lista[posicao] != linha:
+                lista.insert(posicao, linha)
+        bitmap = self._bitmaps.get(termo)
+        if bitmap is not None:
+            bloco, bit = divmod(linha, BITS_BLOCO)
+            if len(bitmap) <= bloco:
+                bitmap.extend([0] * (bloco - len(bitmap) + 1))
+            bitmap[bloco] |= 1 << bit
+        elif lista is not None and len(lista) >= self._minimo_bitmap():
+            self._criar_bitmap(termo)
+
+    def _excluir(self, termo: str, linha: int):
+        lista = self._postagens.get(termo)
+        if lista is None:
+            return
+        posicao = bisect_left(lista, linha)
+        if posicao < len(lista) and lista[posicao] == linha:
+            del lista[posicao]
+        bitmap = self._bitmaps.get(termo)
+        if bitmap is not None:
+            bloco, bit = divmod(linha, BITS_BLOCO)
+            if bloco < len(bitmap):
+                bitmap[bloco] &= ~(1 << bit)
+        if not lista:
+            del self._postagens[termo]
+            self._bitmaps.pop(termo, None)
+            self._vocabulario.descartar(termo)
+
+    def ao_alterar(self, linha: int, anteriores: Optional[Dict]):
+        if anteriores is None:
+            for termo in self._termos_da_linha(linha):
+                self._incluir(termo, linha)
+            return
+        if "nomes" not in anteriores and "descricoes" not in anteriores:
+            return
+        antigos = self._termos_da_linha(linha, anteriores.get("nomes"), anteriores.get("descricoes"))
+        novos = self._termos_da_linha(linha)
+        for termo in antigos - novos:
+            self._excluir(termo, linha)
+        for termo in novos - antigos:
+            self._incluir(termo, linha)
+
+    def ao_alterar_coluna(self, coluna: str, linhas: Optional[List[int]]):
+        # Gravações em massa só alteram preços e estoques, que não são indexados
+        pass
+
+    def completar(self, prefixo: str, limite: int = 10) -> List[str]:
+        """Sugere termos do catálogo que começam com o prefixo, em ordem alfabética"""
+        return list(islice(self._expansoes(normalizar(prefixo)), limite))
+
+    def _expansoes(self, prefixo: str) -> Iterator[str]:
+        """Termos indexados que começam com o prefixo, em ordem alfabética"""
+        return self._vocabulario.com_prefixo(prefixo)
+
+    def buscar(self, consulta: str, limite: int = 20, prefixo: bool = True) -> List[int]:
+        """Retorna até `limite` linhas (em ordem de linha) que contêm todos os termos
+
+        Com `prefixo`, a última palavra casa com qualquer termo que comece com ela;
+        todas as expansões entram na consulta, por mais que sejam.
+        """
+        termos = tokenizar(consulta)
+        if not termos:
+            return []
+        grupos = []
+        for posicao, termo in enumerate(termos):
+            if prefixo and posicao == len(termos) - 1:
+                grupo = list(self._expansoes(termo))
+            else:
+                grupo = [termo] if termo in self._postagens else []
+            if not grupo:
+                return []
+            grupos.append(grupo)
+
+        if all(termo in self._bitmaps for grupo in grupos for termo in grupo):
+            return self._buscar_por_bitmaps(grupos, limite)
+
+        # O grupo com menos linhas conduz a interseção; os demais só são consultados
+        grupos.sort(key=lambda grupo: sum(len(self._postagens[termo]) for termo in grupo))
+        condutor, outros = grupos[0], grupos[1:]
+        listas = [self._postagens[termo] for termo in condutor]
+        candidatos = listas[0] if len(listas) == 1 else heapq.merge(*listas)
+        resultado = []
+        ultima = -1
+        for linha in candidatos:
+            if linha == ultima:
+                continue
+            ultima = linha
+            if all(self._grupo_contem(grupo, linha, termos[-1]) for grupo in outros):
+                resultado.append(linha)
+                if len(resultado) >= limite:
+                    break
+        return resultado
+
+    def _grupo_contem(self, grupo: List[str], linha: int, prefixo: str) -> bool:
+        if len(grupo) <= MAX_CONSULTAS_GRUPO:
+            return any(self._contem(termo, linha) for termo in grupo)
+        # Só o grupo do prefixo tem mais de um termo; o índice reflete o texto da linha
+        return any(termo.startswith(prefixo) for termo in self._termos_da_linha(linha))
+
+    def _contem(self, termo: str, linha: int) -> bool:
+        bitmap = self._bitmaps.get(termo)
+        if bitmap is not None:
+            bloco, bit = divmod(linha, BITS_BLOCO)
+            return bloco < len(bitmap) and bool(bitmap[bloco] >> bit & 1)
+        lista = self._postagens[termo]
+        posicao = bisect_left(lista, linha)
+        return posicao < len(lista) and lista[posicao] == linha
+
+    def _buscar_por_bitmaps(self, grupos: List[List[str]], limite: int) -> List[int]:
+        """Interseção de termos frequentes, bloco a bloco: OR dentro de cada grupo e AND entre grupos"""
+        bitmaps = [[self._bitmaps[termo] for termo in grupo] for grupo in grupos]
+        total_blocos = min(max(len(bitmap) for bitmap in grupo) for grupo in bitmaps)
+        resultado = []
+        for bloco in range(total_blocos):
+            intersecao = -1
+            for grupo in bitmaps:
+                uniao = 0
+                for bitmap in grupo:
+                    if bloco < len(bitmap):
+                        uniao |= bitmap[bloco]
+                intersecao &= uniao
+                if not intersecao:
+                    break
+            base = bloco * BITS_BLOCO
+            while intersecao:
+                menor_bit = intersecao & -intersecao
+                resultado.append(base + menor_bit.bit_length() - 1)
+                if len(resultado) >= limite:
+                    return resultado
+                intersecao ^= menor_bit
+        return resultado
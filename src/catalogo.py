@@ -0,0 +1,388 @@
+# catalogo.py - Catálogo colunar de produtos
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+COLUNAS = ("ids", "nomes", "descricoes", "precos", "estoques", "categorias")
+
+# Faixa dos arrays "q" de ids e estoques
+MENOR_INT64 = -2 ** 63
+MAIOR_INT64 = 2 ** 63 - 1
+
+# Tipo dos arrays das colunas gravadas em massa
+TIPOS_EM_MASSA = {"precos": "d", "estoques": "q"}
+
+
+class ContadorVersao:
+    """Contador incrementado a cada mudança de preço, em qualquer catálogo ou produto avulso
+
+    Quem guarda valores derivados de preços (como o total de um carrinho) compara
+    a versão que viu com a atual para saber se precisa recalcular.
+    """
+
+    __slots__ = ("valor",)
+
+    def __init__(self):
+        self.valor = 0
+
+    def incrementar(self):
+        self.valor += 1
+
+
+VERSAO_PRECOS = ContadorVersao()
+
+
+class ColunaDicionario:
+    """Coluna de textos repetidos guardada como códigos inteiros (dictionary encoding)"""
+
+    def __init__(self, codigos=None, valores: Iterable[str] = ()):
+        self.codigos = array("l") if codigos is None else codigos
+        self.valores: List[str] = [sys.intern(valor) for valor in valores]
+        self._codigo_por_valor: Dict[str, int] = {valor: codigo for codigo, valor in enumerate(self.valores)}
+
+    def codificar(self, valor: str) -> int:
+        """Retorna o código do valor, registrando-o se for novo"""
+        codigo = self._codigo_por_valor.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self.valores.append(sys.intern(valor))
+            self._codigo_por_valor[valor] = codigo
+        return codigo
+
+    def append(self, valor: str):
+        self.codigos.append(self.codificar(valor))
+
+    def __getitem__(self, linha: int) -> str:
+        return self.valores[self.codigos[linha]]
+
+    def __setitem__(self, linha: int, valor: str):
+        self.codigos[linha] = self.codificar(valor)
+
+    def __len__(self) -> int:
+        return len(self.codigos)
+
+    def truncar(self, tamanho: int):
+        """Descarta as linhas a partir de `tamanho` (os valores registrados continuam no dicionário)"""
+        del self.codigos[tamanho:]
+
+    def linhas_com(self, valor: str) -> List[int]:
+        """Lista as linhas cujo valor é `valor`, comparando apenas códigos"""
+        codigo = self._codigo_por_valor.get(valor)
+        if codigo is None:
+            return []
+        return [linha for linha, atual in enumerate(self.codigos) if atual == codigo]
+
+
+class ColunaTexto:
+    """Coluna de textos guardados em UTF-8 em um único buffer, sem um objeto str por linha"""
+
+    def __init__(self):
+        self.dados = bytearray()
+        self.inicios = array("q")
+        self.tamanhos = array("l")
+
+    def append(self, valor: str):
+        codificado = valor.encode("utf-8")
+        self.inicios.append(len(self.dados))
+        self.tamanhos.append(len(codificado))
+        self.dados += codificado
+
+    def __getitem__(self, linha: int) -> str:
+        inicio = self.inicios[linha]
+        return self.dados[inicio:inicio + self.tamanhos[linha]].decode("utf-8")
+
+    def __setitem__(self, linha: int, valor: str):
+        # O texto antigo fica órfão no buffer; substituições de texto são raras
+        codificado = valor.encode("utf-8")
+        tamanho = len(codificado)
+        inicio = self.inicios[linha]
+        if tamanho <= self.tamanhos[linha]:
+            self.dados[inicio:inicio + tamanho] = codificado
+        else:
+            self.inicios[linha] = len(self.dados)
+            self.dados += codificado
+        self.tamanhos[linha] = tamanho
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def truncar(self, tamanho: int):
+        """Descarta as linhas a partir de `tamanho`; como em __setitem__, os bytes ficam órfãos no buffer"""
+        del self.inicios[tamanho:]
+        del self.tamanhos[tamanho:]
+
+
+def _conferir_campos(id: int, nome: str, descricao: str, preco: float, quantidade_estoque: int,
+                     categoria: str):
+    """Lança OverflowError/TypeError para campos que as colunas não aceitariam, antes de qualquer gravação"""
+    if not (isinstance(nome, str) and isinstance(descricao, str) and isinstance(categoria, str)):
+        raise TypeError("nome, descricao e categoria devem ser textos")
+    if not (MENOR_INT64 <= id <= MAIOR_INT64 and MENOR_INT64 <= quantidade_estoque <= MAIOR_INT64):
+        raise OverflowError(f"id e quantidade_estoque devem caber em 64 bits: {id}, {quantidade_estoque}")
+    float(preco)
+
+
+def _truncar(coluna, tamanho: int):
+    if len(coluna) > tamanho:
+        truncar = getattr(coluna, "truncar", None)
+        if truncar is not None:
+            truncar(tamanho)
+        else:
+            del coluna[tamanho:]
+
+
+class CatalogoColunar(Mapping):
+    """Catálogo de produtos armazenado em colunas contíguas
+
+    `id`, `preco` e `quantidade_estoque` ficam em arrays tipados, `nome` e
+    `descricao` em buffers UTF-8 e `categoria` codificada em dicionário sobre
+    strings internadas. O catálogo se comporta como um dict {produto_id: Produto},
+    mas cada Produto devolvido é apenas uma visão sobre uma linha das colunas.
+    """
+
+    def __init__(self, classe_produto=None):
+        if classe_produto is None:
+            from .ecommerce import Produto as classe_produto
+        self._classe_produto = classe_produto
+        self.ids = array("q")
+        self.precos = array("d")
+        self.estoques = array("q")
+        self.nomes = ColunaTexto()
+        self.descricoes = ColunaTexto()
+        self.categorias = ColunaDicionario()
+        self._linhas: Dict[int, int] = {}  # {produto_id: linha}
+        self._observadores: List = []
+
+    @classmethod
+    def sobre_colunas(cls, colunas: Dict, linhas, classe_produto=None) -> "CatalogoColunar":
+        """Cria um catálogo sobre colunas já existentes (por exemplo, mapeadas de um snapshot)
+
+        `colunas` traz um objeto indexável por linha para cada nome em COLUNAS e
+        `linhas` é o mapeamento {produto_id: linha}, com get e atribuição.
+        """
+        catalogo = cls(classe_produto)
+        for coluna in COLUNAS:
+            setattr(catalogo, coluna, colunas[coluna])
+        catalogo._linhas = linhas
+        return catalogo
+
+    def observar(self, observador):
+        """Registra um objeto com ao_alterar(linha, anteriores), chamado a cada gravação
+
+        `anteriores` é None para uma linha nova ou {coluna: valor_anterior} com as
+        colunas gravadas (que podem ter recebido o mesmo valor). Observadores que
+        definem ao_inserir_lote(inicio, fim) recebem as linhas novas de um lote
+        de uma só vez, e os que definem ao_alterar_coluna(coluna, linhas) recebem
+        as gravações em massa de preços e estoques (com `linhas` None quando o
+        catálogo inteiro foi alterado).
+        """
+        self._observadores.append(observador)
+
+    def _notificar(self, linha: int, anteriores: Optional[Dict]):
+        for observador in self._observadores:
+            observador.ao_alterar(linha, anteriores)
+
+    def _notificar_lote(self, inicio: int, fim: int):
+        for observador in self._observadores:
+            ao_inserir_lote = getattr(observador, "ao_inserir_lote", None)
+            if ao_inserir_lote is not None:
+                ao_inserir_lote(inicio, fim)
+            else:
+                for linha in range(inicio, fim):
+                    observador.ao_alterar(linha, None)
+
+    def inserir(self, id: int, nome: str, descricao: str, preco: float,
+                quantidade_estoque: int, categoria: str) -> int:
+        """Grava os dados de um produto e retorna a linha usada (substitui se o id já existe)
+
+        A gravação é atômica: com um campo inválido (ids e estoques fora da faixa
+        de 64 bits, tipos errados) nenhuma coluna é alterada.
+        """
+        linha = self._linhas.get(id)
+        if linha is None:
+            linha = self._anexar(id, nome, descricao, preco, quantidade_estoque, categoria)
+            if self._observadores:
+                self._notificar(linha, None)
+        else:
+            _conferir_campos(id, nome, descricao, preco, quantidade_estoque, categoria)
+            anteriores = self.valores(linha) if self._observadores else None
+            VERSAO_PRECOS.incrementar()
+            self._substituir(linha, nome, descricao, preco, quantidade_estoque, categoria)
+            if anteriores is not None:
+                self._notificar(linha, anteriores)
+        return linha
+
+    def _anexar(self, id: int, nome: str, descricao: str, preco: float, quantidade_estoque: int,
+                categoria: str) -> int:
+        """Anexa uma linha a todas as colunas e só então a registra em _linhas; desfaz tudo se algo falhar"""
+        _conferir_campos(id, nome, descricao, preco, quantidade_estoque, categoria)
+        linha = len(self.ids)
+        try:
+            self.ids.append(id)
+            self.precos.append(preco)
+            self.estoques.append(quantidade_estoque)
+            self.nomes.append(nome)
+            self.descricoes.append(descricao)
+            self.categorias.append(categoria)
+        except BaseException:
+            for coluna in COLUNAS:
+                _truncar(getattr(self, coluna), linha)
+            raise
+        self._linhas[id] = linha
+        return linha
+
+    def _substituir(self, linha: int, nome: str, descricao: str, preco: float, quantidade_estoque: int,
+                    categoria: str):
+        self.precos[linha] = preco
+        self.estoques[linha] = quantidade_estoque
+        self.nomes[linha] = nome
+        self.descricoes[linha] = descricao
+        self.categorias[linha] = categoria
+
+    def inserir_lote(self, registros: Iterable[Tuple]) -> int:
+        """Grava vários (id, nome, descricao, preco, quantidade_estoque, categoria) de uma vez
+
+        As linhas novas são anexadas às colunas e anunciadas aos observadores em
+        uma única notificação; ids já existentes são substituídos como em inserir.
+        Cada registro é gravado de forma atômica; se um falhar, os anteriores do
+        lote continuam gravados e são anunciados antes de a exceção subir.
+        Retorna a quantidade de registros gravados.
+        """
+        inicio = len(self.ids)
+        gravados = 0
+        try:
+            gravados = self._gravar_lote(registros, inicio)
+        finally:
+            if self._observadores and len(self.ids) > inicio:
+                self._notificar_lote(inicio, len(self.ids))
+        return gravados
+
+    def _gravar_lote(self, registros: Iterable[Tuple], inicio: int) -> int:
+        gravados = 0
+        for id, nome, descricao, preco, quantidade_estoque, categoria in registros:
+            linha = self._linhas.get(id)
+            if linha is None:
+                self._anexar(id, nome, descricao, preco, quantidade_estoque, categoria)
+            elif linha >= inicio:
+                # Id repetido dentro do próprio lote: os observadores ainda não viram a linha
+                _conferir_campos(id, nome, descricao, preco, quantidade_estoque, categoria)
+                self._substituir(linha, nome, descricao, preco, quantidade_estoque, categoria)
+            else:
+                self.inserir(id, nome, descricao, preco, quantidade_estoque, categoria)
+            gravados += 1
+        return gravados
+
+    def adicionar(self, produto) -> int:
+        """Copia o produto para o catálogo e o transforma em visão sobre a linha gravada"""
+        if produto._catalogo is self:
+            return produto._linha
+        linha = self.inserir(produto.id, produto.nome, produto.descricao, produto.preco,
+                             produto.quantidade_estoque, produto.categoria)
+        produto._vincular(self, linha)
+        return linha
+
+    def alterar(self, linha: int, coluna: str, valor):
+        """Altera o valor de uma coluna em uma linha"""
+        dados = getattr(self, coluna)
+        anterior = dados[linha]
+        dados[linha] = valor
+        if coluna == "precos":
+            VERSAO_PRECOS.incrementar()
+        if self._observadores:
+            self._notificar(linha, {coluna: anterior})
+
+    def reajustar_precos(self, fator: float = 1.0, acrescimo: float = 0.0,
+                         linhas: Optional[Iterable[int]] = None, casas: int = 2) -> int:
+        """Grava preco * fator + acrescimo, arredondado em `casas`, em várias linhas de uma vez
+
+        Sem `linhas`, reajusta o catálogo inteiro. Nenhum preço é gravado se
+        algum resultado ficar negativo. Retorna a quantidade de linhas reajustadas.
+        """
+        # round(x) sem casas é bem mais rápido que round(x, casas) para 1M de linhas
+        escala = 10 ** casas
+        multiplicador, soma = fator * escala, acrescimo * escala
+        precos = self.precos
+        if linhas is None:
+            novos = [round(preco * multiplicador + soma) / escala for preco in precos]
+        else:
+            linhas = list(dict.fromkeys(linhas))
+            novos = [round(precos[linha] * multiplicador + soma) / escala for linha in linhas]
+        if novos and min(novos) < 0:
+            raise ValueError("Reajuste resultaria em preço negativo")
+        self._gravar_em_massa("precos", linhas, novos)
+        return len(novos)
+
+    def ajustar_estoques(self, deltas: Dict[int, int]) -> int:
+        """Soma {linha: delta} aos estoques de uma vez
+
+        É tudo ou nada: nenhum estoque é gravado se algum delta não for inteiro
+        (TypeError), se algum estoque passar de 64 bits (OverflowError) ou ficar
+        negativo (ValueError, que lista as linhas recusadas). Retorna a
+        quantidade de linhas ajustadas.
+        """
+        estoques = self.estoques
+        linhas = list(deltas)
+        invalidas = [linha for linha, delta in deltas.items() if not isinstance(delta, int)]
+        if invalidas:
+            raise TypeError(f"Deltas de estoque devem ser inteiros nas linhas {invalidas}")
+        novos = [estoques[linha] + delta for linha, delta in deltas.items()]
+        excedidas = [linha for linha, novo in zip(linhas, novos) if novo > MAIOR_INT64]
+        if excedidas:
+            raise OverflowError(f"Estoque passaria de 64 bits nas linhas {excedidas}")
+        recusadas = [linha for linha, novo in zip(linhas, novos) if novo < 0]
+        if recusadas:
+            raise ValueError(f"Estoque ficaria negativo nas linhas {recusadas}")
+        self._gravar_em_massa("estoques", linhas, novos)
+        return len(novos)
+
+    def _gravar_em_massa(self, coluna: str, linhas: Optional[List[int]], novos: List):
+        # Converter antes de gravar recusa tipos e faixas inválidos sem deixar linhas pela metade
+        novos = array(TIPOS_EM_MASSA[coluna], novos)
+        dados = getattr(self, coluna)
+        anteriores = None
+        if not all(hasattr(observador, "ao_alterar_coluna") for observador in self._observadores):
+            anteriores = list(dados) if linhas is None else [dados[linha] for linha in linhas]
+        if coluna == "precos":
+            VERSAO_PRECOS.incrementar()
+        if linhas is None and isinstance(dados, array):
+            dados[:] = novos
+        else:
+            for linha, valor in zip(range(len(novos)) if linhas is None else linhas, novos):
+                dados[linha] = valor
+        for observador in self._observadores:
+            ao_alterar_coluna = getattr(observador, "ao_alterar_coluna", None)
+            if ao_alterar_coluna is not None:
+                ao_alterar_coluna(coluna, linhas)
+            else:
+                for linha, anterior in zip(range(len(novos)) if linhas is None else linhas, anteriores):
+                    observador.ao_alterar(linha, {coluna: anterior})
+
+    def linhas_da_categoria(self, categoria: str) -> List[int]:
+        """Lista as linhas de uma categoria percorrendo apenas a coluna de códigos"""
+        return self.categorias.linhas_com(categoria)
+
+    def valores(self, linha: int) -> Dict:
+        """Retorna {coluna: valor} de todas as colunas de uma linha"""
+        return {coluna: getattr(self, coluna)[linha] for coluna in COLUNAS}
+
+    def linha(self, produto_id: int) -> Optional[int]:
+        """Retorna a linha de um produto ou None se ele não estiver no catálogo"""
+        return self._linhas.get(produto_id)
+
+    def visao(self, linha: int):
+        """Cria uma visão Produto sobre uma linha do catálogo"""
+        return self._classe_produto._visao(self, linha)
+
+    def __getitem__(self, produto_id: int):
+        return self.visao(self._linhas[produto_id])
+
+    def __contains__(self, produto_id) -> bool:
+        return produto_id in self._linhas
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,92 @@
+# dinheiro.py - Valores monetários em centavos inteiros, com regras de arredondamento explícitas
+from fractions import Fraction
+from numbers import Rational
+from typing import Iterable, List, Union
+
+# Modos de arredondamento para o centavo
+PARA_BAIXO = "para_baixo"  # em direção a -infinito
+PARA_CIMA = "para_cima"  # em direção a +infinito
+MEIO_PARA_CIMA = "meio_para_cima"  # metades se afastam do zero (o arredondamento comercial)
+MEIO_PAR = "meio_par"  # metades vão para o centavo par (arredondamento bancário)
+MODOS = (PARA_BAIXO, PARA_CIMA, MEIO_PARA_CIMA, MEIO_PAR)
+
+
+def dividir_arredondando(numerador: int, denominador: int, modo: str = MEIO_PARA_CIMA) -> int:
+    """Divide inteiros arredondando o quociente segundo `modo`, sem passar por float"""
+    if denominador < 0:
+        numerador, denominador = -numerador, -denominador
+    if modo == PARA_BAIXO:
+        return numerador // denominador
+    if modo == PARA_CIMA:
+        return -(-numerador // denominador)
+    quociente, resto = divmod(numerador, denominador)
+    dobro = 2 * resto
+    if dobro > denominador:
+        return quociente + 1
+    if dobro < denominador:
+        return quociente
+    # Exatamente na metade, entre quociente e quociente + 1
+    if modo == MEIO_PARA_CIMA:
+        return quociente + 1 if quociente >= 0 else quociente
+    if modo == MEIO_PAR:
+        return quociente + (quociente & 1)
+    raise ValueError(f"Modo de arredondamento inválido: {modo!r}")
+
+
+def multiplicar_centavos(centavos: Iterable[int], fator, modo: str = MEIO_PARA_CIMA) -> List[int]:
+    """Multiplica cada int de centavos por um fator (taxa, multiplicador de juros...) arredondando segundo `modo`
+
+    Um fator já em Fraction evita a conversão; é o caso das taxas pré-calculadas.
+    """
+    numerador, denominador = (fator if fator.__class__ is Fraction else fracao(fator)).as_integer_ratio()
+    produtos = [valor * numerador for valor in centavos]
+    if modo == PARA_BAIXO:
+        return [produto // denominador for produto in produtos]
+    if modo == PARA_CIMA:
+        return [-(-produto // denominador) for produto in produtos]
+    if modo == MEIO_PARA_CIMA:
+        # Metades se afastam do zero: soma meio denominador ao módulo e trunca
+        dobro = 2 * denominador
+        return [(2 * produto + denominador) // dobro if produto >= 0 else -((denominador - 2 * produto) // dobro)
+                for produto in produtos]
+    return [dividir_arredondando(produto, denominador, modo) for produto in produtos]
+
+
+def fracao(taxa: Union[int, float, str, Rational]) -> Fraction:
+    """Converte uma taxa para fração exata pelo valor decimal escrito (0.05 vira 1/20, não o float binário)"""
+    if isinstance(taxa, float):
+        return Fraction(repr(taxa))
+    return Fraction(taxa)
+
+
+def para_centavos(reais, modo: str = MEIO_PARA_CIMA) -> int:
+    """Converte reais (int, float, str, Decimal ou Fraction) para um int de centavos
+
+    Floats são lidos pelo valor decimal que representam (2.675 vale 267,5
+    centavos, não 267,4999...), e frações de centavo seguem `modo`.
+    """
+    if isinstance(reais, float):
+        escalado = reais * 100
+        inteiro = round(escalado)
+        # Caso comum (até duas casas): o produto já é um inteiro, a menos de ruído de float
+        if abs(escalado - inteiro) < 1e-6:
+            return inteiro
+    elif isinstance(reais, int):
+        return reais * 100
+    exato = fracao(reais) * 100
+    return dividir_arredondando(exato.numerator, exato.denominator, modo)
+
+
+def dividir_em_parcelas(centavos: int, partes: int) -> List[int]:
+    """Divide em `partes` valores que somam exatamente o total; os centavos que sobram vão para os primeiros"""
+    if partes < 1:
+        raise ValueError("Número de partes deve ser positivo")
+    base, resto = divmod(centavos, partes)
+    return [base + 1] * resto + [base] * (partes - resto)
+
+
+def formatar_centavos(centavos: int) -> str:
+    """Centavos como texto em reais com duas casas (299997 vira '2999.97' e -5 vira '-0.05')"""
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais}.{resto:02d}"
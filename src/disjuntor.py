@@ -0,0 +1,337 @@
+# disjuntor.py - Disjuntor (circuit breaker) e novas tentativas com orçamento para chamadas a provedores
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class CircuitoAbertoError(Exception):
+    """Exceção para chamadas recusadas sem tentar porque o disjuntor está aberto
+
+    `tentar_em` é quantos segundos faltam para o disjuntor deixar passar uma
+    sonda (0 se ele já está semiaberto e as sondas estão em andamento).
+    """
+
+    def __init__(self, tentar_em: float):
+        self.tentar_em = tentar_em
+        super().__init__(f"Provedor de pagamento indisponível (circuito aberto); "
+                         f"nova tentativa em {tentar_em:.1f}s")
+
+
+class EstadoCircuito(Enum):
+    """Estados do disjuntor"""
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    SEMIABERTO = "semiaberto"
+
+
+class Disjuntor:
+    """Disjuntor com janelas deslizantes de erros e de latência
+
+    Cada chamada é medida e contada em uma janela dos últimos `janela`
+    segundos, dividida em `baldes` baldes: registrar custa O(1) e a memória
+    não cresce com o tráfego. Com pelo menos `minimo_chamadas` na janela, o
+    disjuntor abre quando a fração de falhas atinge `limiar_erros` ou a de
+    chamadas mais demoradas que `limite_latencia` atinge `limiar_lentas`.
+
+    Aberto, recusa as chamadas na hora com CircuitoAbertoError, em vez de
+    deixá-las esperando um provedor degradado. Depois de `tempo_aberto`
+    segundos fica semiaberto e deixa passar até `sondas` chamadas: se todas
+    terminam bem e rápido, fecha com a janela zerada; se uma falha ou
+    demora, abre de novo.
+
+    Exceções de `ignorar` (por padrão ValueError, dados inválidos) mostram
+    que o provedor respondeu e contam como sucesso.
+    """
+
+    def __init__(self, limiar_erros: float = 0.5, limite_latencia: float = 2.0, limiar_lentas: float = 0.8,
+                 janela: float = 30.0, baldes: int = 10, minimo_chamadas: int = 20, tempo_aberto: float = 5.0,
+                 sondas: int = 3, ignorar: Tuple[type, ...] = (ValueError,),
+                 relogio: Callable[[], float] = time.monotonic):
+        if not (0 < limiar_erros <= 1 and 0 < limiar_lentas <= 1):
+            raise ValueError("Limiares de erros e de chamadas lentas devem estar entre 0 e 1")
+        if limite_latencia <= 0 or janela <= 0 or tempo_aberto <= 0 or min(baldes, minimo_chamadas, sondas) < 1:
+            raise ValueError("Latência, janela, tempo aberto, baldes, mínimo de chamadas e sondas devem ser positivos")
+        self.limiar_erros = limiar_erros
+        self.limite_latencia = limite_latencia
+        self.limiar_lentas = limiar_lentas
+        self.janela = janela
+        self.minimo_chamadas = minimo_chamadas
+        self.tempo_aberto = tempo_aberto
+        self.sondas = sondas
+        self.ignorar = ignorar
+        self._relogio = relogio
+        self._largura = janela / baldes
+        self._num_baldes = baldes
+        self._baldes: Deque[List[int]] = deque()  # [índice do balde, chamadas, falhas, lentas]
+        self._chamadas = self._falhas = self._lentas = 0
+        self._estado = EstadoCircuito.FECHADO
+        self._aberto_em = 0.0
+        self._sondas_em_andamento = 0
+        self._sondas_ok = 0
+        self._trava = threading.Lock()
+        self._estatisticas = {"chamadas": 0, "falhas": 0, "lentas": 0, "recusadas": 0, "aberturas": 0}
+
+    @property
+    def estado(self) -> EstadoCircuito:
+        """Estado atual; um disjuntor aberto há mais de `tempo_aberto` já conta como semiaberto"""
+        with self._trava:
+            if (self._estado is EstadoCircuito.ABERTO
+                    and self._relogio() - self._aberto_em >= self.tempo_aberto):
+                return EstadoCircuito.SEMIABERTO
+            return self._estado
+
+    def executar(self, operacao: Callable[[], Any]) -> Any:
+        """Executa `operacao` se o disjuntor permitir, medindo a duração e o resultado"""
+        sonda = self._permitir()
+        relogio = self._relogio
+        inicio = relogio()
+        try:
+            resultado = operacao()
+        except self.ignorar:
+            self._registrar(sonda, relogio() - inicio, False)
+            raise
+        except Exception:
+            self._registrar(sonda, relogio() - inicio, True)
+            raise
+        except BaseException:
+            self._desistir(sonda)
+            raise
+        self._registrar(sonda, relogio() - inicio, False)
+        return resultado
+
+    async def executar_async(self, operacao: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de executar: `operacao` retorna um awaitable; cancelamentos não contam como falha"""
+        sonda = self._permitir()
+        relogio = self._relogio
+        inicio = relogio()
+        try:
+            resultado = await operacao()
+        except self.ignorar:
+            self._registrar(sonda, relogio() - inicio, False)
+            raise
+        except Exception:
+            self._registrar(sonda, relogio() - inicio, True)
+            raise
+        except BaseException:
+            self._desistir(sonda)
+            raise
+        self._registrar(sonda, relogio() - inicio, False)
+        return resultado
+
+    def reiniciar(self):
+        """Fecha o disjuntor e zera a janela (por exemplo, depois de trocar de provedor)"""
+        with self._trava:
+            self._fechar()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores acumulados, o estado e as chamadas, falhas e lentas da janela atual"""
+        estado = self.estado
+        with self._trava:
+            return dict(self._estatisticas, estado=estado.value, chamadas_janela=self._chamadas,
+                        falhas_janela=self._falhas, lentas_janela=self._lentas)
+
+    def _permitir(self) -> bool:
+        """Se a chamada pode seguir; True quando ela é uma sonda do estado semiaberto"""
+        if self._estado is EstadoCircuito.FECHADO:
+            return False
+        with self._trava:
+            estado = self._estado
+            if estado is EstadoCircuito.FECHADO:
+                return False
+            if estado is EstadoCircuito.ABERTO:
+                restante = self._aberto_em + self.tempo_aberto - self._relogio()
+                if restante > 0:
+                    self._estatisticas["recusadas"] += 1
+                    raise CircuitoAbertoError(restante)
+                self._estado = EstadoCircuito.SEMIABERTO
+                self._sondas_em_andamento = self._sondas_ok = 0
+            if self._sondas_em_andamento + self._sondas_ok >= self.sondas:
+                self._estatisticas["recusadas"] += 1
+                raise CircuitoAbertoError(0.0)
+            self._sondas_em_andamento += 1
+            return True
+
+    def _registrar(self, sonda: bool, duracao: float, falhou: bool):
+        lenta = duracao > self.limite_latencia
+        with self._trava:
+            estatisticas = self._estatisticas
+            estatisticas["chamadas"] += 1
+            estatisticas["falhas"] += falhou
+            estatisticas["lentas"] += lenta
+            agora = self._relogio()
+            if sonda:
+                self._sondas_em_andamento -= 1
+                if self._estado is not EstadoCircuito.SEMIABERTO:
+                    return
+                if falhou or lenta:
+                    self._abrir(agora)
+                else:
+                    self._sondas_ok += 1
+                    if self._sondas_ok >= self.sondas:
+                        self._fechar()
+                return
+            if self._estado is not EstadoCircuito.FECHADO:
+                return  # chamada iniciada antes de o disjuntor abrir
+            self._contar(agora, falhou, lenta)
+            chamadas = self._chamadas
+            if chamadas >= self.minimo_chamadas and (self._falhas >= self.limiar_erros * chamadas
+                                                     or self._lentas >= self.limiar_lentas * chamadas):
+                self._abrir(agora)
+
+    def _desistir(self, sonda: bool):
+        if sonda:
+            with self._trava:
+                self._sondas_em_andamento -= 1
+
+    def _contar(self, agora: float, falhou: bool, lenta: bool):
+        indice = int(agora // self._largura)
+        baldes = self._baldes
+        if baldes and baldes[-1][0] == indice:
+            balde = baldes[-1]
+            balde[1] += 1
+            balde[2] += falhou
+            balde[3] += lenta
+        else:
+            baldes.append([indice, 1, int(falhou), int(lenta)])
+        self._chamadas += 1
+        self._falhas += falhou
+        self._lentas += lenta
+        inicio_janela = indice - self._num_baldes
+        while baldes[0][0] <= inicio_janela:
+            _, chamadas, falhas, lentas = baldes.popleft()
+            self._chamadas -= chamadas
+            self._falhas -= falhas
+            self._lentas -= lentas
+
+    def _zerar_janela(self):
+        self._baldes.clear()
+        self._chamadas = self._falhas = self._lentas = 0
+
+    def _abrir(self, agora: float):
+        self._estado = EstadoCircuito.ABERTO
+        self._aberto_em = agora
+        self._estatisticas["aberturas"] += 1
+        self._zerar_janela()
+
+    def _fechar(self):
+        self._estado = EstadoCircuito.FECHADO
+        self._sondas_em_andamento = self._sondas_ok = 0
+        self._zerar_janela()
+
+
+class OrcamentoRetentativas:
+    """Saldo de novas tentativas: cada sucesso rende `proporcao` de uma tentativa, até `maximo`
+
+    Numa falha prolongada as novas tentativas ficam limitadas a cerca de
+    `proporcao` das chamadas, em vez de multiplicar a carga sobre um
+    provedor que já está com problemas.
+    """
+
+    def __init__(self, proporcao: float = 0.1, maximo: float = 10.0):
+        if proporcao < 0 or maximo < 1:
+            raise ValueError("Proporção deve ser não negativa e o máximo pelo menos 1")
+        self.proporcao = proporcao
+        self.maximo = maximo
+        self.saldo = maximo
+        self._trava = threading.Lock()
+
+    def depositar(self):
+        if self.saldo < self.maximo:
+            with self._trava:
+                self.saldo = min(self.maximo, self.saldo + self.proporcao)
+
+    def retirar(self) -> bool:
+        """Gasta uma tentativa do saldo; False se não houver saldo"""
+        with self._trava:
+            if self.saldo < 1:
+                return False
+            self.saldo -= 1
+            return True
+
+
+class Retentativas:
+    """Novas tentativas com espera exponencial sorteada e orçamento compartilhado
+
+    Só exceções de `retentaveis` são repetidas, até `tentativas` chamadas no
+    total. A espera antes da n-ésima nova tentativa é sorteada entre 0 e
+    min(espera_maxima, espera_base * 2 ** (n - 1)), para que clientes que
+    falharam juntos não voltem juntos. Cada nova tentativa gasta uma unidade
+    do orçamento; sem saldo, a falha é lançada na hora. CircuitoAbertoError
+    nunca é repetida.
+
+    O padrão repete só ConnectionError, falhas em que o pagamento não chegou
+    ao provedor; timeouts não são repetidos, pois a cobrança pode ter ocorrido.
+    """
+
+    def __init__(self, tentativas: int = 3, espera_base: float = 0.05, espera_maxima: float = 1.0,
+                 retentaveis: Tuple[type, ...] = (ConnectionError,),
+                 orcamento: Optional[OrcamentoRetentativas] = None, semente: Optional[int] = None,
+                 dormir: Callable[[float], None] = time.sleep):
+        if tentativas < 1 or espera_base < 0 or espera_maxima < espera_base:
+            raise ValueError("Tentativas devem ser positivas e 0 <= espera_base <= espera_maxima")
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.retentaveis = retentaveis
+        self.orcamento = orcamento or OrcamentoRetentativas()
+        self._aleatorio = random.Random(semente)
+        self._dormir = dormir
+        self._trava = threading.Lock()
+        self._estatisticas = {"novas_tentativas": 0, "sem_orcamento": 0}
+
+    def executar(self, operacao: Callable[[], Any]) -> Any:
+        """Executa `operacao`, repetindo-a nas falhas retentáveis enquanto houver tentativas e orçamento"""
+        tentativa = 1
+        while True:
+            try:
+                resultado = operacao()
+            except CircuitoAbertoError:
+                raise
+            except self.retentaveis:
+                espera = self._espera(tentativa)
+                if espera is None:
+                    raise
+                tentativa += 1
+                self._dormir(espera)
+                continue
+            self.orcamento.depositar()
+            return resultado
+
+    async def executar_async(self, operacao: Callable[[], Awaitable[Any]]) -> Any:
+        """Versão assíncrona de executar: `operacao` retorna um awaitable e a espera não bloqueia o laço"""
+        tentativa = 1
+        while True:
+            try:
+                resultado = await operacao()
+            except CircuitoAbertoError:
+                raise
+            except self.retentaveis:
+                espera = self._espera(tentativa)
+                if espera is None:
+                    raise
+                tentativa += 1
+                await asyncio.sleep(espera)
+                continue
+            self.orcamento.depositar()
+            return resultado
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Novas tentativas feitas, falhas lançadas por falta de orçamento e o saldo atual"""
+        with self._trava:
+            return dict(self._estatisticas, saldo=self.orcamento.saldo)
+
+    def _espera(self, tentativa: int) -> Optional[float]:
+        """Espera antes da próxima tentativa, ou None se não houver mais tentativas ou orçamento"""
+        if tentativa >= self.tentativas:
+            return None
+        if not self.orcamento.retirar():
+            with self._trava:
+                self._estatisticas["sem_orcamento"] += 1
+            return None
+        with self._trava:
+            self._estatisticas["novas_tentativas"] += 1
+            return self._aleatorio.uniform(0, min(self.espera_maxima, self.espera_base * 2 ** (tentativa - 1)))
@@ -1,9 +1,25 @@
 # ecommerce.py - Sistema de E-commerce Simples
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Sequence, Tuple
+from abc import ABC, abstractmethod
+from array import array
 from enum import Enum
 from datetime import datetime
 import uuid
 
+from .catalogo import VERSAO_PRECOS, CatalogoColunar
+from .indices import IndiceCategoriaPreco, IndiceIds
+from .busca import IndiceTextual
+from .importacao import RelatorioImportacao, importar_catalogo
+from .snapshot import abrir_snapshot, salvar_snapshot
+from .serializacao import CacheSerializacao
+from .rankings import RankingEstoque, RankingVendas
+from .paginacao import (Pagina, RegistroPedidos, codificar_cursor_pedido, decodificar_cursor,
+                        decodificar_cursor_pedido, paginar, preco_finito)
+from .idempotencia import CacheIdempotencia
+from .disjuntor import Disjuntor, Retentativas
+from .promocoes import MotorPromocoes, Precificacao
+from .dinheiro import MEIO_PARA_CIMA, PARA_BAIXO, fracao, multiplicar_centavos, para_centavos
+
 class StatusPedido(Enum):
     PENDENTE = "pendente"
     PAGO = "pago"
@@ -24,16 +40,105 @@ class TransicaoInvalidaError(Exception):
     """Exceção para transições de estado inválidas"""
     pass
 
+class LoteCarrinhoError(Exception):
+    """Exceção para operações em lote no carrinho com linhas inválidas
+    
+    `falhas` traz {produto_id: motivo} de cada linha recusada; nenhuma linha
+    do lote é aplicada.
+    """
+    
+    def __init__(self, falhas: Dict[int, str]):
+        self.falhas = falhas
+        detalhes = "; ".join(f"produto {produto_id}: {motivo}" for produto_id, motivo in falhas.items())
+        super().__init__(f"{len(falhas)} linha(s) inválida(s) no lote: {detalhes}")
+
+def _campo_catalogado(coluna: str, atributo: str) -> property:
+    """Cria uma propriedade que lê do catálogo vinculado ou, no produto avulso, do próprio objeto"""
+    def ler(self):
+        catalogo = self._catalogo
+        if catalogo is None:
+            return getattr(self, atributo)
+        return getattr(catalogo, coluna)[self._linha]
+    
+    def escrever(self, valor):
+        if self._catalogo is None:
+            setattr(self, atributo, valor)
+            if coluna == "precos":
+                VERSAO_PRECOS.incrementar()
+        else:
+            self._catalogo.alterar(self._linha, coluna, valor)
+    
+    return property(ler, escrever)
+
 class Produto:
-    """Classe que representa um item disponível para venda"""
+    """Classe que representa um item disponível para venda
+    
+    Um produto avulso guarda seus próprios dados. Ao ser adicionado a um
+    CatalogoColunar ele passa a ser apenas uma visão sobre uma linha do catálogo.
+    Os atributos ficam em __slots__; o __dict__ só é alocado se alguém criar um
+    atributo extra na instância (por exemplo, mock.patch.object).
+    """
+    
+    __slots__ = ("_catalogo", "_linha", "_id", "_nome", "_descricao", "_preco",
+                 "_quantidade_estoque", "_categoria", "__dict__")
     
     def __init__(self, id: int, nome: str, descricao: str, preco: float, quantidade_estoque: int, categoria: str):
-        self.id = id
-        self.nome = nome
-        self.descricao = descricao
-        self.preco = preco
-        self.quantidade_estoque = quantidade_estoque
-        self.categoria = categoria
+        self._catalogo = None
+        self._linha = -1
+        self._id = id
+        self._nome = nome
+        self._descricao = descricao
+        self._preco = preco
+        self._quantidade_estoque = quantidade_estoque
+        self._categoria = categoria
+    
+    @classmethod
+    def _visao(cls, catalogo, linha: int) -> "Produto":
+        """Cria uma visão sobre uma linha de um catálogo sem copiar os dados"""
+        produto = cls.__new__(cls)
+        produto._catalogo = catalogo
+        produto._linha = linha
+        return produto
+    
+    def _vincular(self, catalogo, linha: int):
+        """Passa a ler e escrever os dados na linha do catálogo"""
+        self._catalogo = catalogo
+        self._linha = linha
+        self._id = self._nome = self._descricao = None
+        self._preco = self._quantidade_estoque = self._categoria = None
+    
+    @property
+    def id(self) -> int:
+        if self._catalogo is None:
+            return self._id
+        return self._catalogo.ids[self._linha]
+    
+    @id.setter
+    def id(self, valor: int):
+        if self._catalogo is not None:
+            raise AttributeError("Não é possível alterar o id de um produto já catalogado")
+        self._id = valor
+    
+    nome = _campo_catalogado("nomes", "_nome")
+    descricao = _campo_catalogado("descricoes", "_descricao")
+    preco = _campo_catalogado("precos", "_preco")
+    quantidade_estoque = _campo_catalogado("estoques", "_quantidade_estoque")
+    categoria = _campo_catalogado("categorias", "_categoria")
+    
+    @property
+    def preco_centavos(self) -> int:
+        """Preço em centavos exatos"""
+        return para_centavos(self.preco)
+    
+    def __eq__(self, outro):
+        if not isinstance(outro, Produto):
+            return NotImplemented
+        if self._catalogo is None or outro._catalogo is None:
+            return self is outro
+        return self._catalogo is outro._catalogo and self._linha == outro._linha
+    
+    def __hash__(self):
+        return hash(self.id)
     
     def verificar_disponibilidade(self, quantidade: int) -> bool:
         """Verifica se há estoque suficiente"""
@@ -56,49 +161,547 @@ class Produto:
             "categoria": self.categoria
         }
 
+class ItemCarrinho:
+    """Linha do carrinho: um produto e a quantidade escolhida
+    
+    Aceita também item["produto"] e item["quantidade"], como o antigo dict por item.
+    """
+    
+    __slots__ = ("produto", "quantidade")
+    
+    def __init__(self, produto: Produto, quantidade: int):
+        self.produto = produto
+        self.quantidade = quantidade
+    
+    def __getitem__(self, chave: str):
+        if chave not in ItemCarrinho.__slots__:
+            raise KeyError(chave)
+        return getattr(self, chave)
+    
+    def __setitem__(self, chave: str, valor):
+        if chave not in ItemCarrinho.__slots__:
+            raise KeyError(chave)
+        setattr(self, chave, valor)
+    
+    def __eq__(self, outro):
+        if isinstance(outro, ItemCarrinho):
+            return self.produto == outro.produto and self.quantidade == outro.quantidade
+        if isinstance(outro, dict):
+            return outro == {"produto": self.produto, "quantidade": self.quantidade}
+        return NotImplemented
+    
+    __hash__ = None
+
+# Políticas de Carrinho.mesclar para produtos presentes nos dois carrinhos
+POLITICAS_MESCLA = ("somar", "maximo", "mais_recente")
+
 class Carrinho:
-    """Classe que gerencia os itens selecionados pelo usuário"""
+    """Classe que gerencia os itens selecionados pelo usuário
+    
+    O total é mantido a cada inclusão ou remoção, então calcular_valor_total é
+    O(1). Se algum preço mudar (VERSAO_PRECOS), o próximo cálculo refaz a soma
+    uma vez. Os itens devem ser alterados pelos métodos do carrinho, que também
+    devolvem as unidades reservadas (SistemaEcommerce.reservar_item) que
+    passam da nova quantidade de cada linha. O total é
+    somado em centavos inteiros (calcular_total_centavos), então adicionar e
+    remover itens muitas vezes não acumula erro de arredondamento, e é o mesmo
+    total que vai para o pedido.
+    """
     
     def __init__(self):
-        self.itens: Dict[int, Dict] = {}  # {produto_id: {"produto": Produto, "quantidade": int}}
+        self.itens: Dict[int, ItemCarrinho] = {}  # {produto_id: ItemCarrinho}
+        self._total_centavos = 0
+        self._versao_precos = VERSAO_PRECOS.valor
+        self._reservas = None  # GerenciadorReservas das reservas feitas para este carrinho
+    
+    def _ajustar_reserva(self, produto_id: int, quantidade: int):
+        # Devolve só as unidades reservadas além da nova quantidade da linha
+        reservas = self._reservas
+        if reservas is not None:
+            excesso = reservas.reservas_de(self).get(produto_id, 0) - quantidade
+            if excesso > 0:
+                reservas.liberar(self, produto_id, excesso)
+    
+    def _atualizar_total(self, item: ItemCarrinho, quantidade_anterior: int):
+        if self._versao_precos != VERSAO_PRECOS.valor:
+            return  # O total já está desatualizado e será recalculado por inteiro
+        self._total_centavos += para_centavos(item.produto.preco) * (item.quantidade - quantidade_anterior)
     
     def adicionar_item(self, produto: Produto, quantidade: int):
         """Adiciona um item ao carrinho"""
         if not produto.verificar_disponibilidade(quantidade):
             raise EstoqueInsuficienteError("Produto sem estoque suficiente")
         
-        if produto.id in self.itens:
-            self.itens[produto.id]["quantidade"] += quantidade
+        item = self.itens.get(produto.id)
+        if item is not None:
+            item.quantidade += quantidade
+            self._atualizar_total(item, item.quantidade - quantidade)
         else:
-            self.itens[produto.id] = {"produto": produto, "quantidade": quantidade}
+            item = self.itens[produto.id] = ItemCarrinho(produto, quantidade)
+            self._atualizar_total(item, 0)
     
     def remover_item(self, produto_id: int, quantidade: int = None):
         """Remove um item do carrinho"""
-        if produto_id not in self.itens:
+        item = self.itens.get(produto_id)
+        if item is None:
             return
         
-        if quantidade is None or quantidade >= self.itens[produto_id]["quantidade"]:
+        anterior = item.quantidade
+        if quantidade is None or quantidade >= anterior:
             del self.itens[produto_id]
+            item = ItemCarrinho(item.produto, 0)
         else:
-            self.itens[produto_id]["quantidade"] -= quantidade
+            item.quantidade -= quantidade
+        self._atualizar_total(item, anterior)
+        self._ajustar_reserva(produto_id, item.quantidade)
+    
+    def _aplicar_quantidades(self, quantidades: Dict[int, tuple]):
+        """Grava {produto_id: (produto, nova_quantidade)} já validadas; quantidade 0 remove a linha"""
+        for produto_id, (produto, quantidade) in quantidades.items():
+            item = self.itens.get(produto_id)
+            anterior = 0 if item is None else item.quantidade
+            if quantidade == 0:
+                del self.itens[produto_id]
+                item = ItemCarrinho(produto, 0)
+            elif item is None:
+                item = self.itens[produto_id] = ItemCarrinho(produto, quantidade)
+            else:
+                item.quantidade = quantidade
+            self._atualizar_total(item, anterior)
+            if quantidade < anterior:
+                self._ajustar_reserva(produto_id, quantidade)
+    
+    def _validar_lote(self, quantidades: Dict[int, tuple], falhas: Dict[int, str]):
+        for produto_id, (produto, quantidade) in quantidades.items():
+            if produto_id not in falhas and quantidade > 0 and not produto.verificar_disponibilidade(quantidade):
+                falhas[produto_id] = (f"estoque insuficiente para {quantidade} unidade(s); "
+                                      f"disponível: {produto.quantidade_estoque}")
+        if falhas:
+            raise LoteCarrinhoError(falhas)
+    
+    def adicionar_itens(self, itens: Iterable[Tuple[Produto, int]]):
+        """Adiciona vários pares (produto, quantidade) de uma vez, tudo ou nada
+        
+        Pares repetidos do mesmo produto são somados e o estoque é conferido uma
+        vez por produto, contra a quantidade final da linha no carrinho. Se alguma
+        linha for inválida, lança LoteCarrinhoError com todas as falhas.
+        """
+        quantidades: Dict[int, tuple] = {}
+        falhas: Dict[int, str] = {}
+        for produto, quantidade in itens:
+            if not isinstance(quantidade, int) or quantidade <= 0:
+                falhas[produto.id] = f"quantidade inválida: {quantidade!r}"
+                continue
+            if produto.id in quantidades:
+                atual = quantidades[produto.id][1]
+            else:
+                item = self.itens.get(produto.id)
+                atual = 0 if item is None else item.quantidade
+            quantidades[produto.id] = (produto, atual + quantidade)
+        self._validar_lote(quantidades, falhas)
+        self._aplicar_quantidades(quantidades)
+    
+    def remover_itens(self, remocoes: Dict[int, Optional[int]]):
+        """Remove de uma vez {produto_id: quantidade}, com None para retirar a linha inteira
+        
+        Produtos fora do carrinho e quantidades não positivas são falhas; nesse
+        caso nada é removido e LoteCarrinhoError relata cada linha.
+        """
+        quantidades: Dict[int, tuple] = {}
+        falhas: Dict[int, str] = {}
+        for produto_id, quantidade in remocoes.items():
+            item = self.itens.get(produto_id)
+            if item is None:
+                falhas[produto_id] = "produto não está no carrinho"
+            elif quantidade is not None and (not isinstance(quantidade, int) or quantidade <= 0):
+                falhas[produto_id] = f"quantidade inválida: {quantidade!r}"
+            else:
+                restante = 0 if quantidade is None else max(0, item.quantidade - quantidade)
+                quantidades[produto_id] = (item.produto, restante)
+        if falhas:
+            raise LoteCarrinhoError(falhas)
+        self._aplicar_quantidades(quantidades)
+    
+    def definir_quantidades(self, quantidades: Dict[int, int]):
+        """Define de uma vez {produto_id: quantidade} de linhas do carrinho; 0 remove a linha
+        
+        O estoque é conferido para todas as linhas antes de gravar qualquer uma.
+        """
+        novas: Dict[int, tuple] = {}
+        falhas: Dict[int, str] = {}
+        for produto_id, quantidade in quantidades.items():
+            item = self.itens.get(produto_id)
+            if item is None:
+                falhas[produto_id] = "produto não está no carrinho"
+            elif not isinstance(quantidade, int) or quantidade < 0:
+                falhas[produto_id] = f"quantidade inválida: {quantidade!r}"
+            else:
+                novas[produto_id] = (item.produto, quantidade)
+        self._validar_lote(novas, falhas)
+        self._aplicar_quantidades(novas)
+    
+    def mesclar(self, outro: "Carrinho", politica: str = "somar"):
+        """Incorpora as linhas de outro carrinho (por exemplo, o do visitante que fez login), tudo ou nada
+    
+        Para produtos presentes nos dois, `politica` decide a quantidade: "somar",
+        "maximo" ou "mais_recente" (vale a do carrinho recebido). O estoque é
+        conferido uma vez, só nas linhas que mudam, e o outro carrinho não é alterado.
+        """
+        if politica not in POLITICAS_MESCLA:
+            raise ValueError(f"Política de mescla inválida: {politica!r}")
+        if outro is self:
+            raise ValueError("Não é possível mesclar um carrinho com ele mesmo")
+        itens = self.itens
+        novas: Dict[int, tuple] = {}
+        for produto_id, item in outro.itens.items():
+            atual = itens.get(produto_id)
+            if atual is None:
+                quantidade = item.quantidade
+            elif politica == "somar":
+                quantidade = atual.quantidade + item.quantidade
+            elif politica == "maximo":
+                quantidade = max(atual.quantidade, item.quantidade)
+            else:
+                quantidade = item.quantidade
+            if atual is None or quantidade != atual.quantidade:
+                novas[produto_id] = (item.produto, quantidade)
+        self._validar_lote(novas, {})
+        self._aplicar_quantidades(novas)
+    
+    def _restaurar(self, itens: Dict[int, ItemCarrinho]):
+        """Recria linhas salvas {produto_id: item} sem conferir estoque; o total é recalculado na próxima leitura"""
+        self.itens.update(itens)
+        self._versao_precos = -1
+    
+    def _recalcular_totais(self):
+        if self._versao_precos != VERSAO_PRECOS.valor:
+            self._versao_precos = VERSAO_PRECOS.valor
+            self._total_centavos = sum(para_centavos(item.produto.preco) * item.quantidade
+                                       for item in self.itens.values())
     
     def calcular_valor_total(self) -> float:
         """Calcula o valor total do carrinho"""
-        total = 0
-        for item in self.itens.values():
-            total += item["produto"].preco * item["quantidade"]
-        return total
+        self._recalcular_totais()
+        return self._total_centavos / 100
+    
+    def calcular_total_centavos(self) -> int:
+        """Total em centavos exatos: o preço de cada produto em centavos vezes a quantidade"""
+        self._recalcular_totais()
+        return self._total_centavos
+    
+    def calcular_total_promocional(self, promocoes: MotorPromocoes, cupom: Optional[str] = None) -> int:
+        """Total em centavos depois das promoções e do cupom; veja MotorPromocoes.precificar"""
+        return promocoes.precificar(self, cupom).total
     
     def limpar_carrinho(self):
         """Limpa todos os itens do carrinho"""
         self.itens.clear()
+        self._total_centavos = 0
+        self._versao_precos = VERSAO_PRECOS.valor
+        if self._reservas is not None:
+            self._reservas.liberar(self)
+
+class Cotacao:
+    """Valores de todas as formas de pagamento para um mesmo valor, calculados juntos
+    
+    `parcelado` traz {parcelas: (valor_total, valor_parcela)} de 2 a 12 parcelas.
+    É compartilhada pelo cache de cotações e não deve ser alterada.
+    """
+    
+    __slots__ = ("valor", "pix", "cartao_vista", "parcelado")
+    
+    def __init__(self, valor: float, pix: float, cartao_vista: float, parcelado: Dict[int, Tuple[float, float]]):
+        self.valor = valor
+        self.pix = pix
+        self.cartao_vista = cartao_vista
+        self.parcelado = parcelado
+    
+    def parcelamento(self, parcelas: int) -> Dict:
+        """Opção parcelada no mesmo formato de calcular_valor_cartao_parcelado"""
+        if parcelas not in self.parcelado:
+            raise ValueError("Número de parcelas deve ser entre 2 e 12")
+        valor_total, valor_parcela = self.parcelado[parcelas]
+        return {"valor_total": valor_total, "valor_parcela": valor_parcela, "parcelas": parcelas}
+
+class CotacaoLote:
+    """Cotações de um lote de valores, com uma coluna (array de floats) por forma de pagamento
+    
+    A posição i de cada coluna corresponde a valores[i]; `parcelado` traz
+    {parcelas: (valores_totais, valores_parcela)} de 2 a 12 parcelas.
+    """
+    
+    __slots__ = ("valores", "pix", "cartao_vista", "parcelado")
+    
+    def __init__(self, valores: array, pix: array, cartao_vista: array, parcelado: Dict[int, Tuple[array, array]]):
+        self.valores = valores
+        self.pix = pix
+        self.cartao_vista = cartao_vista
+        self.parcelado = parcelado
+    
+    def __len__(self) -> int:
+        return len(self.valores)
+
+def _como_sequencia(coluna: Iterable) -> Sequence:
+    """Usa listas, tuplas e arrays como estão e só copia os demais iteráveis"""
+    return coluna if isinstance(coluna, (list, tuple, array)) else list(coluna)
+
+class ResultadoPagamentos:
+    """Resultado de um lote de pagamentos em colunas, sem um dict por pagamento
+    
+    `valores_finais` traz o valor cobrado (o total com juros, no parcelado),
+    `valores_parcela` o valor de cada parcela (0.0 fora do parcelado) e
+    `aprovados` 1 ou 0 por linha. Linhas recusadas ficam com valores 0.0 e o
+    motivo em `erros` ({linha: mensagem}).
+    """
+    
+    __slots__ = ("metodos", "parcelas", "valores_finais", "valores_parcela", "aprovados", "erros")
+    
+    def __init__(self, metodos, parcelas, valores_finais: array, valores_parcela: array,
+                 aprovados: bytearray, erros: Dict[int, str]):
+        self.metodos = metodos
+        self.parcelas = parcelas
+        self.valores_finais = valores_finais
+        self.valores_parcela = valores_parcela
+        self.aprovados = aprovados
+        self.erros = erros
+    
+    def __len__(self) -> int:
+        return len(self.aprovados)
+    
+    def resultado(self, linha: int) -> Optional[Dict]:
+        """Resultado de uma linha no formato de processar_pagamento (None se a linha foi recusada)"""
+        if not self.aprovados[linha]:
+            return None
+        if self.metodos[linha] == MetodoPagamento.CARTAO_PARCELADO:
+            return {"valor_total": self.valores_finais[linha], "valor_parcela": self.valores_parcela[linha],
+                    "parcelas": self.parcelas[linha], "aprovado": True}
+        return {"valor_final": self.valores_finais[linha], "aprovado": True}
+    
+    def totais_por_metodo(self) -> Dict[MetodoPagamento, Tuple[int, float]]:
+        """Agrupa as linhas aprovadas: {metodo: (quantidade, soma dos valores finais)}"""
+        totais: Dict[MetodoPagamento, Tuple[int, float]] = {}
+        for metodo, aprovado, valor in zip(self.metodos, self.aprovados, self.valores_finais):
+            if aprovado:
+                quantidade, soma = totais.get(metodo, (0, 0.0))
+                totais[metodo] = (quantidade + 1, soma + valor)
+        return totais
+
+class FormaPagamento(ABC):
+    """Tratador de um método de pagamento registrado no SistemaPagamento
+    
+    Subclasses definem `metodo` (a chave do registro; um MetodoPagamento ou
+    qualquer valor hashable, como "boleto") e processar(valor, parcelas), que
+    retorna o dict do resultado e lança ValueError para parâmetros inválidos.
+    `valor` é um float em reais.
+    configurar(sistema) é chamado no registro e sempre que as taxas do
+    sistema mudam, para pré-calcular as constantes da forma; regra_lote dá o
+    multiplicador usado em processar_pagamentos. Os contadores são mantidos
+    por SistemaPagamento.processar_pagamento.
+    """
+    
+    metodo = None
+    
+    def __init__(self):
+        self.contagem = [0, 0]  # [processados, recusados]
+    
+    @property
+    def processados(self) -> int:
+        return self.contagem[0]
+    
+    @property
+    def recusados(self) -> int:
+        """Chamadas que terminaram em exceção (parâmetros inválidos ou falha da forma)"""
+        return self.contagem[1]
+    
+    def configurar(self, sistema: "SistemaPagamento"):
+        """Lê as taxas do sistema; chamado no registro e a cada mudança de taxa"""
+        self.sistema = sistema
+    
+    @abstractmethod
+    def processar(self, valor: float, parcelas: int) -> Dict:
+        """Processa `valor` (float, em reais) e retorna o dict do resultado"""
+    
+    def regra_lote(self, parcelas: int):
+        """(multiplicador, divisor da parcela) para o lote, ou a mensagem de erro"""
+        return f"Método de pagamento sem processamento em lote: {self.metodo!r}"
+    
+    def estatisticas(self) -> Dict[str, int]:
+        return {"processados": self.processados, "recusados": self.recusados}
+
+class PagamentoCartaoVista(FormaPagamento):
+    """Cartão à vista: o valor sem acréscimo"""
+    
+    metodo = MetodoPagamento.CARTAO_VISTA
+    
+    def processar(self, valor: float, parcelas: int) -> Dict:
+        return {"valor_final": valor, "aprovado": True}
+    
+    def regra_lote(self, parcelas: int):
+        return 1, 0
+
+class PagamentoCartaoParcelado(FormaPagamento):
+    """Cartão parcelado de 2 a 12 vezes com os juros de SistemaPagamento.taxa_juros"""
+    
+    metodo = MetodoPagamento.CARTAO_PARCELADO
+    
+    def configurar(self, sistema: "SistemaPagamento"):
+        super().configurar(sistema)
+        self._multiplicadores = sistema.tabela_parcelas
+        self._regras = {parcelas: (multiplicador, parcelas)
+                        for parcelas, multiplicador in self._multiplicadores.items()}
+    
+    def processar(self, valor: float, parcelas: int) -> Dict:
+        multiplicador = self._multiplicadores.get(parcelas)
+        if multiplicador is None:
+            resultado = self.sistema.calcular_valor_cartao_parcelado(valor, parcelas)
+            resultado["aprovado"] = True
+            return resultado
+        # Mesma conta de calcular_valor_cartao_parcelado, sem passar por ele
+        valor_com_juros = valor * multiplicador
+        return {"valor_total": valor_com_juros, "valor_parcela": valor_com_juros / parcelas,
+                "parcelas": parcelas, "aprovado": True}
+    
+    def regra_lote(self, parcelas: int):
+        return self._regras.get(parcelas, "Número de parcelas deve ser entre 2 e 12")
+
+class PagamentoPix(FormaPagamento):
+    """PIX com o desconto de SistemaPagamento.desconto_pix"""
+    
+    metodo = MetodoPagamento.PIX
+    
+    def configurar(self, sistema: "SistemaPagamento"):
+        super().configurar(sistema)
+        self._fator = 1 - sistema.desconto_pix
+        self._regra = (self._fator, 0)
+    
+    def processar(self, valor: float, parcelas: int) -> Dict:
+        return {"valor_final": valor * self._fator, "aprovado": True}
+    
+    def regra_lote(self, parcelas: int):
+        return self._regra
 
 class SistemaPagamento:
-    """Classe responsável por processar transações financeiras"""
+    """Classe responsável por processar transações financeiras
+    
+    Ao definir taxa_juros ou desconto_pix os multiplicadores de cada forma de
+    pagamento são calculados uma vez; os cálculos por valor só multiplicam.
+    
+    Os métodos calcular_centavos_* calculam lotes de ints de centavos exatos,
+    com as taxas lidas como frações decimais: o desconto do PIX é arredondado
+    para baixo (nunca passa do anunciado), o total com juros segue
+    ARREDONDAMENTO_JUROS e a parcela é a primeira de dividir_em_parcelas, a
+    que leva os centavos que sobram.
+    
+    Cada método de pagamento é atendido pela FormaPagamento registrada para
+    ele, encontrada em O(1). Novos métodos entram com registrar_forma, ou em
+    FORMAS_PADRAO para valer em todos os sistemas criados depois.
+    """
+    
+    MAX_COTACOES = 4096  # valores distintos guardados no cache de cotações
+    ARREDONDAMENTO_DESCONTO_PIX = PARA_BAIXO
+    ARREDONDAMENTO_JUROS = MEIO_PARA_CIMA
+    FORMAS_PADRAO = (PagamentoCartaoVista, PagamentoCartaoParcelado, PagamentoPix)
     
     def __init__(self):
+        self._cotacoes: Dict[float, Cotacao] = {}
+        self._formas: Dict[object, FormaPagamento] = {}  # {metodo: forma}
+        # {metodo: (forma.processar, forma.contagem)}: buscar atributos de formas de
+        # classes diferentes no mesmo ponto desfaz a especialização do interpretador
+        self._despacho: Dict[object, tuple] = {}
         self.taxa_juros = 0.05  # 5% por parcela
         self.desconto_pix = 0.10  # 10% de desconto no PIX
+        self._idempotencia: Optional[CacheIdempotencia] = None
+        for classe in self.FORMAS_PADRAO:
+            self.registrar_forma(classe())
+    
+    def registrar_forma(self, forma: FormaPagamento):
+        """Registra (ou substitui) a forma que atende `forma.metodo`"""
+        if forma.metodo is None:
+            raise ValueError("A forma de pagamento precisa definir o método que atende")
+        forma.configurar(self)
+        self._formas[forma.metodo] = forma
+        self._despacho[forma.metodo] = (forma.processar, forma.contagem)
+    
+    def forma(self, metodo) -> FormaPagamento:
+        """Forma registrada para o método, com seus contadores"""
+        forma = self._formas.get(metodo)
+        if forma is None:
+            raise ValueError(f"Método de pagamento inválido: {metodo!r}")
+        return forma
+    
+    @property
+    def metodos(self) -> List:
+        """Métodos de pagamento registrados"""
+        return list(self._formas)
+    
+    def estatisticas(self) -> Dict[object, Dict[str, int]]:
+        """Contadores de cada forma registrada: {metodo: {"processados": n, "recusados": n}}"""
+        return {metodo: forma.estatisticas() for metodo, forma in self._formas.items()}
+    
+    def _configurar_formas(self):
+        self._cotacoes.clear()
+        for forma in self._formas.values():
+            forma.configurar(self)
+    
+    @property
+    def idempotencia(self) -> CacheIdempotencia:
+        """Resultados de pagamentos por chave de idempotência, criado no primeiro pagamento com chave"""
+        if self._idempotencia is None:
+            self._idempotencia = CacheIdempotencia()
+        return self._idempotencia
+    
+    @idempotencia.setter
+    def idempotencia(self, cache: CacheIdempotencia):
+        self._idempotencia = cache
+    
+    @property
+    def taxa_juros(self) -> float:
+        return self._taxa_juros
+    
+    @taxa_juros.setter
+    def taxa_juros(self, taxa: float):
+        self._taxa_juros = taxa
+        # {parcelas: multiplicador}, na mesma conta (e com o mesmo arredondamento) de antes
+        self._tabela_parcelas = {parcelas: 1 + (taxa * (parcelas - 1)) for parcelas in range(2, 13)}
+        # {parcelas: multiplicador exato em Fraction}, para a conta em centavos
+        self._tabela_parcelas_exata = {parcelas: 1 + fracao(taxa) * (parcelas - 1)
+                                       for parcelas in range(2, 13)}
+        self._configurar_formas()
+    
+    @property
+    def desconto_pix(self) -> float:
+        return self._desconto_pix
+    
+    @desconto_pix.setter
+    def desconto_pix(self, desconto: float):
+        self._desconto_pix = desconto
+        self._fator_pix = 1 - desconto
+        self._desconto_pix_exato = fracao(desconto)
+        self._configurar_formas()
+    
+    @property
+    def tabela_parcelas(self) -> Dict[int, float]:
+        """Cópia de {parcelas: multiplicador de juros} de 2 a 12 parcelas"""
+        return dict(self._tabela_parcelas)
+    
+    def cotar(self, valor: float) -> Cotacao:
+        """Calcula PIX, cartão à vista e parcelamentos de 2 a 12 vezes em uma passada
+        
+        Os valores são idênticos aos dos métodos calcular_valor_*. Cotações ficam
+        em cache por valor até a taxa de juros ou o desconto do PIX mudar.
+        """
+        cotacao = self._cotacoes.get(valor)
+        if cotacao is not None:
+            return cotacao
+        parcelado = {}
+        for parcelas, multiplicador in self._tabela_parcelas.items():
+            valor_com_juros = valor * multiplicador
+            parcelado[parcelas] = (valor_com_juros, valor_com_juros / parcelas)
+        cotacao = Cotacao(valor, valor * self._fator_pix, valor, parcelado)
+        if len(self._cotacoes) >= self.MAX_COTACOES:
+            self._cotacoes.clear()
+        self._cotacoes[valor] = cotacao
+        return cotacao
     
     def calcular_valor_cartao_vista(self, valor: float) -> float:
         """Calcula valor para pagamento à vista"""
@@ -109,7 +712,7 @@ class SistemaPagamento:
         if parcelas < 2 or parcelas > 12:
             raise ValueError("Número de parcelas deve ser entre 2 e 12")
         
-        valor_com_juros = valor * (1 + (self.taxa_juros * (parcelas - 1)))
+        valor_com_juros = valor * self._tabela_parcelas[parcelas]
         valor_parcela = valor_com_juros / parcelas
         
         return {
@@ -120,26 +723,117 @@ class SistemaPagamento:
     
     def calcular_valor_pix(self, valor: float) -> float:
         """Calcula valor para pagamento PIX com desconto"""
-        return valor * (1 - self.desconto_pix)
+        return valor * self._fator_pix
+    
+    def calcular_valores_pix(self, valores: Iterable[float]) -> array:
+        """Versão vetorizada de calcular_valor_pix: um array de floats com o valor PIX de cada valor"""
+        fator = self._fator_pix
+        return array("d", [valor * fator for valor in valores])
+    
+    def calcular_valores_cartao_parcelado(self, valores: Iterable[float], parcelas: int) -> Tuple[array, array]:
+        """Versão vetorizada de calcular_valor_cartao_parcelado: arrays de totais com juros e de valores da parcela"""
+        if parcelas < 2 or parcelas > 12:
+            raise ValueError("Número de parcelas deve ser entre 2 e 12")
+        multiplicador = self._tabela_parcelas[parcelas]
+        totais = [valor * multiplicador for valor in valores]
+        return array("d", totais), array("d", [total / parcelas for total in totais])
+    
+    def calcular_centavos_pix(self, centavos: Iterable[int]) -> array:
+        """Valor PIX de um lote de ints de centavos, como array de centavos, com o desconto arredondado para baixo"""
+        centavos = list(centavos)
+        descontos = multiplicar_centavos(centavos, self._desconto_pix_exato,
+                                         self.ARREDONDAMENTO_DESCONTO_PIX)
+        return array("q", [valor - desconto for valor, desconto in zip(centavos, descontos)])
+    
+    def calcular_centavos_cartao_parcelado(self, centavos: Iterable[int], parcelas: int) -> Tuple[array, array]:
+        """Parcelamento de um lote de ints de centavos: arrays de centavos dos totais com juros e das parcelas"""
+        if parcelas < 2 or parcelas > 12:
+            raise ValueError("Número de parcelas deve ser entre 2 e 12")
+        totais = multiplicar_centavos(centavos, self._tabela_parcelas_exata[parcelas],
+                                      self.ARREDONDAMENTO_JUROS)
+        return array("q", totais), array("q", [-(-total // parcelas) for total in totais])
     
-    def processar_pagamento(self, valor: float, metodo: MetodoPagamento, parcelas: int = 1) -> Dict:
-        """Processa o pagamento"""
-        if metodo == MetodoPagamento.CARTAO_VISTA:
-            valor_final = self.calcular_valor_cartao_vista(valor)
-            return {"valor_final": valor_final, "aprovado": True}
+    def cotar_valores(self, valores: Iterable[float]) -> CotacaoLote:
+        """Cota um lote de valores em todas as formas de pagamento, uma coluna por vez
         
-        elif metodo == MetodoPagamento.CARTAO_PARCELADO:
-            resultado = self.calcular_valor_cartao_parcelado(valor, parcelas)
-            resultado["aprovado"] = True
-            return resultado
+        Cada posição é idêntica à que calcular_valor_* daria para o mesmo valor.
+        """
+        # Percorrer uma lista é mais rápido que um array, que cria um float a cada leitura
+        valores = valores.tolist() if isinstance(valores, array) else list(valores)
+        parcelado = {parcelas: self.calcular_valores_cartao_parcelado(valores, parcelas)
+                     for parcelas in self._tabela_parcelas}
+        coluna = array("d", valores)
+        return CotacaoLote(coluna, self.calcular_valores_pix(valores), array("d", coluna), parcelado)
+    
+    def processar_pagamento(self, valor: float, metodo: MetodoPagamento, parcelas: int = 1,
+                            chave_idempotencia: Optional[str] = None) -> Dict:
+        """Processa o pagamento com a forma registrada para o método
         
-        elif metodo == MetodoPagamento.PIX:
-            valor_final = self.calcular_valor_pix(valor)
-            return {"valor_final": valor_final, "aprovado": True}
+        Lança ValueError para métodos sem forma registrada ou parcelas inválidas.
+        Com `chave_idempotencia`, novas tentativas com a mesma chave recebem o
+        resultado da primeira sem processar de novo.
+        """
+        if chave_idempotencia is not None:
+            return self.idempotencia.executar(chave_idempotencia, (valor, metodo, parcelas),
+                                              lambda: self.processar_pagamento(valor, metodo, parcelas))
+        
+        despacho = self._despacho.get(metodo)
+        if despacho is None:
+            raise ValueError(f"Método de pagamento inválido: {metodo!r}")
+        processar, contagem = despacho
+        try:
+            resultado = processar(valor, parcelas)
+        except Exception:
+            contagem[1] += 1
+            raise
+        contagem[0] += 1
+        return resultado
+    
+    def _regra_lote(self, metodo, parcelas):
+        """(multiplicador, divisor da parcela) de um par (método, parcelas), ou a mensagem de erro"""
+        forma = self._formas.get(metodo)
+        if forma is None:
+            return f"Método de pagamento inválido: {metodo!r}"
+        return forma.regra_lote(parcelas)
+    
+    def processar_pagamentos(self, valores: Iterable[float], metodos: Iterable[MetodoPagamento],
+                             parcelas: Optional[Iterable[int]] = None) -> ResultadoPagamentos:
+        """Processa um lote de pagamentos dado em colunas (valor, método, parcelas)
+        
+        Os valores de cada linha são idênticos aos de processar_pagamento. Linhas
+        com método ou parcelas inválidos são recusadas individualmente, sem
+        interromper o lote. Sem `parcelas`, todas as linhas usam 1.
+        """
+        valores, metodos = _como_sequencia(valores), _como_sequencia(metodos)
+        parcelas = [1] * len(metodos) if parcelas is None else _como_sequencia(parcelas)
+        if not len(valores) == len(metodos) == len(parcelas):
+            raise ValueError("As colunas de valores, métodos e parcelas devem ter o mesmo tamanho")
+        finais = array("d", bytes(8 * len(metodos)))
+        valores_parcela = array("d", finais)
+        aprovados = bytearray(len(metodos))
+        erros: Dict[int, str] = {}
+        regras: Dict[tuple, object] = {}  # cada combinação de método e parcelas é resolvida uma vez
+        for linha, (valor, metodo, num_parcelas) in enumerate(zip(valores, metodos, parcelas)):
+            chave = (metodo, num_parcelas)
+            regra = regras.get(chave)
+            if regra is None:
+                regra = regras[chave] = self._regra_lote(metodo, num_parcelas)
+            if isinstance(regra, str):
+                erros[linha] = regra
+                continue
+            multiplicador, divisor = regra
+            final = finais[linha] = valor * multiplicador
+            if divisor:
+                valores_parcela[linha] = final / divisor
+            aprovados[linha] = 1
+        return ResultadoPagamentos(metodos, parcelas, finais, valores_parcela, aprovados, erros)
 
 class Pedido:
     """Classe que representa uma compra finalizada"""
     
+    __slots__ = ("id_pedido", "itens", "metodo_pagamento", "valor_total", "endereco_entrega",
+                 "status", "data_criacao", "data_pagamento", "data_envio")
+    
     def __init__(self, id_pedido: str, itens: Dict, metodo_pagamento: MetodoPagamento, 
                  valor_total: float, endereco_entrega: str):
         self.id_pedido = id_pedido
@@ -175,51 +869,466 @@ class Pedido:
 class SistemaEcommerce:
     """Classe principal que integra todas as outras classes"""
     
-    def __init__(self):
-        self.produtos: Dict[int, Produto] = {}
-        self.pedidos: Dict[str, Pedido] = {}
+    def __init__(self, disjuntor: Optional[Disjuntor] = None, retentativas: Optional[Retentativas] = None):
+        self.produtos = CatalogoColunar(Produto)
+        self.pedidos: Dict[str, Pedido] = RegistroPedidos()
         self.sistema_pagamento = SistemaPagamento()
+        self._indice_ids: Optional[IndiceIds] = None
+        self._indice_categorias: Optional[IndiceCategoriaPreco] = None
+        self._indice_textual: Optional[IndiceTextual] = None
+        self._serializacao: Optional[CacheSerializacao] = None
+        self._ranking_estoque: Optional[RankingEstoque] = None
+        self.ranking_vendas = RankingVendas()
+        self._carrinhos = None
+        self._reservas = None
+        self._gateway = None
+        self._idempotencia: Optional[CacheIdempotencia] = None
+        self._promocoes: Optional[MotorPromocoes] = None
+        # Proteção do passo de pagamento do checkout, desligada por padrão
+        self.disjuntor = disjuntor
+        self.retentativas = retentativas
+    
+    @classmethod
+    def de_snapshot(cls, caminho: str) -> "SistemaEcommerce":
+        """Cria um sistema cujo catálogo é lido por mmap de um snapshot gravado com salvar_snapshot"""
+        sistema = cls()
+        sistema.produtos = abrir_snapshot(caminho, Produto)
+        return sistema
+    
+    def salvar_snapshot(self, caminho: str):
+        """Grava o catálogo em um snapshot binário para inicialização rápida de outros processos"""
+        salvar_snapshot(self.produtos, caminho)
+    
+    # Os índices são montados no primeiro uso, para que abrir um snapshot não
+    # precise percorrer o catálogo inteiro
+    
+    @property
+    def indice_ids(self) -> IndiceIds:
+        if self._indice_ids is None:
+            self._indice_ids = IndiceIds(self.produtos)
+        return self._indice_ids
+    
+    @property
+    def indice_categorias(self) -> IndiceCategoriaPreco:
+        if self._indice_categorias is None:
+            self._indice_categorias = IndiceCategoriaPreco(self.produtos)
+        return self._indice_categorias
+    
+    @property
+    def indice_textual(self) -> IndiceTextual:
+        if self._indice_textual is None:
+            self._indice_textual = IndiceTextual(self.produtos)
+        return self._indice_textual
+    
+    @property
+    def serializacao(self) -> CacheSerializacao:
+        if self._serializacao is None:
+            self._serializacao = CacheSerializacao(self.produtos)
+        return self._serializacao
+    
+    @property
+    def carrinhos(self) -> "RegistroCarrinhos":
+        """Registro de carrinhos por sessão, com os limites padrão e sem gravação em disco"""
+        if self._carrinhos is None:
+            from .sessoes import RegistroCarrinhos
+            self._carrinhos = RegistroCarrinhos(self.obter_produto, existe=self.produtos.__contains__)
+        return self._carrinhos
+    
+    @property
+    def reservas(self) -> "GerenciadorReservas":
+        """Reservas de estoque dos carrinhos; o padrão segura as unidades por 15 minutos"""
+        if self._reservas is None:
+            from .reservas import GerenciadorReservas
+            self._reservas = GerenciadorReservas()
+        return self._reservas
+    
+    @reservas.setter
+    def reservas(self, gerenciador: "GerenciadorReservas"):
+        self._reservas = gerenciador
+    
+    @property
+    def gateway(self) -> "ClientePagamentos":
+        """Cliente do gateway usado por criar_pedido_async; o padrão é o gateway local, sem latência"""
+        if self._gateway is None:
+            from .gateway import ClientePagamentos, GatewayLocal
+            self._gateway = ClientePagamentos(GatewayLocal(sistema_pagamento=self.sistema_pagamento))
+        return self._gateway
+    
+    @gateway.setter
+    def gateway(self, cliente: "ClientePagamentos"):
+        self._gateway = cliente
+    
+    @property
+    def idempotencia(self) -> CacheIdempotencia:
+        """Ids de pedidos por chave de idempotência do checkout; o padrão guarda 100 mil chaves por 24 horas"""
+        if self._idempotencia is None:
+            self._idempotencia = CacheIdempotencia()
+        return self._idempotencia
+    
+    @idempotencia.setter
+    def idempotencia(self, cache: CacheIdempotencia):
+        self._idempotencia = cache
+    
+    @property
+    def promocoes(self) -> MotorPromocoes:
+        """Promoções e cupons aplicados na cotação e nos pedidos; sem regras, os totais não mudam"""
+        if self._promocoes is None:
+            self._promocoes = MotorPromocoes()
+        return self._promocoes
+    
+    @promocoes.setter
+    def promocoes(self, motor: MotorPromocoes):
+        self._promocoes = motor
+    
+    @property
+    def ranking_estoque(self) -> RankingEstoque:
+        if self._ranking_estoque is None:
+            self._ranking_estoque = RankingEstoque(self.produtos)
+        return self._ranking_estoque
     
     def adicionar_produto(self, produto: Produto):
         """Adiciona um produto ao catálogo"""
-        self.produtos[produto.id] = produto
+        self.produtos.adicionar(produto)
+    
+    def importar_produtos(self, caminho: str, formato: Optional[str] = None,
+                          tamanho_lote: int = 50_000) -> RelatorioImportacao:
+        """Importa produtos em massa de um arquivo CSV ou JSONL, relatando linhas inválidas"""
+        return importar_catalogo(self.produtos, caminho, formato, tamanho_lote)
+    
+    def _linhas_dos_produtos(self, produto_ids) -> List[int]:
+        linhas = []
+        for produto_id in produto_ids:
+            linha = self.produtos.linha(produto_id)
+            if linha is None:
+                raise ValueError(f"Produto {produto_id} não encontrado")
+            linhas.append(linha)
+        return linhas
+    
+    def reajustar_precos(self, fator: float = 1.0, acrescimo: float = 0.0,
+                         categoria: Optional[str] = None, produto_ids: Optional[List[int]] = None) -> int:
+        """Reajusta em massa os preços do catálogo inteiro, de uma categoria ou de alguns produtos
+        
+        O novo preço é preco * fator + acrescimo, arredondado em centavos (fator=0.9
+        dá 10% de desconto). Índices, caches e totais de carrinhos acompanham o
+        reajuste. Retorna a quantidade de produtos reajustados.
+        """
+        linhas = None
+        if categoria is not None:
+            linhas = self.produtos.linhas_da_categoria(categoria)
+        if produto_ids is not None:
+            selecionadas = self._linhas_dos_produtos(produto_ids)
+            linhas = selecionadas if linhas is None else sorted(set(linhas).intersection(selecionadas))
+        return self.produtos.reajustar_precos(fator, acrescimo, linhas)
+    
+    def ajustar_estoques(self, deltas: Dict[int, int]) -> int:
+        """Aplica em massa {produto_id: delta} aos estoques (por exemplo, um feed do depósito)
+        
+        É tudo ou nada: se algum delta não for inteiro ou algum estoque ficar
+        negativo ou passar de 64 bits, nada é gravado.
+        """
+        linhas = dict(zip(self._linhas_dos_produtos(deltas), deltas.values()))
+        try:
+            return self.produtos.ajustar_estoques(linhas)
+        except ValueError:
+            estoques = self.produtos.estoques
+            recusados = [self.produtos.ids[linha] for linha, delta in linhas.items()
+                         if estoques[linha] + delta < 0]
+            raise EstoqueInsuficienteError(f"Estoque insuficiente para os produtos {recusados}")
     
     def obter_produto(self, produto_id: int) -> Optional[Produto]:
         """Recupera um produto pelo ID"""
         return self.produtos.get(produto_id)
     
+    def obter_produto_json(self, produto_id: int) -> Optional[bytes]:
+        """Retorna as informações do produto já codificadas em JSON (UTF-8), usando o cache"""
+        linha = self.produtos.linha(produto_id)
+        if linha is None:
+            return None
+        return self.serializacao.codificar_linha(linha)
+    
+    def serializar_produtos(self, produtos: List[Produto]) -> bytes:
+        """Codifica uma página de produtos como array JSON (UTF-8), usando o cache"""
+        return self.serializacao.codificar_varios(produtos)
+    
+    def cotar_checkout(self, carrinho: Carrinho, cupom: Optional[str] = None) -> Cotacao:
+        """Cotação de todas as formas de pagamento para o total do carrinho
+        
+        O total do carrinho é mantido incrementalmente e a cotação fica em cache
+        no sistema de pagamento, então a página de checkout não refaz contas
+        enquanto o carrinho, os preços e as taxas não mudarem. Com promoções
+        cadastradas ou um `cupom`, a cotação é sobre o total com desconto.
+        """
+        return self.sistema_pagamento.cotar(self._total_do_carrinho(carrinho, cupom) / 100)
+    
+    def precificar_carrinho(self, carrinho: Carrinho, cupom: Optional[str] = None) -> Precificacao:
+        """Subtotal, descontos por item, desconto do cupom e total do carrinho com as promoções"""
+        return self.promocoes.precificar(carrinho, cupom)
+    
+    def _total_do_carrinho(self, carrinho: Carrinho, cupom: Optional[str]) -> int:
+        # Sem promoções nem cupom o total incremental do carrinho já basta
+        if cupom is None and (self._promocoes is None or not self._promocoes.tem_promocoes):
+            return carrinho.calcular_total_centavos()
+        return self.promocoes.precificar(carrinho, cupom).total
+    
+    def serializar_carrinho(self, carrinho: Carrinho) -> bytes:
+        """Codifica o carrinho para a sessão em formato binário compacto (só ids e quantidades)"""
+        from .sessoes import serializar_carrinho
+        return serializar_carrinho(carrinho)
+    
+    def restaurar_carrinho(self, dados: bytes) -> "CarrinhoRestaurado":
+        """Recria um carrinho da sessão; cada produto é buscado no catálogo só quando for usado
+        
+        Linhas de produtos fora do catálogo ficam de fora e são relatadas em `descartados`.
+        """
+        from .sessoes import desserializar_carrinho
+        return desserializar_carrinho(dados, self.obter_produto, self.produtos.__contains__)
+    
+    def buscar_por_categoria(self, categoria: str, preco_min: Optional[float] = None,
+                             preco_max: Optional[float] = None, inicio: int = 0,
+                             limite: Optional[int] = None) -> List[Produto]:
+        """Lista produtos de uma categoria em ordem de preço, com faixa de preço e paginação opcionais"""
+        linhas = self.indice_categorias.buscar(categoria, preco_min, preco_max, inicio, limite)
+        return [self.produtos.visao(linha) for linha in linhas]
+    
+    def contar_por_categoria(self, categoria: str, preco_min: Optional[float] = None,
+                             preco_max: Optional[float] = None) -> int:
+        """Conta os produtos de uma categoria na faixa de preço"""
+        return self.indice_categorias.contar(categoria, preco_min, preco_max)
+    
+    def buscar_produtos(self, consulta: str, limite: int = 20) -> List[Produto]:
+        """Busca produtos cujo nome ou descrição contêm todas as palavras da consulta
+        
+        Acentos e maiúsculas são ignorados e a última palavra pode estar incompleta.
+        """
+        return [self.produtos.visao(linha) for linha in self.indice_textual.buscar(consulta, limite)]
+    
+    def completar_busca(self, prefixo: str, limite: int = 10) -> List[str]:
+        """Sugere termos do catálogo para a busca enquanto o usuário digita"""
+        return self.indice_textual.completar(prefixo, limite)
+    
+    def listar_produtos(self, cursor: Optional[str] = None, limite: int = 50, ordem: str = "id",
+                        categoria: Optional[str] = None) -> Pagina:
+        """Lista produtos página a página; passe o proximo_cursor de uma página para obter a seguinte
+        
+        ordem="id" percorre o catálogo por id; ordem="preco" percorre por preço
+        todas as categorias ou só `categoria`. O cursor guarda a chave do último
+        produto entregue, então cada página custa O(log n + limite), por mais
+        funda que seja, e produtos incluídos entre páginas não deslocam as demais.
+        """
+        if ordem == "id":
+            if categoria is not None:
+                raise ValueError("Listagem por categoria deve usar ordem por preço")
+            campos = decodificar_cursor(cursor, "id", (int,))
+            pares = self.indice_ids.percorrer(None if campos is None else campos[0])
+            codificar = "id:{}".format
+        elif ordem == "preco":
+            apos = decodificar_cursor(cursor, "preco", (preco_finito, int))
+            pares = (((preco, linha), linha)
+                     for preco, linha in self.indice_categorias.percorrer(categoria, apos))
+            codificar = lambda chave: f"preco:{chave[0]!r}:{chave[1]}"
+        else:
+            raise ValueError(f"Ordem de listagem desconhecida: {ordem}")
+        linhas, proximo_cursor = paginar(pares, limite, codificar)
+        return Pagina([self.produtos.visao(linha) for linha in linhas], proximo_cursor)
+    
+    def listar_pedidos(self, cursor: Optional[str] = None, limite: int = 50,
+                       desde: Optional[datetime] = None) -> Pagina:
+        """Lista pedidos em ordem de criação, página a página, opcionalmente a partir de uma data
+        
+        O cursor guarda a data e a sequência do último pedido da página, então
+        continua válido mesmo que pedidos sejam incluídos ou removidos.
+        """
+        apos = decodificar_cursor_pedido(cursor)
+        if apos is not None:
+            posicao = self.pedidos.posicao_apos(*apos)
+        elif desde is not None:
+            posicao = self.pedidos.posicao_desde(desde)
+        else:
+            posicao = 0
+        pedidos, proximo_cursor = paginar(self.pedidos.percorrer(posicao), limite, codificar_cursor_pedido)
+        return Pagina(pedidos, proximo_cursor)
+    
+    def produtos_com_estoque_baixo(self, maximo: Optional[int] = 5,
+                                   limite: Optional[int] = None) -> List[Produto]:
+        """Lista produtos com estoque até `maximo`, do menor estoque para o maior
+        
+        Com maximo=None e um `limite`, retorna os `limite` menores estoques do catálogo.
+        """
+        return [self.produtos.visao(linha) for linha, _ in self.ranking_estoque.menores(limite, maximo)]
+    
+    def mais_vendidos(self, limite: int = 10) -> List[Tuple[Produto, int]]:
+        """Lista pares (produto, unidades vendidas) dos produtos mais vendidos em pedidos ativos"""
+        return [(self.produtos.visao(linha), vendidos)
+                for linha, vendidos in self.ranking_vendas.maiores(limite)]
+    
+    def _registrar_vendas(self, itens: Dict[int, ItemCarrinho], sinal: int):
+        for item in itens.values():
+            if item.produto._catalogo is self.produtos:
+                self.ranking_vendas.registrar(item.produto._linha, sinal * item.quantidade)
+    
+    def reservar_item(self, carrinho: Carrinho, produto: Produto, quantidade: int):
+        """Adiciona o item ao carrinho segurando as unidades até o pedido ou até a reserva expirar
+        
+        Remover o item do carrinho (ou diminuir a quantidade) devolve as unidades reservadas.
+        """
+        self.reservas.reservar(carrinho, produto, quantidade)
+        carrinho._reservas = self.reservas
+        try:
+            carrinho.adicionar_item(produto, quantidade)
+        except Exception:
+            self.reservas.liberar(carrinho, produto.id)
+            raise
+    
     def criar_pedido(self, carrinho: Carrinho, metodo_pagamento: MetodoPagamento, 
-                     endereco_entrega: str, parcelas: int = 1) -> str:
-        """Cria um novo pedido"""
+                     endereco_entrega: str, parcelas: int = 1, chave_idempotencia: Optional[str] = None,
+                     cupom: Optional[str] = None) -> str:
+        """Cria um novo pedido
+        
+        Se houver reservas de estoque, o estoque é conferido antes do pagamento
+        e as reservas do carrinho são consumidas de uma vez ao baixar o estoque.
+        
+        Com `chave_idempotencia`, uma nova tentativa do mesmo checkout (após um
+        timeout, por exemplo) retorna o id do pedido já criado, sem cobrar nem
+        baixar o estoque de novo, mesmo que o carrinho já tenha sido esvaziado.
+        Reusar a chave com outro método, endereço, parcelamento ou cupom é um erro.
+        
+        O valor do pedido já tem as promoções e o `cupom` aplicados.
+        
+        Se o sistema foi criado com um `disjuntor`, o pagamento passa por ele:
+        com o provedor falhando ou lento, o checkout falha na hora com
+        CircuitoAbertoError, sem criar pedido. Com `retentativas`, falhas de
+        conexão do provedor são repetidas; sem elas, são lançadas na hora.
+        """
+        if chave_idempotencia is not None:
+            return self.idempotencia.executar(
+                chave_idempotencia, (metodo_pagamento, endereco_entrega, parcelas, cupom),
+                lambda: self.criar_pedido(carrinho, metodo_pagamento, endereco_entrega, parcelas, cupom=cupom))
+        
+        pedido = self._preparar_pedido(carrinho, metodo_pagamento, endereco_entrega, cupom)
+        
+        # Processa pagamento
+        def pagar():
+            return self.sistema_pagamento.processar_pagamento(pedido.valor_total, metodo_pagamento, parcelas)
+        
+        resultado_pagamento = self._proteger_pagamento(pagar)
+        
+        return self._concluir_pedido(carrinho, pedido, resultado_pagamento)
+    
+    async def criar_pedido_async(self, carrinho: Carrinho, metodo_pagamento: MetodoPagamento,
+                                 endereco_entrega: str, parcelas: int = 1,
+                                 chave_idempotencia: Optional[str] = None, cupom: Optional[str] = None) -> str:
+        """Cria um novo pedido autorizando o pagamento no gateway assíncrono
+        
+        Enquanto o gateway responde, o laço de eventos atende outros checkouts.
+        Por isso os itens do carrinho são reservados antes de chamar o gateway:
+        checkouts concorrentes não vendem as mesmas unidades, e sem estoque o
+        checkout falha antes de cobrar. Falhas de pagamento ou de comunicação
+        (GatewayError) devolvem as unidades reservadas, sem criar pedido nem
+        baixar estoque. `chave_idempotencia` e `cupom` funcionam como em
+        criar_pedido; tentativas simultâneas com a mesma chave esperam a
+        primeira sem bloquear o laço. O disjuntor e as novas tentativas, se
+        configurados, são os mesmos de criar_pedido, e as esperas entre
+        tentativas não bloqueiam o laço.
+        """
+        if chave_idempotencia is not None:
+            return await self.idempotencia.executar_async(
+                chave_idempotencia, (metodo_pagamento, endereco_entrega, parcelas, cupom),
+                lambda: self.criar_pedido_async(carrinho, metodo_pagamento, endereco_entrega, parcelas,
+                                                cupom=cupom))
+        
+        pedido = self._preparar_pedido(carrinho, metodo_pagamento, endereco_entrega, cupom)
+        
+        def pagar():
+            return self.gateway.processar_pagamento(pedido.valor_total, metodo_pagamento, parcelas)
+        
+        adicionadas = self._reservar_carrinho(carrinho)
+        try:
+            resultado_pagamento = await self._proteger_pagamento_async(pagar)
+            return self._concluir_pedido(carrinho, pedido, resultado_pagamento)
+        except BaseException:
+            self._devolver_reservas(carrinho, adicionadas)
+            raise
+    
+    def _reservar_carrinho(self, carrinho: Carrinho) -> Dict[int, int]:
+        """Completa as reservas do carrinho até as quantidades dos itens, tudo ou nada
+        
+        Retorna {produto_id: unidades reservadas agora}, para devolver só o que
+        este checkout reservou.
+        """
+        reservas = self.reservas
+        ja_reservadas = reservas.reservas_de(carrinho)
+        adicionadas = {}
+        try:
+            for item in carrinho.itens.values():
+                faltam = item.quantidade - ja_reservadas.get(item.produto.id, 0)
+                if faltam > 0:
+                    reservas.reservar(carrinho, item.produto, faltam)
+                    adicionadas[item.produto.id] = faltam
+        except Exception:
+            self._devolver_reservas(carrinho, adicionadas)
+            raise
+        return adicionadas
+    
+    def _devolver_reservas(self, carrinho: Carrinho, adicionadas: Dict[int, int]):
+        for produto_id, quantidade in adicionadas.items():
+            self.reservas.liberar(carrinho, produto_id, quantidade)
+    
+    def _proteger_pagamento(self, pagar):
+        """Chama `pagar` pelo disjuntor, repetindo as falhas de conexão conforme `retentativas`
+        
+        Cada tentativa passa pelo disjuntor, então as falhas repetidas contam
+        na janela e, se ele abrir, as tentativas restantes param na hora.
+        """
+        disjuntor = self.disjuntor
+        operacao = pagar if disjuntor is None else lambda: disjuntor.executar(pagar)
+        retentativas = self.retentativas
+        return operacao() if retentativas is None else retentativas.executar(operacao)
+    
+    async def _proteger_pagamento_async(self, pagar):
+        disjuntor = self.disjuntor
+        operacao = pagar if disjuntor is None else lambda: disjuntor.executar_async(pagar)
+        retentativas = self.retentativas
+        return await (operacao() if retentativas is None else retentativas.executar_async(operacao))
+    
+    def _preparar_pedido(self, carrinho: Carrinho, metodo_pagamento: MetodoPagamento,
+                         endereco_entrega: str, cupom: Optional[str] = None) -> Pedido:
         if not carrinho.itens:
             raise ValueError("Carrinho vazio")
         
-        valor_total = carrinho.calcular_valor_total()
+        reservas = self._reservas
+        if reservas is not None:
+            reservas.conferir(carrinho, carrinho.itens.values())
+        
+        # O total é somado em centavos exatos e sai como float, o tipo dos valores do pedido
+        valor_total = self._total_do_carrinho(carrinho, cupom) / 100
         id_pedido = str(uuid.uuid4())
         
         # Cria o pedido
-        pedido = Pedido(id_pedido, carrinho.itens.copy(), metodo_pagamento, 
-                       valor_total, endereco_entrega)
-        
-        # Processa pagamento
-        resultado_pagamento = self.sistema_pagamento.processar_pagamento(
-            valor_total, metodo_pagamento, parcelas)
-        
+        return Pedido(id_pedido, carrinho.itens.copy(), metodo_pagamento, 
+                      valor_total, endereco_entrega)
+    
+    def _concluir_pedido(self, carrinho: Carrinho, pedido: Pedido, resultado_pagamento: Dict) -> str:
         if resultado_pagamento["aprovado"]:
             # Atualiza estoque dos produtos
-            for item in carrinho.itens.values():
-                item["produto"].atualizar_estoque(item["quantidade"])
+            reservas = self._reservas
+            if reservas is not None:
+                reservas.consumir(carrinho, carrinho.itens.values())
+            else:
+                for item in carrinho.itens.values():
+                    item.produto.atualizar_estoque(item.quantidade)
+            
+            self._registrar_vendas(carrinho.itens, 1)
             
             # Atualiza status do pedido
             pedido.atualizar_status(StatusPedido.PAGO)
             
             # Armazena o pedido
-            self.pedidos[id_pedido] = pedido
+            self.pedidos[pedido.id_pedido] = pedido
             
             # Limpa o carrinho
             carrinho.limpar_carrinho()
             
-            return id_pedido
+            return pedido.id_pedido
         else:
             raise Exception("Falha no processamento do pagamento")
     
@@ -232,10 +1341,11 @@ class SistemaEcommerce:
         
         # Reabastece o estoque
         for item in pedido.itens.values():
-            item["produto"].quantidade_estoque += item["quantidade"]
+            item.produto.quantidade_estoque += item.quantidade
         
         # Atualiza status
         pedido.atualizar_status(StatusPedido.CANCELADO)
+        self._registrar_vendas(pedido.itens, -1)
     
     def obter_pedido(self, id_pedido: str) -> Optional[Pedido]:
         """Recupera um pedido pelo ID"""
@@ -0,0 +1,155 @@
+# gateway.py - Gateway de pagamento assíncrono com limite de concorrência e timeout
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .ecommerce import MetodoPagamento, SistemaPagamento
+
+
+class GatewayError(Exception):
+    """Exceção para falhas na comunicação com o gateway de pagamento"""
+    pass
+
+
+class GatewayIndisponivelError(GatewayError, ConnectionError):
+    """Exceção para erros do gateway (o pagamento não foi processado e pode ser repetido)"""
+    pass
+
+
+class TempoEsgotadoGatewayError(GatewayError):
+    """Exceção para chamadas ao gateway que excederam o timeout"""
+    pass
+
+
+class GatewayPagamento(ABC):
+    """Interface de um gateway: abre conexões que autorizam pagamentos
+
+    Uma conexão precisa oferecer `async autorizar(valor, metodo, parcelas)`,
+    que retorna um dict como o de SistemaPagamento.processar_pagamento, e
+    `async fechar()`.
+    """
+
+    @abstractmethod
+    async def conectar(self):
+        """Abre uma conexão nova com o gateway"""
+
+
+class ConexaoLocal:
+    """Conexão com o GatewayLocal"""
+
+    def __init__(self, gateway: "GatewayLocal"):
+        self._gateway = gateway
+        self.aberta = True
+
+    async def autorizar(self, valor: float, metodo: MetodoPagamento, parcelas: int = 1) -> Dict:
+        if not self.aberta:
+            raise GatewayIndisponivelError("Conexão fechada")
+        return await self._gateway._autorizar(valor, metodo, parcelas)
+
+    async def fechar(self):
+        self.aberta = False
+
+
+class GatewayLocal(GatewayPagamento):
+    """Gateway em processo para testes, com latência e taxa de erro configuráveis
+
+    As respostas vêm de um SistemaPagamento local; `taxa_erro` é a fração das
+    chamadas que falham com GatewayIndisponivelError. Conta conexões criadas e
+    chamadas para que os testes confiram o reaproveitamento de conexões.
+    """
+
+    def __init__(self, latencia: float = 0.0, taxa_erro: float = 0.0, latencia_conexao: float = 0.0,
+                 sistema_pagamento: Optional[SistemaPagamento] = None, semente: Optional[int] = None):
+        if latencia < 0 or latencia_conexao < 0 or not 0 <= taxa_erro <= 1:
+            raise ValueError("Latências devem ser não negativas e a taxa de erro entre 0 e 1")
+        self.latencia = latencia
+        self.taxa_erro = taxa_erro
+        self.latencia_conexao = latencia_conexao
+        self.sistema_pagamento = sistema_pagamento or SistemaPagamento()
+        self._aleatorio = random.Random(semente)
+        self.conexoes_criadas = 0
+        self.chamadas = 0
+        self.em_andamento = 0
+        self.pico_em_andamento = 0
+
+    async def conectar(self) -> ConexaoLocal:
+        await asyncio.sleep(self.latencia_conexao)
+        self.conexoes_criadas += 1
+        return ConexaoLocal(self)
+
+    async def _autorizar(self, valor: float, metodo: MetodoPagamento, parcelas: int) -> Dict:
+        self.chamadas += 1
+        self.em_andamento += 1
+        self.pico_em_andamento = max(self.pico_em_andamento, self.em_andamento)
+        try:
+            await asyncio.sleep(self.latencia)
+            if self._aleatorio.random() < self.taxa_erro:
+                raise GatewayIndisponivelError("Erro simulado no gateway de pagamento")
+            return self.sistema_pagamento.processar_pagamento(valor, metodo, parcelas)
+        finally:
+            self.em_andamento -= 1
+
+
+class ClientePagamentos:
+    """Cliente assíncrono de um gateway, com semáforo, timeout por chamada e reuso de conexões
+
+    No máximo `max_simultaneos` chamadas ficam em andamento; as demais esperam
+    sem ocupar threads. Conexões livres voltam para um pool e são reutilizadas;
+    uma conexão cuja chamada falhou ou estourou o timeout é descartada, pois
+    seu estado é desconhecido.
+    """
+
+    def __init__(self, gateway: GatewayPagamento, max_simultaneos: int = 100, timeout: float = 10.0):
+        if max_simultaneos < 1 or timeout <= 0:
+            raise ValueError("Limite de concorrência e timeout devem ser positivos")
+        self.gateway = gateway
+        self.max_simultaneos = max_simultaneos
+        self.timeout = timeout
+        self._livres: Deque = deque()
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._laco = None
+
+    def _semaforo_do_laco(self) -> asyncio.Semaphore:
+        # Semáforos ficam presos ao laço de eventos em que foram usados
+        laco = asyncio.get_running_loop()
+        if self._laco is not laco:
+            self._laco = laco
+            self._semaforo = asyncio.Semaphore(self.max_simultaneos)
+            self._livres.clear()
+        return self._semaforo
+
+    async def processar_pagamento(self, valor: float, metodo: MetodoPagamento, parcelas: int = 1,
+                                  timeout: Optional[float] = None) -> Dict:
+        """Autoriza um pagamento no gateway, lançando TempoEsgotadoGatewayError após o timeout
+
+        O timeout conta a espera por uma conexão e a chamada, mas não a fila do semáforo.
+        """
+        limite = self.timeout if timeout is None else timeout
+        async with self._semaforo_do_laco():
+            conexao = None
+            try:
+                async with asyncio.timeout(limite):
+                    conexao = self._livres.pop() if self._livres else await self.gateway.conectar()
+                    resultado = await conexao.autorizar(valor, metodo, parcelas)
+            except TimeoutError:
+                await self._descartar(conexao)
+                raise TempoEsgotadoGatewayError(f"Gateway não respondeu em {limite}s") from None
+            except BaseException:
+                await self._descartar(conexao)
+                raise
+            self._livres.append(conexao)
+            return resultado
+
+    async def _descartar(self, conexao):
+        if conexao is not None:
+            try:
+                await conexao.fechar()
+            except Exception:
+                pass
+
+    async def fechar(self):
+        """Fecha as conexões livres do pool"""
+        while self._livres:
+            await self._descartar(self._livres.pop())
@@ -0,0 +1,153 @@
+# idempotencia.py - Cache de resultados por chave de idempotência, com limite LRU e expiração
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_AUSENTE = object()
+
+
+class ChaveIdempotenciaReutilizadaError(Exception):
+    """Exceção para uma chave de idempotência reaproveitada em uma requisição diferente"""
+    pass
+
+
+class CacheIdempotencia:
+    """Resultados de operações concluídas, indexados pela chave de idempotência do cliente
+
+    Uma nova tentativa com a mesma chave recebe o resultado guardado em O(1),
+    sem repetir a operação. Tentativas simultâneas com a mesma chave esperam a
+    primeira terminar. Só sucessos são guardados: se a operação lançar uma
+    exceção, a próxima tentativa a executa de novo.
+
+    A `impressao` resume os parâmetros da requisição; reaproveitar uma chave
+    com outra impressão lança ChaveIdempotenciaReutilizadaError. Resultados
+    valem por `ttl` segundos desde a conclusão e, acima de `max_chaves`, os
+    menos usados são descartados.
+    """
+
+    def __init__(self, max_chaves: int = 100_000, ttl: float = 86_400.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        if max_chaves < 1 or ttl <= 0:
+            raise ValueError("Limite de chaves e TTL do cache de idempotência devem ser positivos")
+        self.max_chaves = max_chaves
+        self.ttl = ttl
+        self._relogio = relogio
+        self._resultados: "OrderedDict[Hashable, Tuple[Hashable, Any, float]]" = OrderedDict()
+        self._em_andamento: Dict[Hashable, Tuple[Hashable, Future]] = {}
+        self._trava = threading.Lock()
+        self._estatisticas = {"acertos": 0, "faltas": 0, "aguardados": 0, "expirados": 0, "despejados": 0}
+
+    def executar(self, chave: Hashable, impressao: Hashable, operacao: Callable[[], Any]) -> Any:
+        """Executa `operacao` uma vez por chave e retorna seu resultado, guardado para as novas tentativas"""
+        while True:
+            resultado, futuro, propria = self._reservar(chave, impressao)
+            if futuro is None:
+                return resultado
+            if not propria:
+                futuro.result()  # outra tentativa está executando: espera e consulta de novo
+                continue
+            return self._concluir(chave, impressao, futuro, operacao)
+
+    async def executar_async(self, chave: Hashable, impressao: Hashable, operacao: Callable[[], Any]) -> Any:
+        """Versão assíncrona de executar: `operacao` retorna um awaitable e a espera não bloqueia o laço"""
+        while True:
+            resultado, futuro, propria = self._reservar(chave, impressao)
+            if futuro is None:
+                return resultado
+            if not propria:
+                await asyncio.wrap_future(futuro)
+                continue
+            try:
+                resultado = await operacao()
+            except BaseException:
+                self._liberar(chave, futuro)
+                raise
+            self._guardar(chave, impressao, resultado, futuro)
+            return resultado
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        """Resultado guardado para a chave, sem conferir a impressão nem contar acerto"""
+        with self._trava:
+            entrada = self._resultados.get(chave)
+            if entrada is None or self._relogio() - entrada[2] > self.ttl:
+                return padrao
+            return entrada[1]
+
+    def descartar(self, chave: Hashable):
+        """Esquece o resultado da chave (por exemplo, quando o pedido é cancelado)"""
+        with self._trava:
+            self._resultados.pop(chave, None)
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Contadores de acertos, faltas, tentativas que esperaram outra, expirações e despejos"""
+        with self._trava:
+            return dict(self._estatisticas, chaves=len(self._resultados), em_andamento=len(self._em_andamento))
+
+    def __contains__(self, chave: Hashable) -> bool:
+        return self.obter(chave, _AUSENTE) is not _AUSENTE
+
+    def __len__(self) -> int:
+        return len(self._resultados)
+
+    def _reservar(self, chave: Hashable, impressao: Hashable):
+        """(resultado, None, False) se a chave já foi concluída; senão (None, futuro, propria)
+
+        O futuro termina quando a execução em andamento acabar; `propria` indica
+        que ela acabou de ser registrada e cabe a quem chamou executar a operação.
+        """
+        with self._trava:
+            entrada = self._resultados.get(chave)
+            if entrada is not None:
+                impressao_guardada, resultado, concluido = entrada
+                if self._relogio() - concluido <= self.ttl:
+                    self._conferir(chave, impressao_guardada, impressao)
+                    self._resultados.move_to_end(chave)
+                    self._estatisticas["acertos"] += 1
+                    return resultado, None, False
+                del self._resultados[chave]
+                self._estatisticas["expirados"] += 1
+            andamento = self._em_andamento.get(chave)
+            if andamento is not None:
+                self._conferir(chave, andamento[0], impressao)
+                self._estatisticas["aguardados"] += 1
+                return None, andamento[1], False
+            futuro = Future()
+            self._em_andamento[chave] = (impressao, futuro)
+            self._estatisticas["faltas"] += 1
+            return None, futuro, True
+
+    def _concluir(self, chave: Hashable, impressao: Hashable, futuro: Future, operacao: Callable[[], Any]) -> Any:
+        try:
+            resultado = operacao()
+        except BaseException:
+            self._liberar(chave, futuro)
+            raise
+        self._guardar(chave, impressao, resultado, futuro)
+        return resultado
+
+    def _guardar(self, chave: Hashable, impressao: Hashable, resultado: Any, futuro: Future):
+        with self._trava:
+            del self._em_andamento[chave]
+            self._resultados[chave] = (impressao, resultado, self._relogio())
+            self._despejar()
+        futuro.set_result(None)
+
+    def _liberar(self, chave: Hashable, futuro: Future):
+        with self._trava:
+            del self._em_andamento[chave]
+        futuro.set_result(None)  # quem espera tenta de novo e passa a executar
+
+    def _despejar(self):
+        agora = self._relogio()
+        while len(self._resultados) > self.max_chaves:
+            _, (_, _, concluido) = self._resultados.popitem(last=False)
+            self._estatisticas["expirados" if agora - concluido > self.ttl else "despejados"] += 1
+
+    @staticmethod
+    def _conferir(chave: Hashable, esperada: Hashable, recebida: Hashable):
+        if esperada != recebida:
+            raise ChaveIdempotenciaReutilizadaError(
+                f"Chave de idempotência {chave!r} já usada com outros parâmetros")
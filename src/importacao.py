@@ -0,0 +1,184 @@
+# importacao.py - Importação em massa do catálogo a partir de CSV ou JSONL
+import csv
+import json
+import math
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .catalogo import MAIOR_INT64, MENOR_INT64
+
+CAMPOS = ("id", "nome", "descricao", "preco", "quantidade_estoque", "categoria")
+OBRIGATORIOS = tuple(campo for campo in CAMPOS if campo != "descricao")
+
+# Nomes alternativos aceitos nos arquivos (obter_informacoes usa "estoque")
+SINONIMOS = {"estoque": "quantidade_estoque"}
+
+
+class ErroImportacao:
+    """Registro rejeitado durante a importação"""
+
+    __slots__ = ("numero_linha", "mensagem")
+
+    def __init__(self, numero_linha: int, mensagem: str):
+        self.numero_linha = numero_linha
+        self.mensagem = mensagem
+
+    def __repr__(self):
+        return f"ErroImportacao(linha {self.numero_linha}: {self.mensagem})"
+
+
+class RelatorioImportacao:
+    """Resumo de uma importação: gravados, rejeitados e os primeiros erros"""
+
+    def __init__(self, max_erros: int = 1000):
+        self.importados = 0
+        self.rejeitados = 0
+        self.erros: List[ErroImportacao] = []
+        self._max_erros = max_erros
+
+    def registrar_erro(self, erro: ErroImportacao):
+        # Só os primeiros erros são guardados, para a memória ficar limitada
+        self.rejeitados += 1
+        if len(self.erros) < self._max_erros:
+            self.erros.append(erro)
+
+
+class _LinhasDecodificadas:
+    """Decodifica um arquivo binário linha a linha, guardando o número da última linha lida
+
+    Linhas com UTF-8 inválido viram falhas e são entregues ao leitor como linhas vazias.
+    """
+
+    def __init__(self, arquivo):
+        self._arquivo = arquivo
+        self.numero_linha = 0
+        self.falhas: List[ErroImportacao] = []
+
+    def __iter__(self) -> Iterator[str]:
+        for bruta in self._arquivo:
+            self.numero_linha += 1
+            try:
+                yield bruta.decode("utf-8")
+            except UnicodeDecodeError as erro:
+                self.falhas.append(ErroImportacao(self.numero_linha, f"UTF-8 inválido: {erro}"))
+                yield "\n"
+
+
+def ler_csv(arquivo) -> Iterator[Tuple[int, object]]:
+    """Gera (número da linha, dict) para cada linha de um CSV binário com cabeçalho
+
+    Linhas com UTF-8 inválido ou que o módulo csv não consegue ler viram ErroImportacao.
+    """
+    linhas = _LinhasDecodificadas(arquivo)
+    leitor = csv.DictReader(iter(linhas))
+    while True:
+        try:
+            registro = next(leitor)
+        except StopIteration:
+            registro = None
+        except csv.Error as erro:
+            registro = ErroImportacao(linhas.numero_linha, f"CSV inválido: {erro}")
+        yield from ((falha.numero_linha, falha) for falha in linhas.falhas)
+        linhas.falhas.clear()
+        if registro is None:
+            return
+        yield linhas.numero_linha, registro
+
+
+def ler_jsonl(arquivo) -> Iterator[Tuple[int, object]]:
+    """Gera (número da linha, objeto) para cada linha de um JSONL binário
+
+    UTF-8 ou JSON inválido viram ErroImportacao.
+    """
+    for numero_linha, bruta in enumerate(arquivo, start=1):
+        try:
+            texto = bruta.decode("utf-8")
+        except UnicodeDecodeError as erro:
+            yield numero_linha, ErroImportacao(numero_linha, f"UTF-8 inválido: {erro}")
+            continue
+        if not texto.strip():
+            continue
+        try:
+            yield numero_linha, json.loads(texto)
+        except ValueError as erro:
+            yield numero_linha, ErroImportacao(numero_linha, f"JSON inválido: {erro}")
+
+
+def validar_registro(registro: Dict) -> Tuple:
+    """Converte um registro para a tupla de campos do catálogo ou lança ValueError"""
+    if not isinstance(registro, dict):
+        raise ValueError("registro deve ser um objeto")
+    for sinonimo, campo in SINONIMOS.items():
+        if sinonimo in registro and campo not in registro:
+            registro = {**registro, campo: registro[sinonimo]}
+    faltando = [campo for campo in OBRIGATORIOS if registro.get(campo) in (None, "")]
+    if faltando:
+        raise ValueError(f"campos obrigatórios ausentes: {', '.join(faltando)}")
+
+    id = _inteiro(registro["id"], "id")
+    preco = float(registro["preco"])
+    if not math.isfinite(preco) or preco < 0:
+        raise ValueError(f"preco inválido: {registro['preco']}")
+    quantidade_estoque = _inteiro(registro["quantidade_estoque"], "quantidade_estoque")
+    if quantidade_estoque < 0:
+        raise ValueError(f"quantidade_estoque negativa: {quantidade_estoque}")
+    return (id, str(registro["nome"]), str(registro.get("descricao") or ""), preco,
+            quantidade_estoque, str(registro["categoria"]))
+
+
+def _inteiro(valor, campo: str) -> int:
+    if isinstance(valor, float) and not valor.is_integer():
+        raise ValueError(f"{campo} deve ser inteiro: {valor}")
+    try:
+        inteiro = int(valor)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{campo} deve ser inteiro: {valor}") from None
+    if not MENOR_INT64 <= inteiro <= MAIOR_INT64:
+        raise ValueError(f"{campo} fora da faixa de 64 bits: {valor}")
+    return inteiro
+
+
+def validar(registros: Iterable[Tuple[int, object]], relatorio: RelatorioImportacao) -> Iterator[Tuple]:
+    """Deixa passar só os registros válidos; os demais vão para o relatório"""
+    for numero_linha, registro in registros:
+        if isinstance(registro, ErroImportacao):
+            relatorio.registrar_erro(registro)
+            continue
+        try:
+            yield validar_registro(registro)
+        except (ValueError, TypeError) as erro:
+            relatorio.registrar_erro(ErroImportacao(numero_linha, str(erro)))
+
+
+def em_lotes(itens: Iterable, tamanho: int) -> Iterator[List]:
+    """Agrupa um iterável em listas de até `tamanho` itens"""
+    iterador = iter(itens)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def importar_catalogo(catalogo, caminho: str, formato: Optional[str] = None,
+                      tamanho_lote: int = 50_000, max_erros: int = 1000) -> RelatorioImportacao:
+    """Importa produtos de um arquivo CSV ou JSONL para o catálogo, lote a lote
+
+    O arquivo é lido em fluxo, então a memória usada depende do tamanho do lote e
+    não do arquivo. Linhas inválidas são contadas e relatadas sem interromper a
+    importação, inclusive as com UTF-8 inválido. O formato é deduzido da
+    extensão quando não informado.
+    """
+    if formato is None:
+        formato = "jsonl" if caminho.endswith((".jsonl", ".ndjson")) else "csv"
+    leitores = {"csv": ler_csv, "jsonl": ler_jsonl}
+    if formato not in leitores:
+        raise ValueError(f"Formato de importação desconhecido: {formato}")
+
+    relatorio = RelatorioImportacao(max_erros)
+    # Em binário, cada linha é decodificada à parte e um byte inválido só rejeita a própria linha
+    with open(caminho, "rb") as arquivo:
+        validos = validar(leitores[formato](arquivo), relatorio)
+        for lote in em_lotes(validos, tamanho_lote):
+            relatorio.importados += catalogo.inserir_lote(lote)
+    return relatorio
@@ -0,0 +1,364 @@
+# indices.py - Índices secundários sobre o catálogo colunar
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, chain, islice
+from operator import eq, le
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Entradas por bloco de ListaPrecos; um bloco é dividido ao passar do dobro
+TAMANHO_BLOCO = 1024
+INFINITO = float("inf")
+
+
+def _ordem_preservada(antigos: array, novos: array) -> bool:
+    """Indica se as linhas continuam ordenadas por (preço, linha) com os preços novos
+
+    Os preços novos precisam estar em ordem e não podem ter formado empates
+    novos, pois entre preços iguais as linhas também devem estar ordenadas.
+    """
+    if not all(map(le, novos, islice(novos, 1, None))):
+        return False
+    return sum(map(eq, novos, islice(novos, 1, None))) == sum(map(eq, antigos, islice(antigos, 1, None)))
+
+
+class ListaPrecos:
+    """Linhas de uma categoria ordenadas por (preço, linha) em blocos de arrays paralelos
+
+    Cada bloco guarda até 2 * TAMANHO_BLOCO entradas e os blocos ficam em ordem;
+    incluir ou excluir uma entrada desloca só o bloco dela, não a categoria
+    inteira. O maior par de cada bloco localiza o bloco por busca binária, e as
+    posições globais usam as contagens acumuladas, refeitas sob demanda.
+    """
+
+    __slots__ = ("_precos", "_linhas", "_maximos", "_acumulados", "_tamanho")
+
+    def __init__(self):
+        self.substituir(array("d"), array("q"))
+
+    def substituir(self, precos: array, linhas: array):
+        """Troca todo o conteúdo por arrays já ordenados por (preço, linha)"""
+        self._precos: List[array] = [precos[inicio:inicio + TAMANHO_BLOCO]
+                                     for inicio in range(0, len(precos), TAMANHO_BLOCO)]
+        self._linhas: List[array] = [linhas[inicio:inicio + TAMANHO_BLOCO]
+                                     for inicio in range(0, len(linhas), TAMANHO_BLOCO)]
+        self._maximos: List[Tuple[float, int]] = [(bloco[-1], linhas_bloco[-1])
+                                                  for bloco, linhas_bloco in zip(self._precos, self._linhas)]
+        self._acumulados: Optional[List[int]] = None
+        self._tamanho = len(linhas)
+
+    @property
+    def precos(self) -> array:
+        """Todos os preços em ordem, em um array novo"""
+        return array("d", chain.from_iterable(self._precos))
+
+    @property
+    def linhas(self) -> array:
+        """Todas as linhas em ordem de preço, em um array novo"""
+        return array("q", chain.from_iterable(self._linhas))
+
+    def _bloco(self, preco: float, linha: int) -> int:
+        """Bloco onde (preço, linha) está ou entraria"""
+        return min(bisect_left(self._maximos, (preco, linha)), len(self._maximos) - 1)
+
+    @staticmethod
+    def _posicao(precos: array, linhas: array, preco: float, linha: int) -> int:
+        # Entre preços iguais as linhas também ficam ordenadas
+        inicio = bisect_left(precos, preco)
+        fim = bisect_right(precos, preco, inicio)
+        return bisect_left(linhas, linha, inicio, fim)
+
+    def inserir(self, preco: float, linha: int):
+        self._acumulados = None
+        self._tamanho += 1
+        if not self._precos:
+            self._precos.append(array("d", [preco]))
+            self._linhas.append(array("q", [linha]))
+            self._maximos.append((preco, linha))
+            return
+        bloco = self._bloco(preco, linha)
+        precos, linhas = self._precos[bloco], self._linhas[bloco]
+        posicao = self._posicao(precos, linhas, preco, linha)
+        precos.insert(posicao, preco)
+        linhas.insert(posicao, linha)
+        if posicao == len(linhas) - 1:
+            self._maximos[bloco] = (preco, linha)
+        if len(linhas) > 2 * TAMANHO_BLOCO:
+            self._precos[bloco + 1:bloco + 1] = [precos[TAMANHO_BLOCO:]]
+            self._linhas[bloco + 1:bloco + 1] = [linhas[TAMANHO_BLOCO:]]
+            self._maximos.insert(bloco, (precos[TAMANHO_BLOCO - 1], linhas[TAMANHO_BLOCO - 1]))
+            del precos[TAMANHO_BLOCO:]
+            del linhas[TAMANHO_BLOCO:]
+
+    def remover(self, preco: float, linha: int):
+        bloco = self._bloco(preco, linha)
+        precos, linhas = self._precos[bloco], self._linhas[bloco]
+        posicao = self._posicao(precos, linhas, preco, linha)
+        del precos[posicao]
+        del linhas[posicao]
+        self._acumulados = None
+        self._tamanho -= 1
+        if not linhas:
+            del self._precos[bloco]
+            del self._linhas[bloco]
+            del self._maximos[bloco]
+        elif posicao == len(linhas):
+            self._maximos[bloco] = (precos[-1], linhas[-1])
+
+    def _inicios(self) -> List[int]:
+        """Posição global da primeira entrada de cada bloco"""
+        if self._acumulados is None:
+            self._acumulados = [0, *accumulate(map(len, self._linhas))]
+        return self._acumulados
+
+    def _inicio_do_bloco(self, bloco: int) -> int:
+        return self._inicios()[bloco]
+
+    def _localizar(self, posicao: int) -> Tuple[int, int]:
+        """Converte uma posição global em (bloco, deslocamento no bloco)"""
+        inicios = self._inicios()
+        bloco = bisect_right(inicios, posicao) - 1
+        return bloco, posicao - inicios[bloco]
+
+    def faixa(self, preco_min: Optional[float], preco_max: Optional[float]):
+        """Retorna (inicio, fim) das posições com preco_min <= preço <= preco_max"""
+        if preco_min is None:
+            inicio = 0
+        else:
+            bloco = bisect_left(self._maximos, (preco_min,))
+            inicio = self._tamanho if bloco == len(self._maximos) else (
+                self._inicio_do_bloco(bloco) + bisect_left(self._precos[bloco], preco_min))
+        if preco_max is None:
+            fim = self._tamanho
+        else:
+            bloco = bisect_right(self._maximos, (preco_max, INFINITO))
+            fim = self._tamanho if bloco == len(self._maximos) else (
+                self._inicio_do_bloco(bloco) + bisect_right(self._precos[bloco], preco_max))
+        return inicio, max(inicio, fim)
+
+    def apos(self, preco: float, linha: int) -> int:
+        """Retorna a primeira posição depois de (preço, linha), exista ou não essa entrada"""
+        bloco = bisect_right(self._maximos, (preco, linha))
+        if bloco == len(self._maximos):
+            return self._tamanho
+        precos = self._precos[bloco]
+        inicio = bisect_left(precos, preco)
+        fim = bisect_right(precos, preco, inicio)
+        return self._inicio_do_bloco(bloco) + bisect_right(self._linhas[bloco], linha, inicio, fim)
+
+    def fatia(self, inicio: int, fim: int) -> List[int]:
+        """Linhas das posições [inicio, fim)"""
+        if inicio >= min(fim, self._tamanho):
+            return []
+        bloco, deslocamento = self._localizar(inicio)
+        resultado: List[int] = []
+        restante = fim - inicio
+        while restante > 0 and bloco < len(self._linhas):
+            trecho = self._linhas[bloco][deslocamento:deslocamento + restante]
+            resultado.extend(trecho)
+            restante -= len(trecho)
+            bloco, deslocamento = bloco + 1, 0
+        return resultado
+
+    def percorrer(self, inicio: int = 0) -> Iterator[Tuple[float, int]]:
+        """Percorre pares (preço, linha) a partir de uma posição, sem copiar os blocos"""
+        if inicio >= self._tamanho:
+            return
+        bloco, deslocamento = self._localizar(inicio)
+        while bloco < len(self._linhas):
+            precos, linhas = self._precos[bloco], self._linhas[bloco]
+            for posicao in range(deslocamento, len(linhas)):
+                yield precos[posicao], linhas[posicao]
+            bloco, deslocamento = bloco + 1, 0
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+
+class IndiceCategoriaPreco:
+    """Índice hash por categoria com as linhas de cada categoria ordenadas por preço
+
+    Fica sincronizado com o catálogo como observador: inclusões, substituições e
+    mudanças de preço ou categoria atualizam o índice em O(log n) mais o
+    deslocamento de um bloco da categoria, não importa o tamanho dela.
+    """
+
+    def __init__(self, catalogo):
+        self._catalogo = catalogo
+        self._categorias: Dict[str, ListaPrecos] = {}
+        self.ao_inserir_lote(0, len(catalogo))
+        catalogo.observar(self)
+
+    def _inserir(self, categoria: str, preco: float, linha: int):
+        lista = self._categorias.get(categoria)
+        if lista is None:
+            lista = self._categorias[categoria] = ListaPrecos()
+        lista.inserir(preco, linha)
+
+    def _remover(self, categoria: str, preco: float, linha: int):
+        lista = self._categorias[categoria]
+        lista.remover(preco, linha)
+        if not lista:
+            del self._categorias[categoria]
+
+    def ao_inserir_lote(self, inicio: int, fim: int):
+        """Inclui linhas novas agrupando por categoria
+
+        Categorias com poucas linhas novas recebem inserções ordenadas; as demais
+        são reordenadas de uma vez, aproveitando que o trecho existente já está
+        ordenado.
+        """
+        catalogo = self._catalogo
+        grupos: Dict[str, List] = {}
+        for linha in range(inicio, fim):
+            grupos.setdefault(catalogo.categorias[linha], []).append((catalogo.precos[linha], linha))
+        for categoria, entradas in grupos.items():
+            lista = self._categorias.get(categoria)
+            if lista is None:
+                lista = self._categorias[categoria] = ListaPrecos()
+            if len(entradas) <= 32:
+                for preco, linha in entradas:
+                    lista.inserir(preco, linha)
+                continue
+            entradas.sort()
+            if lista:
+                entradas = sorted(list(zip(lista.precos, lista.linhas)) + entradas)
+            precos, linhas = zip(*entradas)
+            lista.substituir(array("d", precos), array("q", linhas))
+
+    def ao_alterar(self, linha: int, anteriores: Optional[Dict]):
+        catalogo = self._catalogo
+        categoria = catalogo.categorias[linha]
+        preco = catalogo.precos[linha]
+        if anteriores is None:
+            self._inserir(categoria, preco, linha)
+            return
+        if "precos" not in anteriores and "categorias" not in anteriores:
+            return
+        categoria_anterior = anteriores.get("categorias", categoria)
+        preco_anterior = anteriores.get("precos", preco)
+        if categoria_anterior == categoria and preco_anterior == preco:
+            return
+        self._remover(categoria_anterior, preco_anterior, linha)
+        self._inserir(categoria, preco, linha)
+
+    def ao_alterar_coluna(self, coluna: str, linhas: Optional[List[int]]):
+        """Reordena as categorias afetadas por um reajuste de preços em massa
+
+        Reajustes proporcionais costumam preservar a ordem; nesse caso basta
+        trocar os preços, sem reordenar.
+        """
+        if coluna != "precos":
+            return
+        catalogo = self._catalogo
+        if linhas is None:
+            afetadas = list(self._categorias.values())
+        else:
+            categorias = catalogo.categorias
+            afetadas = [self._categorias[categoria] for categoria in {categorias[linha] for linha in linhas}]
+        precos = catalogo.precos
+        for lista in afetadas:
+            linhas = lista.linhas
+            novos = array("d", [precos[linha] for linha in linhas])
+            if _ordem_preservada(lista.precos, novos):
+                lista.substituir(novos, linhas)
+                continue
+            entradas = sorted(zip(novos, linhas))
+            lista.substituir(array("d", [preco for preco, _ in entradas]),
+                             array("q", [linha for _, linha in entradas]))
+
+    def buscar(self, categoria: str, preco_min: Optional[float] = None, preco_max: Optional[float] = None,
+               inicio: int = 0, limite: Optional[int] = None) -> List[int]:
+        """Retorna as linhas da categoria na faixa de preço, em ordem crescente de preço
+
+        `inicio` e `limite` paginam o resultado; o custo é O(log n + k).
+        """
+        if inicio < 0 or (limite is not None and limite < 0):
+            raise ValueError("Paginação deve usar inicio e limite não negativos")
+        lista = self._categorias.get(categoria)
+        if lista is None:
+            return []
+        primeiro, ultimo = lista.faixa(preco_min, preco_max)
+        primeiro += inicio
+        if limite is not None:
+            ultimo = min(ultimo, primeiro + limite)
+        return lista.fatia(primeiro, ultimo)
+
+    def percorrer(self, categoria: Optional[str] = None,
+                  apos: Optional[Tuple[float, int]] = None) -> Iterator[Tuple[float, int]]:
+        """Percorre pares (preço, linha) em ordem de preço, começando depois de `apos`
+
+        Sem categoria, intercala as listas de todas as categorias. Serve de base
+        para paginação por cursor: retomar uma página custa O(log n), não importa
+        quão fundo ela esteja.
+        """
+        if categoria is not None:
+            listas = [self._categorias[categoria]] if categoria in self._categorias else []
+        else:
+            listas = list(self._categorias.values())
+        fontes = [lista.percorrer(0 if apos is None else lista.apos(*apos)) for lista in listas]
+        if len(fontes) == 1:
+            return fontes[0]
+        return heapq.merge(*fontes)
+
+    def contar(self, categoria: str, preco_min: Optional[float] = None,
+               preco_max: Optional[float] = None) -> int:
+        """Conta os produtos da categoria na faixa de preço em O(log n)"""
+        lista = self._categorias.get(categoria)
+        if lista is None:
+            return 0
+        primeiro, ultimo = lista.faixa(preco_min, preco_max)
+        return ultimo - primeiro
+
+    def categorias(self) -> List[str]:
+        """Lista as categorias com ao menos um produto"""
+        return list(self._categorias)
+
+
+class IndiceIds:
+    """Linhas do catálogo ordenadas por id do produto, para percorrer o catálogo por id
+
+    Ids costumam chegar em ordem crescente, e nesse caso cada inclusão é só um
+    anexo aos arrays.
+    """
+
+    def __init__(self, catalogo):
+        self._catalogo = catalogo
+        ids = catalogo.ids
+        self.linhas = array("q", sorted(range(len(ids)), key=ids.__getitem__))
+        self.ids = array("q", [ids[linha] for linha in self.linhas])
+        catalogo.observar(self)
+
+    def _inserir(self, id: int, linha: int):
+        if not self.ids or self.ids[-1] < id:
+            self.ids.append(id)
+            self.linhas.append(linha)
+            return
+        posicao = bisect_left(self.ids, id)
+        self.ids.insert(posicao, id)
+        self.linhas.insert(posicao, linha)
+
+    def ao_alterar(self, linha: int, anteriores: Optional[Dict]):
+        # O id de uma linha nunca muda; só linhas novas interessam
+        if anteriores is None:
+            self._inserir(self._catalogo.ids[linha], linha)
+
+    def ao_inserir_lote(self, inicio: int, fim: int):
+        ids = self._catalogo.ids
+        novas = sorted(range(inicio, fim), key=ids.__getitem__)
+        if self.ids and novas and ids[novas[0]] < self.ids[-1]:
+            for linha in novas:
+                self._inserir(ids[linha], linha)
+            return
+        self.ids.extend([ids[linha] for linha in novas])
+        self.linhas.extend(novas)
+
+    def ao_alterar_coluna(self, coluna: str, linhas: Optional[List[int]]):
+        pass
+
+    def percorrer(self, apos: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """Percorre pares (id, linha) em ordem de id, começando depois do id `apos`"""
+        inicio = 0 if apos is None else bisect_right(self.ids, apos)
+        ids, linhas = self.ids, self.linhas
+        for posicao in range(inicio, len(linhas)):
+            yield ids[posicao], linhas[posicao]
@@ -0,0 +1,148 @@
+# paginacao.py - Paginação por cursor de produtos e pedidos
+import math
+from bisect import bisect_left, insort
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from itertools import count, islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class Pagina:
+    """Uma página de resultados e o cursor para pedir a seguinte (None na última página)"""
+
+    __slots__ = ("itens", "proximo_cursor")
+
+    def __init__(self, itens: List, proximo_cursor: Optional[str]):
+        self.itens = itens
+        self.proximo_cursor = proximo_cursor
+
+    def __iter__(self) -> Iterator:
+        return iter(self.itens)
+
+    def __len__(self) -> int:
+        return len(self.itens)
+
+
+def paginar(chaves_e_itens: Iterator[Tuple], limite: int, codificar) -> Tuple[List, Optional[str]]:
+    """Consome até `limite` pares (chave, item) e gera o cursor a partir da chave do último
+
+    Lê um par a mais apenas para saber se existe uma próxima página.
+    """
+    if limite < 1:
+        raise ValueError("Limite da página deve ser positivo")
+    pares = list(islice(chaves_e_itens, limite + 1))
+    itens = [item for _, item in pares[:limite]]
+    proximo = codificar(pares[limite - 1][0]) if len(pares) > limite else None
+    return itens, proximo
+
+
+def decodificar_cursor(cursor: Optional[str], tipo: str,
+                       conversores: Tuple[Callable[[str], object], ...]) -> Optional[Tuple]:
+    """Separa um cursor "tipo:campo:..." e converte cada campo com o conversor da mesma posição
+
+    Tipo diferente, número de campos diferente do de conversores ou campo que
+    não converte lançam ValueError.
+    """
+    if cursor is None:
+        return None
+    campos = cursor.split(":")
+    if campos[0] == tipo and len(campos) == len(conversores) + 1:
+        try:
+            return tuple(conversor(campo) for conversor, campo in zip(conversores, campos[1:]))
+        except (ValueError, OverflowError):
+            pass
+    raise ValueError(f"Cursor inválido para listagem por {tipo}: {cursor!r}")
+
+
+def preco_finito(campo: str) -> float:
+    """Conversor do preço de um cursor: float, mas sem nan nem infinito"""
+    preco = float(campo)
+    if not math.isfinite(preco):
+        raise ValueError(f"Preço não finito: {campo!r}")
+    return preco
+
+
+class RegistroPedidos(MutableMapping):
+    """Mapeamento {id_pedido: Pedido} que também mantém os pedidos ordenados por data de criação
+
+    A ordem é uma lista de chaves (data_criacao, sequência, id_pedido) mantida
+    com bisect.insort, pois pedidos não são guardados na ordem em que foram
+    criados: com checkouts concorrentes, um pedido criado antes pode ser pago
+    depois. A sequência de inclusão desempata pedidos do mesmo microssegundo.
+    Inclusões, substituições e remoções (inclusive por pop, update e clear)
+    passam por __setitem__ e __delitem__ e mantêm a ordem em dia.
+    """
+
+    def __init__(self):
+        self._pedidos: Dict[str, object] = {}
+        self._chaves: Dict[str, Tuple[datetime, int, str]] = {}
+        self.ordem: List[Tuple[datetime, int, str]] = []
+        self._sequencia = count()
+
+    def __getitem__(self, id_pedido: str):
+        return self._pedidos[id_pedido]
+
+    def __setitem__(self, id_pedido: str, pedido):
+        chave = self._chaves.get(id_pedido)
+        if chave is None or chave[0] != pedido.data_criacao:
+            if chave is not None:
+                self._remover_da_ordem(chave)
+            chave = (pedido.data_criacao, next(self._sequencia), id_pedido)
+            insort(self.ordem, chave)
+            self._chaves[id_pedido] = chave
+        self._pedidos[id_pedido] = pedido
+
+    def __delitem__(self, id_pedido: str):
+        del self._pedidos[id_pedido]
+        self._remover_da_ordem(self._chaves.pop(id_pedido))
+
+    def __contains__(self, id_pedido) -> bool:
+        return id_pedido in self._pedidos
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pedidos)
+
+    def __len__(self) -> int:
+        return len(self._pedidos)
+
+    def __repr__(self) -> str:
+        return f"RegistroPedidos({self._pedidos!r})"
+
+    def _remover_da_ordem(self, chave: Tuple[datetime, int, str]):
+        del self.ordem[bisect_left(self.ordem, chave)]
+
+    def percorrer(self, posicao: int = 0) -> Iterator[Tuple[Tuple[datetime, int, str], object]]:
+        """Percorre pares (chave, pedido) em ordem de criação a partir de uma posição da ordem"""
+        ordem = self.ordem
+        for atual in range(posicao, len(ordem)):
+            chave = ordem[atual]
+            yield chave, self._pedidos[chave[2]]
+
+    def posicao_desde(self, data: datetime) -> int:
+        """Primeira posição de um pedido criado em `data` ou depois"""
+        return bisect_left(self.ordem, (data,))
+
+    def posicao_apos(self, data: datetime, sequencia: int) -> int:
+        """Primeira posição depois da chave (data, sequência) de um cursor"""
+        return bisect_left(self.ordem, (data, sequencia + 1))
+
+
+_MICROSSEGUNDO = timedelta(microseconds=1)
+
+
+def codificar_cursor_pedido(chave: Tuple[datetime, int, str]) -> str:
+    """Cursor "pedido:<microssegundos>:<sequência>" com a data e a sequência do último pedido da página"""
+    data, sequencia, _ = chave
+    return f"pedido:{(data - datetime.min) // _MICROSSEGUNDO}:{sequencia}"
+
+
+def decodificar_cursor_pedido(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Data e sequência de um cursor de codificar_cursor_pedido; ValueError se malformado"""
+    campos = decodificar_cursor(cursor, "pedido", (int, int))
+    if campos is None:
+        return None
+    microssegundos, sequencia = campos
+    try:
+        return datetime.min + microssegundos * _MICROSSEGUNDO, sequencia
+    except OverflowError:
+        raise ValueError(f"Cursor inválido para listagem por pedido: {cursor!r}") from None
@@ -0,0 +1,242 @@
+# promocoes.py - Motor de promoções e cupons compilado em tabelas por categoria
+import threading
+from bisect import bisect_right
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .dinheiro import formatar_centavos, fracao, para_centavos
+
+
+class CupomInvalidoError(Exception):
+    """Exceção para cupom inexistente ou que o carrinho não atinge"""
+    pass
+
+
+def _percentual(percentual) -> Fraction:
+    valor = fracao(percentual)
+    if not 0 <= valor <= 1:
+        raise ValueError("Percentual de desconto deve estar entre 0 e 1")
+    return valor
+
+
+class DescontoCategoria:
+    """Desconto percentual (0.10 = 10%) em todos os itens da categoria, ou do catálogo com categoria None"""
+
+    def __init__(self, percentual: float, categoria: Optional[str] = None):
+        self.percentual = _percentual(percentual)
+        self.categoria = categoria
+
+
+class PrecoPorQuantidade:
+    """Desconto progressivo por linha: {quantidade mínima: percentual}, valendo a maior faixa atingida"""
+
+    def __init__(self, faixas: Dict[int, float], categoria: Optional[str] = None):
+        if not faixas or any(quantidade < 1 for quantidade in faixas):
+            raise ValueError("Faixas devem ter quantidades mínimas positivas")
+        self.faixas = {quantidade: _percentual(percentual) for quantidade, percentual in faixas.items()}
+        self.categoria = categoria
+
+
+class LeveXPagueY:
+    """Leve `leve` unidades do mesmo produto e pague `pague`, a cada grupo completo na linha"""
+
+    def __init__(self, leve: int, pague: int, categoria: Optional[str] = None):
+        if not 0 <= pague < leve:
+            raise ValueError("Leve X pague Y exige 0 <= pague < leve")
+        self.leve = leve
+        self.pague = pague
+        self.categoria = categoria
+
+
+class Cupom:
+    """Cupom de desconto percentual ou de valor fixo em reais, aplicado depois das promoções
+
+    Com `categoria`, vale só sobre os itens dessa categoria; `minimo` é o
+    subtotal já com promoções que o carrinho precisa atingir.
+    """
+
+    def __init__(self, codigo: str, percentual: float = 0.0, valor: float = 0.0, minimo: float = 0.0,
+                 categoria: Optional[str] = None):
+        if bool(percentual) == bool(valor) or valor < 0:
+            raise ValueError("Cupom deve ter um percentual ou um valor positivo, não os dois")
+        self.codigo = codigo
+        self.percentual = _percentual(percentual)
+        self.valor = valor
+        self.minimo = minimo
+        self.valor_centavos = para_centavos(valor)
+        self.minimo_centavos = para_centavos(minimo)
+        self.categoria = categoria
+
+
+class _TabelaCategoria:
+    """Regras de uma categoria reduzidas ao que importa na hora de precificar
+
+    O desconto percentual fixo e as faixas viram uma escada de limites com o
+    melhor percentual (numerador, denominador) a partir de cada um, já sem
+    faixas que não melhoram a anterior. De leve/pague fica o menor `pague`
+    por `leve`, e as unidades grátis por quantidade são memorizadas no
+    primeiro uso.
+    """
+
+    __slots__ = ("limites", "percentuais", "leve_pague", "_gratis")
+
+    def __init__(self, percentual: Fraction, faixas: Dict[int, Fraction], leve_pague: Dict[int, int]):
+        self.limites: List[int] = [0]
+        self.percentuais: List[Tuple[int, int]] = [(0, 1)]
+        melhor = Fraction(0)
+        for quantidade, desconto in sorted({1: percentual, **faixas}.items()):
+            desconto = max(desconto, percentual)
+            if desconto > melhor:
+                melhor = desconto
+                self.limites.append(quantidade)
+                self.percentuais.append(desconto.as_integer_ratio())
+        self.leve_pague = sorted(leve_pague.items())
+        self._gratis: Dict[int, int] = {}
+
+    def percentual(self, quantidade: int) -> Tuple[int, int]:
+        limites = self.limites
+        if len(limites) == 1:
+            return 0, 1
+        return self.percentuais[bisect_right(limites, quantidade) - 1]
+
+    def gratis(self, quantidade: int) -> int:
+        gratis = self._gratis.get(quantidade)
+        if gratis is None:
+            gratis = max(((quantidade // leve) * (leve - pague) for leve, pague in self.leve_pague), default=0)
+            self._gratis[quantidade] = gratis
+        return gratis
+
+
+class Precificacao:
+    """Resultado de MotorPromocoes.precificar, em centavos exatos"""
+
+    __slots__ = ("subtotal", "descontos_por_item", "desconto_promocoes", "cupom", "desconto_cupom", "total")
+
+    def __init__(self, subtotal: int, descontos_por_item: Dict[int, int], desconto_promocoes: int,
+                 cupom: Optional[str], desconto_cupom: int):
+        self.subtotal = subtotal
+        self.descontos_por_item = descontos_por_item  # {produto_id: desconto}, só linhas com desconto
+        self.desconto_promocoes = desconto_promocoes
+        self.cupom = cupom
+        self.desconto_cupom = desconto_cupom
+        self.total = subtotal - desconto_promocoes - desconto_cupom
+
+    @property
+    def desconto_total(self) -> int:
+        return self.desconto_promocoes + self.desconto_cupom
+
+
+class MotorPromocoes:
+    """Promoções e cupons compilados em tabelas por categoria
+
+    A compilação junta as regras de cada categoria (e as sem categoria, que
+    valem para todas) em uma _TabelaCategoria, então precificar um carrinho
+    custa O(linhas) qualquer que seja o número de regras ativas. Cada linha
+    leva só a melhor promoção que se aplica a ela, sem acumular; o cupom
+    vem depois, sobre o subtotal já com promoções. Descontos são arredondados
+    para baixo, como o do PIX.
+
+    Regras adicionadas depois da compilação fazem o motor recompilar no
+    próximo uso.
+    """
+
+    def __init__(self, regras: Iterable = ()):
+        self._regras: List = []
+        self._cupons: Dict[str, Cupom] = {}
+        # ({categoria: tabela}, tabela das categorias sem regra própria), ou None até compilar
+        self._compilado: Optional[Tuple[Dict[str, _TabelaCategoria], _TabelaCategoria]] = None
+        self._trava = threading.Lock()
+        for regra in regras:
+            self.adicionar(regra)
+
+    def adicionar(self, regra):
+        """Adiciona uma promoção ou um cupom"""
+        with self._trava:
+            if isinstance(regra, Cupom):
+                self._cupons[regra.codigo] = regra
+            elif isinstance(regra, (DescontoCategoria, PrecoPorQuantidade, LeveXPagueY)):
+                self._regras.append(regra)
+                self._compilado = None
+            else:
+                raise TypeError(f"Regra de promoção desconhecida: {type(regra).__name__}")
+
+    def remover_cupom(self, codigo: str):
+        with self._trava:
+            self._cupons.pop(codigo, None)
+
+    @property
+    def tem_promocoes(self) -> bool:
+        """Se há alguma promoção (não cupom) cadastrada"""
+        return bool(self._regras)
+
+    def __len__(self) -> int:
+        return len(self._regras) + len(self._cupons)
+
+    def compilar(self) -> Tuple[Dict[str, _TabelaCategoria], _TabelaCategoria]:
+        """Monta as tabelas por categoria; chamado automaticamente no primeiro uso depois de mudanças"""
+        with self._trava:
+            if self._compilado is not None:
+                return self._compilado
+            # {categoria: [percentual, {quantidade: percentual}, {leve: pague}]}, com None para "todas"
+            acumulado: Dict[Optional[str], list] = {}
+            for regra in self._regras:
+                percentual, faixas, leve_pague = acumulado.setdefault(regra.categoria, [Fraction(0), {}, {}])
+                if isinstance(regra, DescontoCategoria):
+                    acumulado[regra.categoria][0] = max(percentual, regra.percentual)
+                elif isinstance(regra, PrecoPorQuantidade):
+                    for quantidade, desconto in regra.faixas.items():
+                        faixas[quantidade] = max(faixas.get(quantidade, desconto), desconto)
+                else:
+                    leve_pague[regra.leve] = min(leve_pague.get(regra.leve, regra.pague), regra.pague)
+            percentual_geral, faixas_gerais, leve_pague_geral = acumulado.pop(None, [Fraction(0), {}, {}])
+            tabelas = {}
+            for categoria, (percentual, faixas, leve_pague) in acumulado.items():
+                for quantidade, desconto in faixas_gerais.items():
+                    faixas[quantidade] = max(faixas.get(quantidade, desconto), desconto)
+                for leve, pague in leve_pague_geral.items():
+                    leve_pague[leve] = min(leve_pague.get(leve, pague), pague)
+                tabelas[categoria] = _TabelaCategoria(max(percentual, percentual_geral), faixas, leve_pague)
+            self._compilado = (tabelas, _TabelaCategoria(percentual_geral, faixas_gerais, leve_pague_geral))
+            return self._compilado
+
+    def precificar(self, carrinho, cupom: Optional[str] = None) -> Precificacao:
+        """Aplica as promoções às linhas do carrinho e, se informado, o cupom
+
+        Lança CupomInvalidoError se o cupom não existir ou o carrinho não
+        atingir o mínimo.
+        """
+        tabelas, padrao = self._compilado or self.compilar()
+        cupom_regra = None
+        if cupom is not None:
+            cupom_regra = self._cupons.get(cupom)
+            if cupom_regra is None:
+                raise CupomInvalidoError(f"Cupom {cupom!r} não existe")
+        categoria_cupom = cupom_regra.categoria if cupom_regra is not None else None
+
+        subtotal = desconto_promocoes = elegivel = 0
+        descontos: Dict[int, int] = {}
+        for produto_id, item in carrinho.itens.items():
+            produto = item.produto
+            quantidade = item.quantidade
+            preco = para_centavos(produto.preco)
+            valor = preco * quantidade
+            tabela = tabelas.get(produto.categoria, padrao)
+            numerador, denominador = tabela.percentual(quantidade)
+            desconto = (valor * numerador) // denominador
+            if tabela.leve_pague:
+                desconto = max(desconto, preco * tabela.gratis(quantidade))
+            subtotal += valor
+            if desconto:
+                desconto_promocoes += desconto
+                descontos[produto_id] = desconto
+            if categoria_cupom is None or produto.categoria == categoria_cupom:
+                elegivel += valor - desconto
+
+        desconto_cupom = 0
+        if cupom_regra is not None:
+            if subtotal - desconto_promocoes < cupom_regra.minimo_centavos:
+                raise CupomInvalidoError(f"Cupom {cupom!r} exige compras a partir de "
+                                         f"{formatar_centavos(cupom_regra.minimo_centavos)}")
+            numerador, denominador = cupom_regra.percentual.as_integer_ratio()
+            desconto_cupom = min(elegivel, (elegivel * numerador) // denominador + cupom_regra.valor_centavos)
+        return Precificacao(subtotal, descontos, desconto_promocoes, cupom, desconto_cupom)
@@ -0,0 +1,137 @@
+# rankings.py - Rankings incrementais de estoque baixo e mais vendidos
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Cada entrada do heap é um único int: chave * _FATOR + linha. Ints ocupam
+# menos que tuplas e a comparação continua sendo por (chave, linha).
+_FATOR = 1 << 40
+
+
+class Ranking:
+    """Linhas ordenadas por um valor inteiro, em um heap com remoção preguiçosa
+
+    Atualizar uma linha só empilha uma entrada nova, em O(log n); entradas cujo
+    valor não é mais o atual são descartadas quando chegam ao topo. Quando as
+    entradas obsoletas passam a dominar, o heap é reconstruído.
+    """
+
+    def __init__(self, valor_atual: Callable[[int], Optional[int]], crescente: bool = True):
+        self._valor_atual = valor_atual
+        self._sinal = 1 if crescente else -1
+        self._heap: List[int] = []
+        self._tamanho_reconstrucao = 0
+
+    def _entrada(self, linha: int, valor: int) -> int:
+        return self._sinal * valor * _FATOR + linha
+
+    def _decodificar(self, entrada: int) -> Tuple[int, int]:
+        linha = entrada % _FATOR
+        return linha, self._sinal * ((entrada - linha) // _FATOR)
+
+    def atualizar(self, linha: int, valor: int):
+        """Registra o valor atual de uma linha"""
+        heapq.heappush(self._heap, self._entrada(linha, valor))
+        if len(self._heap) > 2 * self._tamanho_reconstrucao + 1024:
+            self._reconstruir()
+
+    def reconstruir(self, linhas_valores: Iterable[Tuple[int, int]]):
+        """Descarta o heap e o monta de novo a partir de todos os pares (linha, valor) atuais"""
+        self._heap = [self._entrada(linha, valor) for linha, valor in linhas_valores]
+        heapq.heapify(self._heap)
+        self._tamanho_reconstrucao = len(self._heap)
+
+    def _reconstruir(self):
+        atuais = {}
+        for entrada in self._heap:
+            linha, valor = self._decodificar(entrada)
+            if self._valor_atual(linha) == valor:
+                atuais[linha] = valor
+        self.reconstruir(atuais.items())
+
+    def primeiros(self, k: Optional[int] = None, ate: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Retorna até k pares (linha, valor) do topo do ranking
+
+        Com `ate`, para no primeiro valor além dele (maior, no ranking crescente;
+        menor, no decrescente). Custa O(k log n) mais as entradas obsoletas
+        descartadas pelo caminho.
+        """
+        heap = self._heap
+        resultado = []
+        vistas = set()
+        while heap and (k is None or len(resultado) < k):
+            entrada = heap[0]
+            linha, valor = self._decodificar(entrada)
+            if ate is not None and self._sinal * valor > self._sinal * ate:
+                break
+            heapq.heappop(heap)
+            if linha not in vistas and self._valor_atual(linha) == valor:
+                vistas.add(linha)
+                resultado.append((linha, valor))
+        # As entradas válidas voltam ao heap; as obsoletas ficam descartadas
+        for linha, valor in resultado:
+            heapq.heappush(heap, self._entrada(linha, valor))
+        return resultado
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class RankingEstoque:
+    """Linhas do catálogo em ordem crescente de estoque, atualizadas como observador"""
+
+    def __init__(self, catalogo):
+        self._catalogo = catalogo
+        self._ranking = Ranking(self._estoque)
+        self._ranking.reconstruir(enumerate(catalogo.estoques))
+        catalogo.observar(self)
+
+    def _estoque(self, linha: int) -> int:
+        return self._catalogo.estoques[linha]
+
+    def ao_alterar(self, linha: int, anteriores: Optional[Dict]):
+        if anteriores is None or "estoques" in anteriores:
+            self._ranking.atualizar(linha, self._catalogo.estoques[linha])
+
+    def ao_inserir_lote(self, inicio: int, fim: int):
+        estoques = self._catalogo.estoques
+        for linha in range(inicio, fim):
+            self._ranking.atualizar(linha, estoques[linha])
+
+    def ao_alterar_coluna(self, coluna: str, linhas: Optional[List[int]]):
+        if coluna != "estoques":
+            return
+        estoques = self._catalogo.estoques
+        if linhas is None:
+            self._ranking.reconstruir(enumerate(estoques))
+            return
+        for linha in linhas:
+            self._ranking.atualizar(linha, estoques[linha])
+
+    def menores(self, k: Optional[int] = None, maximo: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Retorna até k pares (linha, estoque) com os menores estoques, opcionalmente só até `maximo`"""
+        return self._ranking.primeiros(k, maximo)
+
+
+class RankingVendas:
+    """Unidades vendidas por linha do catálogo, em ordem decrescente"""
+
+    def __init__(self):
+        self._vendidos: Dict[int, int] = {}  # {linha: unidades}
+        self._ranking = Ranking(self._vendidos.get, crescente=False)
+
+    def registrar(self, linha: int, quantidade: int):
+        """Soma (ou, com quantidade negativa, estorna) unidades vendidas de uma linha"""
+        vendidos = self._vendidos.get(linha, 0) + quantidade
+        if vendidos > 0:
+            self._vendidos[linha] = vendidos
+            self._ranking.atualizar(linha, vendidos)
+        else:
+            self._vendidos.pop(linha, None)
+
+    def vendidos(self, linha: int) -> int:
+        """Unidades vendidas de uma linha"""
+        return self._vendidos.get(linha, 0)
+
+    def maiores(self, k: Optional[int] = None, minimo: Optional[int] = None) -> List[Tuple[int, int]]:
+        """Retorna até k pares (linha, unidades) mais vendidos, opcionalmente só com ao menos `minimo` unidades"""
+        return self._ranking.primeiros(k, minimo)
@@ -0,0 +1,186 @@
+# reservas.py - Reservas de estoque com prazo, expiradas por uma roda de temporizadores
+import math
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from .ecommerce import EstoqueInsuficienteError
+
+
+class RodaTemporizadores:
+    """Roda de temporizadores (hashed timing wheel)
+
+    O tempo é dividido em tiques de `resolucao` segundos e cada tique cai em uma
+    das `tamanho` posições da roda; prazos mais longos que uma volta guardam
+    quantas voltas faltam. Agendar e cancelar custam O(1), e avançar a roda
+    só visita as posições dos tiques decorridos.
+    """
+
+    def __init__(self, resolucao: float = 1.0, tamanho: int = 512, inicio: float = 0.0):
+        if resolucao <= 0 or tamanho < 1:
+            raise ValueError("Resolução e tamanho da roda devem ser positivos")
+        self.resolucao = resolucao
+        self._posicoes: List[Dict[Hashable, int]] = [{} for _ in range(tamanho)]  # {chave: voltas}
+        self._posicao_da_chave: Dict[Hashable, int] = {}
+        self._tique = math.floor(inicio / resolucao)  # último tique processado
+
+    def agendar(self, chave: Hashable, instante: float):
+        """Agenda (ou reagenda) a expiração de uma chave para o primeiro tique a partir de `instante`"""
+        self.cancelar(chave)
+        tique = max(math.ceil(instante / self.resolucao), self._tique + 1)
+        distancia = tique - self._tique
+        posicao = tique % len(self._posicoes)
+        self._posicoes[posicao][chave] = (distancia - 1) // len(self._posicoes)
+        self._posicao_da_chave[chave] = posicao
+
+    def cancelar(self, chave: Hashable):
+        posicao = self._posicao_da_chave.pop(chave, None)
+        if posicao is not None:
+            del self._posicoes[posicao][chave]
+
+    def avancar(self, agora: float) -> List[Hashable]:
+        """Processa os tiques até `agora` e retorna as chaves expiradas"""
+        alvo = math.floor(agora / self.resolucao)
+        passos = alvo - self._tique
+        expiradas = []
+        tamanho = len(self._posicoes)
+        # Depois de uma pausa longa cada posição é visitada uma vez só,
+        # descontando de uma vez todas as voltas que se passaram
+        for deslocamento in range(1, min(passos, tamanho) + 1):
+            posicao = self._posicoes[(self._tique + deslocamento) % tamanho]
+            if not posicao:
+                continue
+            visitas = (passos - deslocamento) // tamanho + 1
+            for chave, voltas in list(posicao.items()):
+                if voltas < visitas:
+                    del posicao[chave]
+                    del self._posicao_da_chave[chave]
+                    expiradas.append(chave)
+                else:
+                    posicao[chave] = voltas - visitas
+        self._tique = max(self._tique, alvo)
+        return expiradas
+
+    def __len__(self) -> int:
+        return len(self._posicao_da_chave)
+
+
+class GerenciadorReservas:
+    """Reservas de unidades de estoque feitas por um dono (em geral, um carrinho)
+
+    Unidades reservadas não podem ser prometidas a outros donos até a reserva
+    ser consumida no pedido, liberada ou expirar após `duracao` segundos sem
+    renovação. O estoque só é baixado quando a reserva é consumida.
+    """
+
+    def __init__(self, duracao: float = 900.0, resolucao: float = 1.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        if duracao <= 0:
+            raise ValueError("Duração da reserva deve ser positiva")
+        self.duracao = duracao
+        self._relogio = relogio
+        self._roda = RodaTemporizadores(resolucao, inicio=relogio())
+        self._reservas: Dict[Tuple[Hashable, int], int] = {}  # {(dono, produto_id): quantidade}
+        self._por_dono: Dict[Hashable, Dict[int, int]] = {}  # {dono: {produto_id: quantidade}}
+        self._reservado: Dict[int, int] = {}  # {produto_id: total reservado}
+        self._trava = threading.RLock()
+
+    def _expirar(self):
+        for dono, produto_id in self._roda.avancar(self._relogio()):
+            self._remover(dono, produto_id)
+
+    def _remover(self, dono: Hashable, produto_id: int):
+        quantidade = self._reservas.pop((dono, produto_id))
+        self._roda.cancelar((dono, produto_id))
+        do_dono = self._por_dono[dono]
+        del do_dono[produto_id]
+        if not do_dono:
+            del self._por_dono[dono]
+        restante = self._reservado[produto_id] - quantidade
+        if restante:
+            self._reservado[produto_id] = restante
+        else:
+            del self._reservado[produto_id]
+
+    def _livre(self, produto, dono: Hashable) -> int:
+        """Unidades que o dono pode usar: estoque menos as reservas dos outros donos"""
+        produto_id = produto.id
+        return (produto.quantidade_estoque - self._reservado.get(produto_id, 0)
+                + self._reservas.get((dono, produto_id), 0))
+
+    def reservar(self, dono: Hashable, produto, quantidade: int):
+        """Reserva mais `quantidade` unidades do produto para o dono e renova o prazo da reserva"""
+        if quantidade <= 0:
+            raise ValueError("Quantidade reservada deve ser positiva")
+        with self._trava:
+            self._expirar()
+            chave = (dono, produto.id)
+            total = self._reservas.get(chave, 0) + quantidade
+            livre = self._livre(produto, dono)
+            if total > livre:
+                raise EstoqueInsuficienteError(f"Estoque insuficiente. Disponível para reserva: {livre}")
+            self._reservas[chave] = total
+            self._por_dono.setdefault(dono, {})[produto.id] = total
+            self._reservado[produto.id] = self._reservado.get(produto.id, 0) + quantidade
+            self._roda.agendar(chave, self._relogio() + self.duracao)
+
+    def liberar(self, dono: Hashable, produto_id: Optional[int] = None, quantidade: Optional[int] = None):
+        """Libera as reservas do dono, de um produto ou de todos
+
+        Com `quantidade`, devolve só essas unidades da reserva do produto; o
+        restante continua reservado com o mesmo prazo.
+        """
+        if quantidade is not None and quantidade <= 0:
+            raise ValueError("Quantidade liberada deve ser positiva")
+        with self._trava:
+            if quantidade is not None:
+                chave = (dono, produto_id)
+                restante = self._reservas.get(chave, 0) - quantidade
+                if restante > 0:
+                    self._reservas[chave] = restante
+                    self._por_dono[dono][produto_id] = restante
+                    self._reservado[produto_id] -= quantidade
+                    return
+            produtos = list(self._por_dono.get(dono, ())) if produto_id is None else [produto_id]
+            for produto_id in produtos:
+                if (dono, produto_id) in self._reservas:
+                    self._remover(dono, produto_id)
+
+    def reservas_de(self, dono: Hashable) -> Dict[int, int]:
+        """Retorna {produto_id: quantidade} reservado pelo dono"""
+        with self._trava:
+            self._expirar()
+            return dict(self._por_dono.get(dono, {}))
+
+    def reservado(self, produto_id: int) -> int:
+        """Total de unidades do produto reservadas por todos os donos"""
+        with self._trava:
+            self._expirar()
+            return self._reservado.get(produto_id, 0)
+
+    def disponivel(self, produto) -> int:
+        """Unidades do produto que ainda podem ser reservadas ou vendidas sem reserva"""
+        with self._trava:
+            self._expirar()
+            return produto.quantidade_estoque - self._reservado.get(produto.id, 0)
+
+    def conferir(self, dono: Hashable, itens):
+        """Confere se o dono pode levar todos os itens (linhas de carrinho) com suas reservas e o estoque livre"""
+        with self._trava:
+            self._expirar()
+            falhas = [f"{item.produto.id} (disponível: {self._livre(item.produto, dono)})"
+                      for item in itens if item.quantidade > self._livre(item.produto, dono)]
+            if falhas:
+                raise EstoqueInsuficienteError(f"Estoque insuficiente para os produtos {', '.join(falhas)}")
+
+    def consumir(self, dono: Hashable, itens):
+        """Baixa o estoque dos itens usando as reservas do dono, tudo ou nada, e encerra as reservas"""
+        itens = list(itens)
+        with self._trava:
+            self.conferir(dono, itens)
+            for item in itens:
+                item.produto.atualizar_estoque(item.quantidade)
+            self.liberar(dono)
+
+    def __len__(self) -> int:
+        return len(self._reservas)
@@ -0,0 +1,69 @@
+# serializacao.py - Cache de produtos já codificados em JSON
+import json
+from typing import Dict, Iterable, List, Optional
+
+# Mesmo formato de json.dumps(produto.obter_informacoes(), ensure_ascii=False)
+_CODIFICADOR = json.JSONEncoder(ensure_ascii=False)
+
+
+def codificar_produto(produto) -> bytes:
+    """Codifica obter_informacoes() de um produto em JSON UTF-8"""
+    return _CODIFICADOR.encode(produto.obter_informacoes()).encode("utf-8")
+
+
+class CacheSerializacao:
+    """Bytes JSON de cada linha do catálogo, prontos para ir na resposta
+
+    O cache observa o catálogo: qualquer gravação em uma linha (preço, estoque,
+    textos ou substituição do produto) descarta só a entrada daquela linha.
+    Quando passa de `capacidade` entradas, as mais antigas são descartadas.
+    """
+
+    def __init__(self, catalogo, capacidade: int = 100_000):
+        if capacidade < 1:
+            raise ValueError("Capacidade do cache deve ser positiva")
+        self._catalogo = catalogo
+        self.capacidade = capacidade
+        self._entradas: Dict[int, bytes] = {}  # {linha: json}
+        catalogo.observar(self)
+
+    def ao_alterar(self, linha: int, anteriores: Optional[Dict]):
+        self._entradas.pop(linha, None)
+
+    def ao_inserir_lote(self, inicio: int, fim: int):
+        # Linhas novas ainda não foram codificadas
+        pass
+
+    def ao_alterar_coluna(self, coluna: str, linhas: Optional[List[int]]):
+        if linhas is None:
+            self._entradas.clear()
+            return
+        for linha in linhas:
+            self._entradas.pop(linha, None)
+
+    def codificar_linha(self, linha: int) -> bytes:
+        """Retorna o JSON da linha, codificando-a apenas se não estiver no cache"""
+        codificado = self._entradas.get(linha)
+        if codificado is None:
+            codificado = codificar_produto(self._catalogo.visao(linha))
+            if len(self._entradas) >= self.capacidade:
+                del self._entradas[next(iter(self._entradas))]
+            self._entradas[linha] = codificado
+        return codificado
+
+    def codificar(self, produto) -> bytes:
+        """Retorna o JSON de um produto; produtos fora deste catálogo são codificados sem cache"""
+        if produto._catalogo is self._catalogo:
+            return self.codificar_linha(produto._linha)
+        return codificar_produto(produto)
+
+    def codificar_varios(self, produtos: Iterable) -> bytes:
+        """Codifica uma lista de produtos como um array JSON, reaproveitando as entradas do cache"""
+        return b"[" + b",".join([self.codificar(produto) for produto in produtos]) + b"]"
+
+    def limpar(self):
+        """Descarta todas as entradas"""
+        self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
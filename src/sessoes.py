@@ -0,0 +1,282 @@
+# sessoes.py - Registro de carrinhos por sessão com despejo LRU e expiração por ociosidade
+import hashlib
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from .ecommerce import Carrinho, ItemCarrinho
+
+# Formato binário do carrinho: cabeçalho seguido das colunas de ids e de
+# quantidades, em little-endian. Ids cabem em 4 bytes e quantidades em 2 no
+# caso comum; os bits de `larguras` indicam as colunas que precisaram de 8.
+MAGICO = b"CR"
+VERSAO = 1
+_CABECALHO = struct.Struct("<2sBBI")  # mágico, versão, larguras, linhas
+_IDS_LARGOS = 1
+_QUANTIDADES_LARGAS = 2
+
+
+class CarrinhoInvalidoError(Exception):
+    """Exceção para dados que não são um carrinho serializado compatível"""
+    pass
+
+
+_produto_do_item = ItemCarrinho.produto  # descritor do slot herdado
+
+
+class ItemPreguicoso(ItemCarrinho):
+    """Linha de carrinho reidratada que só busca o produto no primeiro acesso
+
+    Conferir ids e quantidades, alterar quantidades e serializar de novo não
+    tocam no catálogo.
+    """
+
+    __slots__ = ("produto_id", "_obter_produto")
+
+    def __init__(self, produto_id: int, quantidade: int, obter_produto: Callable[[int], object]):
+        self.produto_id = produto_id
+        self.quantidade = quantidade
+        self._obter_produto = obter_produto
+
+    @property
+    def produto(self):
+        try:
+            return _produto_do_item.__get__(self, ItemCarrinho)
+        except AttributeError:
+            pass
+        produto = self._obter_produto(self.produto_id)
+        if produto is None:
+            raise LookupError(f"Produto {self.produto_id} do carrinho não está mais no catálogo")
+        _produto_do_item.__set__(self, produto)
+        return produto
+
+    @produto.setter
+    def produto(self, produto):
+        _produto_do_item.__set__(self, produto)
+
+
+def _coluna(tipo_estreito: str, valores) -> array:
+    try:
+        coluna = array(tipo_estreito, valores)
+    except OverflowError:
+        coluna = array("q", valores)
+    if sys.byteorder == "big":
+        coluna.byteswap()
+    return coluna
+
+
+def serializar_carrinho(carrinho: Carrinho) -> bytes:
+    """Codifica só os ids e as quantidades do carrinho, sem os produtos"""
+    ids = _coluna("I", carrinho.itens)
+    quantidades = _coluna("H", [item.quantidade for item in carrinho.itens.values()])
+    larguras = (_IDS_LARGOS if ids.typecode == "q" else 0) | (
+        _QUANTIDADES_LARGAS if quantidades.typecode == "q" else 0)
+    return _CABECALHO.pack(MAGICO, VERSAO, larguras, len(ids)) + ids.tobytes() + quantidades.tobytes()
+
+
+class CarrinhoRestaurado(Carrinho):
+    """Carrinho recriado por desserializar_carrinho
+
+    `descartados` traz {produto_id: quantidade} das linhas deixadas de fora
+    porque o produto não está no catálogo.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.descartados: Dict[int, int] = {}
+
+
+def desserializar_carrinho(dados: bytes, obter_produto: Callable[[int], object],
+                           existe: Optional[Callable[[int], bool]] = None) -> CarrinhoRestaurado:
+    """Recria um carrinho serializado; os produtos são buscados por `obter_produto` só quando usados
+
+    Com `existe`, as linhas de produtos fora do catálogo são descartadas e
+    relatadas em `descartados`, em vez de falharem com LookupError a cada uso.
+    O estoque não é conferido de novo e o total é recalculado na primeira leitura.
+    """
+    try:
+        magico, versao, larguras, linhas = _CABECALHO.unpack_from(dados)
+    except struct.error:
+        raise CarrinhoInvalidoError("Dados curtos demais para um carrinho serializado") from None
+    if magico != MAGICO or versao != VERSAO:
+        raise CarrinhoInvalidoError(f"Carrinho serializado incompatível (versão {versao})")
+    ids = array("q" if larguras & _IDS_LARGOS else "I")
+    quantidades = array("q" if larguras & _QUANTIDADES_LARGAS else "H")
+    meio = _CABECALHO.size + linhas * ids.itemsize
+    fim = meio + linhas * quantidades.itemsize
+    if len(dados) != fim:
+        raise CarrinhoInvalidoError(f"Tamanho inválido: esperados {fim} bytes, recebidos {len(dados)}")
+    dados = memoryview(dados)
+    ids.frombytes(dados[_CABECALHO.size:meio])
+    quantidades.frombytes(dados[meio:fim])
+    if sys.byteorder == "big":
+        ids.byteswap()
+        quantidades.byteswap()
+    carrinho = CarrinhoRestaurado()
+    itens = {}
+    for produto_id, quantidade in zip(ids, quantidades):
+        if existe is None or existe(produto_id):
+            itens[produto_id] = ItemPreguicoso(produto_id, quantidade, obter_produto)
+        else:
+            carrinho.descartados[produto_id] = quantidade
+    carrinho._restaurar(itens)
+    return carrinho
+
+
+class RegistroCarrinhos:
+    """Carrinhos por sessão, limitados em quantidade de carrinhos e de linhas
+
+    Cada acesso move o carrinho para o fim da fila LRU. Carrinhos ociosos por
+    mais de `ttl_ocioso` segundos expiram e, quando um limite é excedido, os
+    menos usados são despejados. Com `diretorio` os carrinhos despejados ou
+    expirados são gravados em disco no formato de serializar_carrinho e
+    reidratados no próximo acesso à sessão, buscando os produtos sob demanda;
+    com `existe`, linhas de produtos que saíram do catálogo são descartadas na
+    reidratação (veja desserializar_carrinho) e contadas em linhas_descartadas.
+
+    As linhas de um carrinho são contadas a cada acesso, então alterações feitas
+    depois de obter o carrinho entram na conta no acesso seguinte.
+    """
+
+    def __init__(self, obter_produto: Callable[[int], object], max_carrinhos: int = 10_000,
+                 max_linhas: int = 1_000_000, ttl_ocioso: float = 1800.0,
+                 diretorio: Optional[str] = None, relogio: Callable[[], float] = time.monotonic,
+                 existe: Optional[Callable[[int], bool]] = None):
+        if max_carrinhos < 1 or max_linhas < 1 or ttl_ocioso <= 0:
+            raise ValueError("Limites e TTL do registro de carrinhos devem ser positivos")
+        self._obter_produto = obter_produto
+        self._existe = existe
+        self.max_carrinhos = max_carrinhos
+        self.max_linhas = max_linhas
+        self.ttl_ocioso = ttl_ocioso
+        self.diretorio = diretorio
+        self._relogio = relogio
+        self._carrinhos: "OrderedDict[str, Carrinho]" = OrderedDict()
+        self._acessos: Dict[str, float] = {}
+        self._linhas: Dict[str, int] = {}
+        self._total_linhas = 0
+        self._trava = threading.RLock()
+        self._estatisticas = {"acertos": 0, "faltas": 0, "reidratados": 0,
+                              "despejados": 0, "expirados": 0, "gravados_em_disco": 0,
+                              "linhas_descartadas": 0}
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def obter(self, sessao: str) -> Carrinho:
+        """Retorna o carrinho da sessão, reidratando-o do disco ou criando um vazio se preciso"""
+        with self._trava:
+            agora = self._relogio()
+            self._expirar(agora)
+            carrinho = self._carrinhos.get(sessao)
+            if carrinho is not None:
+                self._estatisticas["acertos"] += 1
+                self._carrinhos.move_to_end(sessao)
+            else:
+                carrinho = self._ler_do_disco(sessao)
+                if carrinho is None:
+                    self._estatisticas["faltas"] += 1
+                    carrinho = Carrinho()
+                else:
+                    self._estatisticas["reidratados"] += 1
+                self._carrinhos[sessao] = carrinho
+            self._acessos[sessao] = agora
+            self._contar_linhas(sessao, carrinho)
+            self._despejar(manter=sessao)
+            return carrinho
+
+    def mesclar_sessoes(self, origem: str, destino: str, politica: str = "somar") -> Carrinho:
+        """Mescla o carrinho da sessão `origem` (visitante) no de `destino` (conta) e descarta a origem
+
+        Se a mescla falhar por estoque, nenhuma das duas sessões é alterada.
+        """
+        with self._trava:
+            # O destino é obtido por último para não ser despejado enquanto é mesclado
+            convidado = self.obter(origem)
+            carrinho = self.obter(destino)
+            carrinho.mesclar(convidado, politica)
+            self.descartar(origem)
+            self._contar_linhas(destino, carrinho)
+            self._despejar(manter=destino)
+            return carrinho
+
+    def descartar(self, sessao: str):
+        """Remove o carrinho da sessão da memória e do disco (por exemplo, após o checkout)"""
+        with self._trava:
+            if sessao in self._carrinhos:
+                self._remover(sessao)
+            if self.diretorio is not None:
+                try:
+                    os.remove(self._caminho(sessao))
+                except FileNotFoundError:
+                    pass
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Contadores de acertos, faltas, reidratações, despejos e expirações, mais a ocupação atual"""
+        with self._trava:
+            return dict(self._estatisticas, carrinhos=len(self._carrinhos), linhas=self._total_linhas)
+
+    def __contains__(self, sessao: str) -> bool:
+        return sessao in self._carrinhos
+
+    def __len__(self) -> int:
+        return len(self._carrinhos)
+
+    def _contar_linhas(self, sessao: str, carrinho: Carrinho):
+        linhas = len(carrinho.itens)
+        self._total_linhas += linhas - self._linhas.get(sessao, 0)
+        self._linhas[sessao] = linhas
+
+    def _expirar(self, agora: float):
+        # A fila está em ordem de último acesso: os ociosos ficam no começo
+        while self._carrinhos:
+            sessao = next(iter(self._carrinhos))
+            if agora - self._acessos[sessao] <= self.ttl_ocioso:
+                break
+            self._estatisticas["expirados"] += 1
+            self._guardar_em_disco(sessao, self._remover(sessao))
+
+    def _despejar(self, manter: str):
+        while len(self._carrinhos) > 1 and (len(self._carrinhos) > self.max_carrinhos
+                                            or self._total_linhas > self.max_linhas):
+            sessao = next(iter(self._carrinhos))
+            if sessao == manter:
+                break
+            self._estatisticas["despejados"] += 1
+            self._guardar_em_disco(sessao, self._remover(sessao))
+
+    def _remover(self, sessao: str) -> Carrinho:
+        carrinho = self._carrinhos.pop(sessao)
+        del self._acessos[sessao]
+        self._total_linhas -= self._linhas.pop(sessao)
+        return carrinho
+
+    def _caminho(self, sessao: str) -> str:
+        nome = hashlib.sha1(sessao.encode("utf-8")).hexdigest()
+        return os.path.join(self.diretorio, f"{nome}.carrinho")
+
+    def _guardar_em_disco(self, sessao: str, carrinho: Carrinho):
+        if self.diretorio is None or not carrinho.itens:
+            return
+        with open(self._caminho(sessao), "wb") as arquivo:
+            arquivo.write(serializar_carrinho(carrinho))
+        self._estatisticas["gravados_em_disco"] += 1
+
+    def _ler_do_disco(self, sessao: str) -> Optional[Carrinho]:
+        if self.diretorio is None:
+            return None
+        caminho = self._caminho(sessao)
+        try:
+            with open(caminho, "rb") as arquivo:
+                dados = arquivo.read()
+        except FileNotFoundError:
+            return None
+        # O arquivo só é apagado depois de reidratado: dados inválidos continuam em disco
+        carrinho = desserializar_carrinho(dados, self._obter_produto, self._existe)
+        os.remove(caminho)
+        self._estatisticas["linhas_descartadas"] += len(carrinho.descartados)
+        return carrinho
@@ -0,0 +1,202 @@
+# snapshot.py - Snapshots binários do catálogo, abertos por mmap
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, List
+
+from .catalogo import CatalogoColunar, ColunaDicionario
+
+MAGICO = b"ECOMSNAP"
+VERSAO = 1
+
+# Seções na ordem em que são gravadas; cada uma começa alinhada em 8 bytes
+SECOES = (
+    "ids", "precos", "estoques", "categorias_codigos",
+    "ids_ordenados", "linhas_ordenadas",
+    "nomes_inicios", "nomes_dados",
+    "descricoes_inicios", "descricoes_dados",
+    "categorias_inicios", "categorias_dados",
+)
+_CABECALHO = struct.Struct("<8sHB5xQ")  # mágico, versão, little-endian?, linhas
+_SECAO = struct.Struct("<QQ")  # deslocamento, tamanho em bytes
+
+
+class SnapshotInvalidoError(Exception):
+    """Exceção para arquivos que não são snapshots de catálogo compatíveis"""
+    pass
+
+
+class ColunaSobreposta:
+    """Coluna somente leitura (mapeada do arquivo) com uma camada gravável por cima
+
+    Alterações ficam em um dict {linha: valor} e linhas novas em uma lista, de
+    modo que o arquivo mapeado nunca é modificado e pode ser compartilhado entre
+    processos.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.tamanho_base = len(base)
+        self.alteracoes: Dict[int, object] = {}
+        self.extras: List = []
+
+    def __getitem__(self, linha: int):
+        if linha >= self.tamanho_base:
+            return self.extras[linha - self.tamanho_base]
+        if linha in self.alteracoes:
+            return self.alteracoes[linha]
+        return self.base[linha]
+
+    def __setitem__(self, linha: int, valor):
+        if linha >= self.tamanho_base:
+            self.extras[linha - self.tamanho_base] = valor
+        else:
+            self.alteracoes[linha] = valor
+
+    def append(self, valor):
+        self.extras.append(valor)
+
+    def truncar(self, tamanho: int):
+        """Descarta linhas novas a partir de `tamanho` (as do arquivo ficam)"""
+        del self.extras[max(0, tamanho - self.tamanho_base):]
+
+    def __len__(self) -> int:
+        return self.tamanho_base + len(self.extras)
+
+    def __iter__(self):
+        for linha in range(len(self)):
+            yield self[linha]
+
+
+class TextosMapeados:
+    """Textos UTF-8 de um snapshot: deslocamentos (n + 1) e um bloco de bytes"""
+
+    def __init__(self, inicios, dados):
+        self.inicios = inicios
+        self.dados = dados
+
+    def __getitem__(self, linha: int) -> str:
+        return str(self.dados[self.inicios[linha]:self.inicios[linha + 1]], "utf-8")
+
+    def __len__(self) -> int:
+        return len(self.inicios) - 1
+
+
+class LinhasMapeadas:
+    """Mapeamento {produto_id: linha} por busca binária nos ids ordenados do snapshot"""
+
+    def __init__(self, ids_ordenados, linhas_ordenadas):
+        self.ids_ordenados = ids_ordenados
+        self.linhas_ordenadas = linhas_ordenadas
+        self.extras: Dict[int, int] = {}
+
+    def get(self, produto_id, padrao=None):
+        linha = self.extras.get(produto_id)
+        if linha is not None:
+            return linha
+        if not isinstance(produto_id, int):
+            return padrao
+        posicao = bisect_left(self.ids_ordenados, produto_id)
+        if posicao < len(self.ids_ordenados) and self.ids_ordenados[posicao] == produto_id:
+            return self.linhas_ordenadas[posicao]
+        return padrao
+
+    def __getitem__(self, produto_id) -> int:
+        linha = self.get(produto_id)
+        if linha is None:
+            raise KeyError(produto_id)
+        return linha
+
+    def __setitem__(self, produto_id: int, linha: int):
+        self.extras[produto_id] = linha
+
+    def __contains__(self, produto_id) -> bool:
+        return self.get(produto_id) is not None
+
+
+def _textos_em_bytes(textos, quantidade: int):
+    inicios = array("q", [0])
+    dados = bytearray()
+    for linha in range(quantidade):
+        dados += textos[linha].encode("utf-8")
+        inicios.append(len(dados))
+    return inicios.tobytes(), bytes(dados)
+
+
+def salvar_snapshot(catalogo: CatalogoColunar, caminho: str):
+    """Grava o catálogo em um arquivo binário versionado que pode ser aberto com abrir_snapshot"""
+    quantidade = len(catalogo)
+    ids = array("q", catalogo.ids)
+    ordem = sorted(range(quantidade), key=ids.__getitem__)
+    categorias = catalogo.categorias
+    secoes = {
+        "ids": ids.tobytes(),
+        "precos": array("d", catalogo.precos).tobytes(),
+        "estoques": array("q", catalogo.estoques).tobytes(),
+        "categorias_codigos": array("q", categorias.codigos).tobytes(),
+        "ids_ordenados": array("q", (ids[linha] for linha in ordem)).tobytes(),
+        "linhas_ordenadas": array("q", ordem).tobytes(),
+    }
+    secoes["nomes_inicios"], secoes["nomes_dados"] = _textos_em_bytes(catalogo.nomes, quantidade)
+    secoes["descricoes_inicios"], secoes["descricoes_dados"] = _textos_em_bytes(catalogo.descricoes, quantidade)
+    secoes["categorias_inicios"], secoes["categorias_dados"] = _textos_em_bytes(
+        categorias.valores, len(categorias.valores))
+
+    deslocamento = _CABECALHO.size + _SECAO.size * len(SECOES)
+    tabela = []
+    for nome in SECOES:
+        deslocamento += -deslocamento % 8
+        tabela.append((deslocamento, len(secoes[nome])))
+        deslocamento += len(secoes[nome])
+
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(_CABECALHO.pack(MAGICO, VERSAO, sys.byteorder == "little", quantidade))
+        for entrada in tabela:
+            arquivo.write(_SECAO.pack(*entrada))
+        for nome, (inicio, _) in zip(SECOES, tabela):
+            arquivo.write(bytes(inicio - arquivo.tell()))
+            arquivo.write(secoes[nome])
+
+
+def abrir_snapshot(caminho: str, classe_produto=None) -> CatalogoColunar:
+    """Abre um snapshot por mmap e retorna um catálogo que lê direto das páginas mapeadas
+
+    Nenhuma linha é lida na abertura. Alterações (estoque, preço, textos) e
+    produtos novos vão para camadas em memória sobre as colunas do arquivo.
+    """
+    with open(caminho, "rb") as arquivo:
+        if os.fstat(arquivo.fileno()).st_size < _CABECALHO.size:
+            raise SnapshotInvalidoError("Arquivo pequeno demais para ser um snapshot")
+        mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    magico, versao, little_endian, quantidade = _CABECALHO.unpack_from(mapa)
+    if magico != MAGICO:
+        raise SnapshotInvalidoError("Arquivo não é um snapshot de catálogo")
+    if versao != VERSAO:
+        raise SnapshotInvalidoError(f"Versão de snapshot não suportada: {versao}")
+    if bool(little_endian) != (sys.byteorder == "little"):
+        raise SnapshotInvalidoError("Snapshot gravado em máquina com outra ordem de bytes")
+
+    visao = memoryview(mapa)
+    secoes = {}
+    for posicao, nome in enumerate(SECOES):
+        inicio, tamanho = _SECAO.unpack_from(mapa, _CABECALHO.size + posicao * _SECAO.size)
+        if inicio + tamanho > len(mapa):
+            raise SnapshotInvalidoError(f"Seção {nome} fora do arquivo")
+        secoes[nome] = visao[inicio:inicio + tamanho]
+
+    categorias = TextosMapeados(secoes["categorias_inicios"].cast("q"), secoes["categorias_dados"])
+    colunas = {
+        "ids": ColunaSobreposta(secoes["ids"].cast("q")),
+        "precos": ColunaSobreposta(secoes["precos"].cast("d")),
+        "estoques": ColunaSobreposta(secoes["estoques"].cast("q")),
+        "nomes": ColunaSobreposta(TextosMapeados(secoes["nomes_inicios"].cast("q"), secoes["nomes_dados"])),
+        "descricoes": ColunaSobreposta(
+            TextosMapeados(secoes["descricoes_inicios"].cast("q"), secoes["descricoes_dados"])),
+        "categorias": ColunaDicionario(ColunaSobreposta(secoes["categorias_codigos"].cast("q")),
+                                       [categorias[codigo] for codigo in range(len(categorias))]),
+    }
+    linhas = LinhasMapeadas(secoes["ids_ordenados"].cast("q"), secoes["linhas_ordenadas"].cast("q"))
+    return CatalogoColunar.sobre_colunas(colunas, linhas, classe_produto)
@@ -0,0 +1,11 @@
+# conftest.py - Utilitários compartilhados pelos testes
+
+
+class RelogioFalso:
+    """Relógio controlado pelo teste: devolve `agora`, que o teste avança à mão"""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
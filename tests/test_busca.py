@@ -0,0 +1,115 @@
+# test_busca.py - Testes da busca textual de produtos
+import time
+from src.busca import Vocabulario, normalizar, tokenizar
+from src.ecommerce import Produto, SistemaEcommerce
+
+
+class TestBuscaTextual:
+    """Testes do índice invertido sobre nome e descrição"""
+
+    def setup_method(self):
+        """Configura catálogo com produtos acentuados"""
+        self.sistema = SistemaEcommerce()
+        dados = [
+            (1, "Notebook Dell", "Notebook com tela de 15 polegadas", "Eletrônicos"),
+            (2, "Mouse sem fio", "Mouse óptico para notebook", "Eletrônicos"),
+            (3, "Câmera Digital", "Câmera compacta com zoom óptico", "Fotografia"),
+            (4, "Livro de Programação", "Introdução à programação em Python", "Livros"),
+        ]
+        for id, nome, descricao, categoria in dados:
+            self.sistema.adicionar_produto(Produto(id, nome, descricao, 100.00, 10, categoria))
+
+    def ids(self, produtos):
+        return [produto.id for produto in produtos]
+
+    def test_normalizacao_remove_acentos(self):
+        """Tokens são minúsculos e sem acento"""
+        assert normalizar("Programação Óptica") == "programacao optica"
+        assert tokenizar("Câmera, 15-polegadas!") == ["camera", "15", "polegadas"]
+
+    def test_busca_ignora_acentos_e_maiusculas(self):
+        """Consulta sem acento encontra texto acentuado e vice-versa"""
+        assert self.ids(self.sistema.buscar_produtos("camera")) == [3]
+        assert self.ids(self.sistema.buscar_produtos("ÓPTICO")) == [2, 3]
+
+    def test_busca_exige_todos_os_termos(self):
+        """A consulta é o AND das palavras, em nome ou descrição"""
+        assert self.ids(self.sistema.buscar_produtos("notebook")) == [1, 2]
+        assert self.ids(self.sistema.buscar_produtos("notebook mouse")) == [2]
+        assert self.sistema.buscar_produtos("notebook python") == []
+        assert self.sistema.buscar_produtos("   ") == []
+
+    def test_busca_com_prefixo_e_limite(self):
+        """A última palavra é completada como prefixo"""
+        assert self.ids(self.sistema.buscar_produtos("progr")) == [4]
+        assert self.ids(self.sistema.buscar_produtos("mouse opt")) == [2]
+        assert self.ids(self.sistema.buscar_produtos("o", limite=1)) == [2]
+
+    def test_prefixo_com_muitas_expansoes(self):
+        """Todas as palavras que começam com o prefixo entram na busca, não só as primeiras"""
+        sistema = SistemaEcommerce()
+        for i in range(101):
+            sistema.produtos.inserir(i, f"Camiseta azul prod{i:03d}", "", 10.0, 1, "Roupas")
+        sistema.produtos.inserir(101, "Camiseta verde prod101", "", 10.0, 1, "Roupas")
+
+        assert self.ids(sistema.buscar_produtos("azul prod", limite=200)) == list(range(101))
+        assert self.ids(sistema.buscar_produtos("azul prod10")) == [100]
+        assert self.ids(sistema.buscar_produtos("verde prod0", limite=200)) == []
+        assert len(sistema.buscar_produtos("prod", limite=200)) == 102
+
+    def test_renomear_ida_e_volta_nao_duplica_sugestoes(self):
+        """Um termo que some e volta aparece uma vez só ao completar"""
+        produto = self.sistema.obter_produto(1)
+        for _ in range(3):
+            produto.nome = "Alpha"
+            produto.nome = "Beta"
+        produto.nome = "Alpha"
+
+        assert self.sistema.completar_busca("al") == ["alpha"]
+        assert self.sistema.completar_busca("be") == []
+        assert [p.id for p in self.sistema.buscar_produtos("alph")] == [1]
+
+    def test_vocabulario_nao_cresce_com_troca_de_textos(self):
+        """Termos descartados saem das listas do vocabulário"""
+        vocabulario = Vocabulario(["alpha"])
+        for i in range(1000):
+            vocabulario.adicionar(f"termo{i}")
+            vocabulario.descartar(f"termo{i}")
+        vocabulario.adicionar("alpha")
+
+        assert len(vocabulario) == 1
+        assert list(vocabulario.com_prefixo("")) == ["alpha"]
+        assert len(vocabulario._principal) + len(vocabulario._pendentes) < 100
+
+    def test_completar_busca(self):
+        """Sugestões em ordem alfabética, sem acento"""
+        assert self.sistema.completar_busca("co") == ["com", "compacta"]
+        assert self.sistema.completar_busca("Câm") == ["camera"]
+        assert self.sistema.completar_busca("xyz") == []
+
+    def test_indice_atualizado_ao_substituir_e_editar(self):
+        """Substituir um produto ou editar o texto atualiza o índice"""
+        self.sistema.adicionar_produto(Produto(3, "Tripé", "Tripé de alumínio", 90.00, 5, "Fotografia"))
+        assert self.sistema.buscar_produtos("camera") == []
+        assert self.ids(self.sistema.buscar_produtos("aluminio")) == [3]
+
+        self.sistema.obter_produto(1).nome = "Ultrabook Dell"
+        assert self.ids(self.sistema.buscar_produtos("ultrabook")) == [1]
+        assert self.ids(self.sistema.buscar_produtos("dell")) == [1]
+        # "notebook" continua na descrição do produto 1
+        assert self.ids(self.sistema.buscar_produtos("notebook")) == [1, 2]
+        assert "tripe" in self.sistema.completar_busca("tri")
+
+    def test_desempenho_busca(self):
+        """Consultas em catálogo grande não percorrem todos os produtos"""
+        sistema = SistemaEcommerce()
+        for i in range(20000):
+            sistema.produtos.inserir(i, f"Produto {i}", f"Descrição número {i}", 10.0, 1, "Teste")
+
+        start_time = time.time()
+        for i in range(1000):
+            resultado = sistema.buscar_produtos(f"produto {i * 7}")
+        tempo_busca = time.time() - start_time
+
+        assert [produto.id for produto in resultado] == [999 * 7]
+        assert tempo_busca < 0.5
@@ -0,0 +1,171 @@
+# test_carrinho.py - Testes do total incremental e das operações em lote do Carrinho
+import pytest
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, LoteCarrinhoError, POLITICAS_MESCLA
+
+
+class TestTotalCarrinho:
+    """Testes do total mantido a cada inclusão e remoção"""
+
+    def setup_method(self):
+        """Configura carrinho com um produto do catálogo e um avulso"""
+        self.sistema = SistemaEcommerce()
+        self.notebook = Produto(1, "Notebook", "Notebook Dell", 2500.00, 10, "Eletrônicos")
+        self.sistema.adicionar_produto(self.notebook)
+        self.caneta = Produto(2, "Caneta", "Caneta azul", 0.1, 100, "Papelaria")
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_item(self.notebook, 1)
+        self.carrinho.adicionar_item(self.caneta, 3)
+
+    def test_total_sem_erro_acumulado(self):
+        """Incluir e remover muitas vezes não acumula erro de arredondamento"""
+        total = self.carrinho.calcular_valor_total()
+        for _ in range(1000):
+            self.carrinho.adicionar_item(self.caneta, 1)
+            self.carrinho.remover_item(2, 1)
+        assert self.carrinho.calcular_valor_total() == total
+
+        self.carrinho.remover_item(1)
+        self.carrinho.remover_item(2)
+        assert self.carrinho.calcular_valor_total() == 0
+
+    def test_mudanca_de_preco_invalida_total(self):
+        """Preço alterado no produto avulso, no catálogo ou em massa atualiza o total"""
+        self.caneta.preco = 1.00
+        assert self.carrinho.calcular_valor_total() == 2503.00
+
+        self.sistema.obter_produto(1).preco = 2000.00
+        assert self.carrinho.calcular_valor_total() == 2003.00
+
+        self.sistema.reajustar_precos(0.5)
+        self.carrinho.adicionar_item(self.notebook, 1)
+        assert self.carrinho.calcular_valor_total() == 2003.00
+
+    def test_limpar_carrinho_zera_total(self):
+        """Depois de limpo, o carrinho volta a somar do zero"""
+        self.carrinho.limpar_carrinho()
+        assert self.carrinho.calcular_valor_total() == 0
+        self.carrinho.adicionar_item(self.caneta, 2)
+        assert self.carrinho.calcular_valor_total() == 0.2
+
+
+class TestOperacoesEmLote:
+    """Testes de adicionar_itens, remover_itens e definir_quantidades"""
+
+    def setup_method(self):
+        """Configura três produtos com estoques diferentes"""
+        self.mouse = Produto(1, "Mouse", "Mouse", 50.00, 10, "Eletrônicos")
+        self.teclado = Produto(2, "Teclado", "Teclado", 150.00, 2, "Eletrônicos")
+        self.cabo = Produto(3, "Cabo", "Cabo", 10.00, 100, "Acessórios")
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_item(self.mouse, 4)
+
+    def quantidades(self):
+        return {produto_id: item.quantidade for produto_id, item in self.carrinho.itens.items()}
+
+    def test_adicionar_varios(self):
+        """Pares repetidos são somados e o total acompanha"""
+        self.carrinho.adicionar_itens([(self.mouse, 1), (self.cabo, 5), (self.cabo, 5), (self.teclado, 2)])
+
+        assert self.quantidades() == {1: 5, 3: 10, 2: 2}
+        assert self.carrinho.calcular_valor_total() == 650.00
+
+    def test_adicionar_tudo_ou_nada(self):
+        """Uma linha inválida impede todas e cada falha é relatada"""
+        with pytest.raises(LoteCarrinhoError) as erro:
+            self.carrinho.adicionar_itens([(self.cabo, 1), (self.mouse, 7), (self.teclado, 0)])
+
+        assert set(erro.value.falhas) == {1, 2}
+        assert "estoque insuficiente" in erro.value.falhas[1]
+        assert self.quantidades() == {1: 4}
+        assert self.carrinho.calcular_valor_total() == 200.00
+
+    def test_remover_varios(self):
+        """Remoção parcial, total e por quantidade maior que a linha"""
+        self.carrinho.adicionar_itens([(self.cabo, 5), (self.teclado, 1)])
+        self.carrinho.remover_itens({1: 1, 3: None, 2: 9})
+
+        assert self.quantidades() == {1: 3}
+        assert self.carrinho.calcular_valor_total() == 150.00
+
+        with pytest.raises(LoteCarrinhoError) as erro:
+            self.carrinho.remover_itens({1: 1, 99: 1, 3: -1})
+        assert set(erro.value.falhas) == {99, 3}
+        assert self.quantidades() == {1: 3}
+
+    def test_definir_quantidades(self):
+        """Define quantidades finais, com 0 removendo a linha"""
+        self.carrinho.adicionar_itens([(self.cabo, 5), (self.teclado, 1)])
+        self.carrinho.definir_quantidades({1: 10, 3: 0, 2: 2})
+
+        assert self.quantidades() == {1: 10, 2: 2}
+        assert self.carrinho.calcular_valor_total() == 800.00
+
+        with pytest.raises(LoteCarrinhoError) as erro:
+            self.carrinho.definir_quantidades({1: 11, 2: 1, 5: 1})
+        assert set(erro.value.falhas) == {1, 5}
+        assert self.quantidades() == {1: 10, 2: 2}
+
+
+class TestMesclaCarrinhos:
+    """Testes da mescla do carrinho de visitante no carrinho da conta"""
+
+    def setup_method(self):
+        """Configura carrinho da conta e carrinho do visitante com um produto em comum"""
+        self.sistema = SistemaEcommerce()
+        for id, estoque in ((1, 10), (2, 10), (3, 4)):
+            self.sistema.adicionar_produto(Produto(id, f"Produto {id}", "", 10.0 * id, estoque, "Teste"))
+        self.conta = Carrinho()
+        self.conta.adicionar_itens([(self.produto(1), 2), (self.produto(2), 5)])
+        self.visitante = Carrinho()
+        self.visitante.adicionar_itens([(self.produto(2), 3), (self.produto(3), 1)])
+
+    def produto(self, id):
+        return self.sistema.obter_produto(id)
+
+    def quantidades(self, carrinho):
+        return {id: item.quantidade for id, item in carrinho.itens.items()}
+
+    @pytest.mark.parametrize("politica,esperado", [
+        ("somar", {1: 2, 2: 8, 3: 1}),
+        ("maximo", {1: 2, 2: 5, 3: 1}),
+        ("mais_recente", {1: 2, 2: 3, 3: 1}),
+    ])
+    def test_politicas(self, politica, esperado):
+        """Cada política resolve o produto em comum; os demais são incluídos"""
+        self.conta.mesclar(self.visitante, politica)
+
+        assert self.quantidades(self.conta) == esperado
+        assert self.conta.calcular_valor_total() == sum(10.0 * id * qtd for id, qtd in esperado.items())
+        assert self.quantidades(self.visitante) == {2: 3, 3: 1}
+
+    def test_estoque_tudo_ou_nada(self):
+        """Uma linha acima do estoque recusa a mescla inteira"""
+        self.visitante.adicionar_item(self.produto(3), 3)
+        self.conta.adicionar_item(self.produto(3), 1)
+
+        with pytest.raises(LoteCarrinhoError) as erro:
+            self.conta.mesclar(self.visitante)
+
+        assert set(erro.value.falhas) == {3}
+        assert self.quantidades(self.conta) == {1: 2, 2: 5, 3: 1}
+
+    def test_parametros_invalidos(self):
+        """Política desconhecida ou mescla consigo mesmo são recusadas"""
+        assert "somar" in POLITICAS_MESCLA
+        with pytest.raises(ValueError):
+            self.conta.mesclar(self.visitante, "media")
+        with pytest.raises(ValueError):
+            self.conta.mesclar(self.conta)
+
+    def test_carrinho_grande(self):
+        """Mescla de centenas de linhas confere o estoque só das linhas que mudam"""
+        for id in range(100, 600):
+            self.sistema.adicionar_produto(Produto(id, f"Produto {id}", "", 1.0, 5, "Teste"))
+        conta, visitante = Carrinho(), Carrinho()
+        conta.adicionar_itens((self.produto(id), 1) for id in range(100, 400))
+        visitante.adicionar_itens((self.produto(id), 1) for id in range(300, 600))
+
+        conta.mesclar(visitante, "maximo")
+
+        assert len(conta.itens) == 500
+        assert conta.calcular_valor_total() == 500.0
@@ -0,0 +1,148 @@
+# test_catalogo.py - Testes do catálogo colunar de produtos
+import tracemalloc
+import pytest
+from src.catalogo import COLUNAS, CatalogoColunar
+from src.ecommerce import Produto, SistemaEcommerce, EstoqueInsuficienteError
+
+
+class ProdutoLegado:
+    """Produto com __dict__, como era guardado antes do catálogo colunar"""
+
+    def __init__(self, id, nome, descricao, preco, quantidade_estoque, categoria):
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.preco = preco
+        self.quantidade_estoque = quantidade_estoque
+        self.categoria = categoria
+
+
+class TestCatalogoColunar:
+    """Testes do armazenamento colunar por trás de SistemaEcommerce.produtos"""
+
+    def setup_method(self):
+        """Configura sistema com dois produtos"""
+        self.sistema = SistemaEcommerce()
+        self.notebook = Produto(1, "Notebook", "Notebook Dell", 2500.00, 10, "Eletrônicos")
+        self.livro = Produto(2, "Livro", "Livro de Python", 80.00, 3, "Livros")
+        self.sistema.adicionar_produto(self.notebook)
+        self.sistema.adicionar_produto(self.livro)
+
+    def test_dados_ficam_nas_colunas(self):
+        """Verifica que os dados são gravados nas colunas do catálogo"""
+        catalogo = self.sistema.produtos
+        assert isinstance(catalogo, CatalogoColunar)
+        assert list(catalogo.ids) == [1, 2]
+        assert list(catalogo.precos) == [2500.00, 80.00]
+        assert list(catalogo.estoques) == [10, 3]
+        assert catalogo.categorias[0] == "Eletrônicos"
+
+    def test_produto_adicionado_vira_visao(self):
+        """Alterações pelo objeto original e pela visão obtida do sistema são as mesmas"""
+        visao = self.sistema.obter_produto(1)
+        self.notebook.atualizar_estoque(4)
+
+        assert visao.quantidade_estoque == 6
+        assert visao == self.notebook
+        assert visao.obter_informacoes() == self.notebook.obter_informacoes()
+
+        visao.preco = 2300.00
+        assert self.notebook.preco == 2300.00
+
+    def test_atualizar_estoque_na_visao(self):
+        """Verifica a validação de estoque em um produto catalogado"""
+        produto = self.sistema.obter_produto(2)
+        with pytest.raises(EstoqueInsuficienteError):
+            produto.atualizar_estoque(4)
+        produto.atualizar_estoque(3)
+        assert self.sistema.produtos.estoques[1] == 0
+
+    def test_substituir_produto_mesmo_id(self):
+        """Adicionar outro produto com o mesmo id substitui a linha existente"""
+        novo = Produto(1, "Notebook 2", "Notebook Lenovo", 3000.00, 5, "Informática")
+        self.sistema.adicionar_produto(novo)
+
+        assert len(self.sistema.produtos) == 2
+        assert self.sistema.obter_produto(1).nome == "Notebook 2"
+        assert self.sistema.obter_produto(1).categoria == "Informática"
+
+    def test_id_imutavel_apos_catalogar(self):
+        """O id de um produto catalogado não pode mudar, pois indexa a linha"""
+        with pytest.raises(AttributeError):
+            self.notebook.id = 99
+
+    def test_categorias_codificadas(self):
+        """Categorias repetidas compartilham o mesmo código"""
+        self.sistema.adicionar_produto(Produto(3, "Mouse", "Mouse", 50.00, 1, "Eletrônicos"))
+        categorias = self.sistema.produtos.categorias
+        assert categorias.codigos[0] == categorias.codigos[2]
+        assert len(categorias.valores) == 2
+
+    def test_iteracao_como_dict(self):
+        """O catálogo continua se comportando como {id: Produto}"""
+        catalogo = self.sistema.produtos
+        assert 1 in catalogo and 3 not in catalogo
+        assert list(catalogo) == [1, 2]
+        assert [p.nome for p in catalogo.values()] == ["Notebook", "Livro"]
+        assert self.sistema.obter_produto(3) is None
+
+    @pytest.mark.parametrize("campos", [
+        (3, "Mouse", "", 50.00, 2 ** 63, "Eletrônicos"),
+        (2 ** 64, "Mouse", "", 50.00, 1, "Eletrônicos"),
+        (3, None, "", 50.00, 1, "Eletrônicos"),
+        (3, "Mouse", "", "caro", 1, "Eletrônicos"),
+    ])
+    def test_insercao_invalida_nao_altera_colunas(self, campos):
+        """Uma linha que falha no meio da gravação é desfeita em todas as colunas"""
+        catalogo = self.sistema.produtos
+        with pytest.raises((OverflowError, TypeError, ValueError)):
+            catalogo.inserir(*campos)
+
+        assert {len(getattr(catalogo, coluna)) for coluna in COLUNAS} == {2}
+        assert campos[0] not in catalogo
+        assert self.sistema.adicionar_produto(Produto(3, "Mouse", "", 50.00, 1, "Eletrônicos")) is None
+        assert self.sistema.obter_produto(3).nome == "Mouse"
+
+    def test_substituicao_invalida_mantem_produto(self):
+        """Substituir com um campo inválido não grava nenhuma coluna da linha"""
+        with pytest.raises((OverflowError, TypeError)):
+            self.sistema.produtos.inserir(1, "Notebook 2", "", 3000.00, 1, None)
+        assert self.sistema.obter_produto(1).obter_informacoes() == self.notebook.obter_informacoes()
+
+    def test_lote_com_linha_invalida(self):
+        """As linhas do lote anteriores à inválida ficam gravadas e indexadas"""
+        lote = [(3, "Mouse", "", 50.00, 1, "Eletrônicos"), (4, "Cabo", "", 5.00, 2 ** 70, "Eletrônicos")]
+        with pytest.raises(OverflowError):
+            self.sistema.produtos.inserir_lote(lote)
+
+        assert {len(getattr(self.sistema.produtos, coluna)) for coluna in COLUNAS} == {3}
+        assert [p.id for p in self.sistema.buscar_por_categoria("Eletrônicos")] == [3, 1]
+
+    def test_memoria_menor_que_layout_anterior(self):
+        """O catálogo colunar usa menos memória que um dict de objetos com __dict__"""
+        num_produtos = 10000
+
+        def medir(construir):
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            estrutura = construir()
+            usado = tracemalloc.get_traced_memory()[0] - base
+            tracemalloc.stop()
+            return usado, estrutura
+
+        def construir_legado():
+            return {
+                i: ProdutoLegado(i, f"Produto {i}", f"Descrição {i}", 10.0 + i, 100, f"Categoria {i % 20}")
+                for i in range(num_produtos)
+            }
+
+        def construir_colunar():
+            catalogo = CatalogoColunar()
+            for i in range(num_produtos):
+                catalogo.inserir(i, f"Produto {i}", f"Descrição {i}", 10.0 + i, 100, f"Categoria {i % 20}")
+            return catalogo
+
+        memoria_legado, _ = medir(construir_legado)
+        memoria_colunar, _ = medir(construir_colunar)
+
+        assert memoria_colunar < memoria_legado * 0.75
@@ -0,0 +1,106 @@
+# test_cotacao.py - Testes da cotação de checkout com todas as formas de pagamento
+import pytest
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, SistemaPagamento
+
+
+class TestCotacao:
+    """Testes da matriz de pagamento calculada em uma passada e do seu cache"""
+
+    def setup_method(self):
+        """Configura sistema com um produto e um carrinho"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Notebook", "Notebook Dell", 999.99, 10, "Eletrônicos"))
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_item(self.sistema.obter_produto(1), 3)
+
+    def test_igual_aos_calculos_individuais(self):
+        """Cada valor da cotação é idêntico ao do método correspondente"""
+        pagamento = self.sistema.sistema_pagamento
+        total = self.carrinho.calcular_valor_total()
+        cotacao = self.sistema.cotar_checkout(self.carrinho)
+
+        assert cotacao.valor == total
+        assert cotacao.pix == pagamento.calcular_valor_pix(total)
+        assert cotacao.cartao_vista == pagamento.calcular_valor_cartao_vista(total)
+        assert sorted(cotacao.parcelado) == list(range(2, 13))
+        for parcelas in range(2, 13):
+            assert cotacao.parcelamento(parcelas) == pagamento.calcular_valor_cartao_parcelado(total, parcelas)
+
+    def test_parcelas_invalidas(self):
+        """Parcelamento fora de 2 a 12 vezes é recusado como no cálculo individual"""
+        cotacao = self.sistema.cotar_checkout(self.carrinho)
+        with pytest.raises(ValueError):
+            cotacao.parcelamento(1)
+        with pytest.raises(ValueError):
+            cotacao.parcelamento(13)
+
+    def test_cache_ate_carrinho_mudar(self):
+        """A mesma cotação é reaproveitada até o carrinho ou os preços mudarem"""
+        cotacao = self.sistema.cotar_checkout(self.carrinho)
+        assert self.sistema.cotar_checkout(self.carrinho) is cotacao
+
+        self.carrinho.remover_item(1, 1)
+        menor = self.sistema.cotar_checkout(self.carrinho)
+        assert menor.valor == 1999.98
+
+        self.sistema.obter_produto(1).preco = 100.00
+        assert self.sistema.cotar_checkout(self.carrinho).valor == 200.00
+
+    @pytest.mark.parametrize("taxa,desconto", [(0.02, 0.10), (0.05, 0.15)])
+    def test_cache_invalidado_pelas_taxas(self, taxa, desconto):
+        """Alterar a taxa de juros ou o desconto do PIX gera uma cotação nova"""
+        pagamento = self.sistema.sistema_pagamento
+        cotacao = self.sistema.cotar_checkout(self.carrinho)
+        pagamento.taxa_juros = taxa
+        pagamento.desconto_pix = desconto
+
+        nova = self.sistema.cotar_checkout(self.carrinho)
+
+        assert nova is not cotacao
+        assert nova.pix == pagamento.calcular_valor_pix(nova.valor)
+        assert nova.parcelamento(12) == pagamento.calcular_valor_cartao_parcelado(nova.valor, 12)
+
+    def test_cache_limitado(self):
+        """O cache de cotações não cresce além de MAX_COTACOES"""
+        pagamento = SistemaPagamento()
+        for valor in range(SistemaPagamento.MAX_COTACOES + 10):
+            pagamento.cotar(float(valor))
+        assert len(pagamento._cotacoes) <= SistemaPagamento.MAX_COTACOES
+
+
+class TestPrecificacaoVetorizada:
+    """Testes da tabela de parcelamento e dos cálculos para lotes de valores"""
+
+    def setup_method(self):
+        """Configura sistema de pagamento e valores com centavos variados"""
+        self.pagamento = SistemaPagamento()
+        self.valores = [0.0, 0.01, 9.99, 100.00, 1234.56, 99999.99]
+
+    def test_tabela_recalculada_ao_definir_taxa(self):
+        """Definir taxa_juros refaz a tabela de multiplicadores"""
+        assert self.pagamento.tabela_parcelas[12] == 1 + (0.05 * 11)
+        self.pagamento.taxa_juros = 0.02
+        assert self.pagamento.tabela_parcelas == {n: 1 + (0.02 * (n - 1)) for n in range(2, 13)}
+
+    @pytest.mark.parametrize("taxa,desconto", [(0.05, 0.10), (0.0299, 0.07), (0, 0)])
+    def test_lote_igual_ao_calculo_individual(self, taxa, desconto):
+        """Cada posição de cada coluna é idêntica ao cálculo valor a valor"""
+        self.pagamento.taxa_juros = taxa
+        self.pagamento.desconto_pix = desconto
+
+        lote = self.pagamento.cotar_valores(self.valores)
+
+        assert len(lote) == len(self.valores)
+        assert list(lote.pix) == [self.pagamento.calcular_valor_pix(v) for v in self.valores]
+        assert list(lote.cartao_vista) == self.valores
+        for parcelas, (totais, valores_parcela) in lote.parcelado.items():
+            esperado = [self.pagamento.calcular_valor_cartao_parcelado(v, parcelas) for v in self.valores]
+            assert list(totais) == [e["valor_total"] for e in esperado]
+            assert list(valores_parcela) == [e["valor_parcela"] for e in esperado]
+
+    def test_parcelas_invalidas(self):
+        """O cálculo vetorizado recusa as mesmas parcelas que o individual"""
+        with pytest.raises(ValueError):
+            self.pagamento.calcular_valores_cartao_parcelado(self.valores, 1)
+        with pytest.raises(ValueError):
+            self.pagamento.calcular_valores_cartao_parcelado(self.valores, 13)
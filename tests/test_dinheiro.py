@@ -0,0 +1,120 @@
+# test_dinheiro.py - Testes do valor monetário em centavos inteiros
+import json
+from decimal import Decimal
+
+import pytest
+from src.dinheiro import (MEIO_PAR, MODOS, PARA_BAIXO, PARA_CIMA, dividir_arredondando, dividir_em_parcelas,
+                          formatar_centavos, fracao, multiplicar_centavos, para_centavos)
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce, SistemaPagamento
+
+
+class TestDinheiro:
+    """Testes de conversão, aritmética exata e arredondamento"""
+
+    @pytest.mark.parametrize("reais,centavos", [
+        (0.1, 10), (0.29, 29), (2.675, 268), (1999.99, 199999), (-0.05, -5), (7, 700),
+        ("12.345", 1235), (Decimal("0.005"), 1),
+    ])
+    def test_conversao_de_reais(self, reais, centavos):
+        """Floats valem pelo decimal que representam; meio centavo arredonda para cima"""
+        assert para_centavos(reais) == centavos
+
+    @pytest.mark.parametrize("modo,esperados", [
+        (PARA_BAIXO, [2, -3]), (PARA_CIMA, [3, -2]), (MEIO_PAR, [2, -2]),
+    ])
+    def test_modos_de_arredondamento(self, modo, esperados):
+        """Cada modo resolve 2,5 e -2,5 centavos do seu jeito"""
+        assert [dividir_arredondando(5, 2, modo), dividir_arredondando(-5, 2, modo)] == esperados
+
+    def test_multiplicar_por_taxa(self):
+        """Taxas são frações decimais exatas e o arredondamento é explícito"""
+        assert multiplicar_centavos([15], 0.10) == [2]  # R$ 0,15
+        assert multiplicar_centavos([15], 0.10, PARA_BAIXO) == [1]
+
+    @pytest.mark.parametrize("modo", MODOS)
+    def test_multiplicar_em_lote(self, modo):
+        """O lote arredonda igual à divisão exata um a um, inclusive em negativos e metades"""
+        centavos = list(range(-60, 61)) + [199999, -299997]
+        for fator in (0.10, 0.25, 1.15):
+            numerador, denominador = fracao(fator).as_integer_ratio()
+            assert multiplicar_centavos(centavos, fator, modo) == [
+                dividir_arredondando(c * numerador, denominador, modo) for c in centavos]
+
+    def test_dividir_fecha_com_o_total(self):
+        """As parcelas somam o total e os centavos que sobram vão para as primeiras"""
+        parcelas = dividir_em_parcelas(11000, 3)
+        assert parcelas == [3667, 3667, 3666]
+        assert sum(parcelas) == 11000
+        with pytest.raises(ValueError):
+            dividir_em_parcelas(11000, 0)
+
+    def test_formatar_centavos(self):
+        """Centavos saem como reais com duas casas"""
+        assert formatar_centavos(299997) == "2999.97"
+        assert formatar_centavos(-5) == "-0.05"
+
+
+class TestDinheiroNoSistema:
+    """Testes do total do carrinho, dos pagamentos e do pedido em centavos"""
+
+    def setup_method(self):
+        """Configura sistema com um produto de centavos quebrados"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Caneta", "Caneta", 0.10, 100, "Papelaria"))
+        self.carrinho = Carrinho()
+
+    def test_total_do_carrinho_em_centavos(self):
+        """O total em centavos é exato e acompanha mudanças de preço"""
+        for _ in range(3):
+            self.carrinho.adicionar_item(self.sistema.obter_produto(1), 1)
+        assert self.carrinho.calcular_total_centavos() == 30
+        assert self.carrinho.calcular_valor_total() == 0.30
+        assert self.sistema.obter_produto(1).preco_centavos == 10
+
+        self.sistema.obter_produto(1).preco = 0.15
+        self.carrinho.remover_item(1, 1)
+        assert self.carrinho.calcular_total_centavos() == 30
+
+    def test_pagamentos_em_lote_de_centavos(self):
+        """O desconto PIX arredonda para baixo e a parcela é a primeira da divisão do total com juros"""
+        pagamento = SistemaPagamento()
+        centavos = [0, 1, 15, 999, 10000, 123457]
+
+        assert list(pagamento.calcular_centavos_pix(centavos)) == [0, 1, 14, 900, 9000, 111112]
+        totais, valores_parcela = pagamento.calcular_centavos_cartao_parcelado(centavos, 3)
+        assert (totais[4], valores_parcela[4]) == (11000, 3667)
+        for total, parcela in zip(totais, valores_parcela):
+            assert parcela == dividir_em_parcelas(total, 3)[0]
+        with pytest.raises(ValueError):
+            pagamento.calcular_centavos_cartao_parcelado(centavos, 13)
+
+    def test_pedido_em_centavos(self):
+        """O total do pedido é somado em centavos e sai como float, que continua funcionando como antes"""
+        self.carrinho.adicionar_item(self.sistema.obter_produto(1), 7)
+        id_pedido = self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A")
+
+        pedido = self.sistema.obter_pedido(id_pedido)
+        assert type(pedido.valor_total) is float
+        assert pedido.valor_total == 0.70  # e não 0.7000000000000001
+        assert round(pedido.valor_total * 0.9 + 1.5, 2) == 2.13
+        assert json.dumps({"total": pedido.valor_total}) == '{"total": 0.7}'
+
+    def test_carrinho_e_pedido_com_o_mesmo_total(self):
+        """Com preços de mais de duas casas, carrinho, cotação e pedido usam o mesmo total em centavos"""
+        self.sistema.adicionar_produto(Produto(2, "Clipe", "Clipe", 1.005, 100, "Papelaria"))
+        self.carrinho.adicionar_item(self.sistema.obter_produto(2), 3)
+        total = self.carrinho.calcular_valor_total()
+        assert total == 3.03 and self.sistema.cotar_checkout(self.carrinho).valor == total
+
+        id_pedido = self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A")
+        assert self.sistema.obter_pedido(id_pedido).valor_total == total
+
+    def test_lotes_aceitam_valores_inteiros(self):
+        """Valores int nos lotes de float dão o mesmo que os cálculos individuais"""
+        pagamento = SistemaPagamento()
+        lote = pagamento.cotar_valores([100, 250])
+        assert list(lote.pix) == [pagamento.calcular_valor_pix(100), pagamento.calcular_valor_pix(250)]
+
+        resultado = pagamento.processar_pagamentos([100, 250], [MetodoPagamento.PIX, MetodoPagamento.CARTAO_PARCELADO],
+                                                   [1, 3])
+        assert resultado.resultado(1) == pagamento.processar_pagamento(250, MetodoPagamento.CARTAO_PARCELADO, 3)
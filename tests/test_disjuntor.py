@@ -0,0 +1,260 @@
+# test_disjuntor.py - Testes do disjuntor e das novas tentativas no passo de pagamento
+import asyncio
+
+import pytest
+from src.disjuntor import CircuitoAbertoError, Disjuntor, EstadoCircuito, OrcamentoRetentativas, Retentativas
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce
+from src.gateway import ClientePagamentos, GatewayIndisponivelError, GatewayLocal
+from tests.conftest import RelogioFalso
+
+
+class ProvedorFalso:
+    """Provedor de pagamento local com latência e falhas injetáveis, medidas no relógio falso"""
+
+    def __init__(self, relogio: RelogioFalso):
+        self.relogio = relogio
+        self.latencia = 0.0
+        self.erro = None
+        self.chamadas = 0
+
+    def __call__(self, *argumentos):
+        self.chamadas += 1
+        self.relogio.agora += self.latencia
+        if self.erro is not None:
+            raise self.erro
+        return {"aprovado": True}
+
+
+class TestDisjuntor:
+    """Testes das janelas de erros e latência e da sondagem no estado semiaberto"""
+
+    def setup_method(self):
+        """Configura disjuntor que avalia a partir de 4 chamadas, com relógio controlado"""
+        self.relogio = RelogioFalso()
+        self.provedor = ProvedorFalso(self.relogio)
+        self.disjuntor = Disjuntor(limiar_erros=0.5, limite_latencia=1.0, limiar_lentas=0.5, janela=10,
+                                   minimo_chamadas=4, tempo_aberto=5, sondas=2, relogio=self.relogio)
+
+    def chamar(self, vezes=1):
+        for _ in range(vezes):
+            try:
+                self.disjuntor.executar(self.provedor)
+            except ConnectionError:
+                pass
+
+    def test_abre_com_erros_e_falha_na_hora(self):
+        """Atingido o limiar de erros, as chamadas são recusadas sem chegar ao provedor"""
+        self.chamar(2)
+        self.provedor.erro = ConnectionError("fora do ar")
+        self.chamar(2)
+        assert self.disjuntor.estado is EstadoCircuito.ABERTO
+
+        self.relogio.agora += 2
+        with pytest.raises(CircuitoAbertoError) as erro:
+            self.disjuntor.executar(self.provedor)
+        assert erro.value.tentar_em == pytest.approx(3)
+        assert self.provedor.chamadas == 4
+        assert self.disjuntor.estatisticas()["recusadas"] == 1
+
+    def test_abre_com_chamadas_lentas(self):
+        """Chamadas que respondem, mas acima do limite de latência, também abrem o circuito"""
+        self.provedor.latencia = 1.5
+        self.chamar(3)
+        assert self.disjuntor.estado is EstadoCircuito.FECHADO  # abaixo do mínimo de chamadas
+        self.chamar()
+        assert self.disjuntor.estado is EstadoCircuito.ABERTO
+
+    def test_sondas_fecham_ou_reabrem(self):
+        """Semiaberto deixa passar só as sondas; sucessos fecham e uma falha reabre"""
+        self.provedor.erro = ConnectionError()
+        self.chamar(4)
+        self.relogio.agora += 5
+        assert self.disjuntor.estado is EstadoCircuito.SEMIABERTO
+
+        self.chamar()  # a sonda falha
+        assert self.disjuntor.estado is EstadoCircuito.ABERTO
+
+        self.relogio.agora += 5
+        self.provedor.erro = None
+        self.chamar()
+        assert self.disjuntor.estado is EstadoCircuito.SEMIABERTO
+        self.chamar()
+        assert self.disjuntor.estado is EstadoCircuito.FECHADO
+        assert self.disjuntor.estatisticas()["aberturas"] == 2
+
+    def test_sondas_simultaneas_limitadas(self):
+        """Com as sondas em andamento, as demais chamadas continuam recusadas"""
+        self.provedor.erro = ConnectionError()
+        self.chamar(4)
+        self.relogio.agora += 5
+        self.provedor.erro = None
+
+        def sonda_que_chama_de_novo():
+            self.disjuntor.executar(lambda: self.disjuntor.executar(self.provedor))
+            return {"aprovado": True}
+
+        with pytest.raises(CircuitoAbertoError):
+            self.disjuntor.executar(lambda: self.disjuntor.executar(sonda_que_chama_de_novo))
+        assert self.provedor.chamadas == 4
+
+    def test_janela_deslizante_esquece_falhas_antigas(self):
+        """Falhas que saíram da janela não somam com as novas"""
+        self.provedor.erro = ConnectionError()
+        self.chamar(2)
+        self.relogio.agora += 11
+        self.provedor.erro = None
+        self.chamar(2)
+        self.provedor.erro = ConnectionError()
+        self.chamar()
+        assert self.disjuntor.estado is EstadoCircuito.FECHADO
+        assert self.disjuntor.estatisticas()["chamadas_janela"] == 3
+
+    def test_erros_de_validacao_nao_contam(self):
+        """ValueError mostra que o provedor respondeu e não abre o circuito"""
+        self.provedor.erro = ValueError("parcelas inválidas")
+        for _ in range(10):
+            with pytest.raises(ValueError):
+                self.disjuntor.executar(self.provedor)
+        assert self.disjuntor.estado is EstadoCircuito.FECHADO
+
+    def test_parametros_invalidos(self):
+        """Limiares fora de (0, 1] e tempos não positivos são recusados"""
+        with pytest.raises(ValueError):
+            Disjuntor(limiar_erros=0)
+        with pytest.raises(ValueError):
+            Disjuntor(tempo_aberto=0)
+
+
+class TestRetentativas:
+    """Testes das novas tentativas com espera sorteada e orçamento"""
+
+    def setup_method(self):
+        """Configura novas tentativas que registram as esperas em vez de dormir"""
+        self.esperas = []
+        self.relogio = RelogioFalso()
+        self.provedor = ProvedorFalso(self.relogio)
+
+    def retentativas(self, **opcoes):
+        return Retentativas(espera_base=0.1, espera_maxima=0.3, semente=1, dormir=self.esperas.append, **opcoes)
+
+    def test_repete_falhas_de_conexao_com_espera_exponencial(self):
+        """Cada espera é sorteada até o teto exponencial, limitado pela espera máxima"""
+        self.provedor.erro = ConnectionError()
+        with pytest.raises(ConnectionError):
+            self.retentativas(tentativas=4).executar(self.provedor)
+        assert self.provedor.chamadas == 4
+        assert len(self.esperas) == 3 and len(set(self.esperas)) == 3
+        assert all(0 <= espera <= teto for espera, teto in zip(self.esperas, (0.1, 0.2, 0.3)))
+
+    def test_outras_falhas_nao_sao_repetidas(self):
+        """Timeouts e recusas do disjuntor são lançados na primeira tentativa"""
+        retentativas = self.retentativas()
+        for erro in (TimeoutError(), CircuitoAbertoError(1.0)):
+            self.provedor.erro = erro
+            with pytest.raises(type(erro)):
+                retentativas.executar(self.provedor)
+        assert self.provedor.chamadas == 2 and self.esperas == []
+
+    def test_orcamento_esgotado(self):
+        """Sem saldo, a falha é lançada sem nova tentativa; sucessos recompõem o saldo"""
+        retentativas = self.retentativas(orcamento=OrcamentoRetentativas(proporcao=0.5, maximo=2))
+        self.provedor.erro = ConnectionError()
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                retentativas.executar(self.provedor)
+        assert self.provedor.chamadas == 4 and retentativas.estatisticas()["sem_orcamento"] == 1
+
+        self.provedor.erro = None
+        retentativas.executar(self.provedor)
+        retentativas.executar(self.provedor)
+        assert retentativas.orcamento.saldo == 1
+
+
+class TestCheckoutProtegido:
+    """Testes de criar_pedido e criar_pedido_async com disjuntor e novas tentativas"""
+
+    def setup_method(self):
+        """Configura sistema cujo pagamento vai a um provedor falso"""
+        self.relogio = RelogioFalso()
+        self.provedor = ProvedorFalso(self.relogio)
+        self.sistema = SistemaEcommerce(
+            disjuntor=Disjuntor(minimo_chamadas=3, limite_latencia=1.0, tempo_aberto=30, relogio=self.relogio),
+            retentativas=Retentativas(espera_base=0, espera_maxima=0))
+        self.sistema.sistema_pagamento.processar_pagamento = self.provedor
+        self.sistema.adicionar_produto(Produto(1, "Teclado", "", 100.00, 10, "Eletrônicos"))
+        self.produto = self.sistema.obter_produto(1)
+
+    def checkout(self):
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.produto, 1)
+        return self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A")
+
+    def test_falha_passageira_e_repetida(self):
+        """Uma falha de conexão isolada é repetida e o pedido sai"""
+        falhas = [ConnectionError()]
+
+        def instavel(*argumentos):
+            if falhas:
+                raise falhas.pop()
+            return self.provedor(*argumentos)
+
+        self.sistema.sistema_pagamento.processar_pagamento = instavel
+        assert self.sistema.obter_pedido(self.checkout()) is not None
+
+    def test_provedor_lento_faz_checkout_falhar_na_hora(self):
+        """Com o provedor lento o circuito abre e o checkout falha sem esperar nem baixar estoque"""
+        self.provedor.latencia = 5.0
+        for _ in range(3):
+            self.checkout()
+        chamadas = self.provedor.chamadas
+
+        with pytest.raises(CircuitoAbertoError):
+            self.checkout()
+        assert self.provedor.chamadas == chamadas
+        assert self.produto.quantidade_estoque == 7 and len(self.sistema.pedidos) == 3
+
+    def test_desligados_por_padrao(self):
+        """Sem disjuntor nem novas tentativas, o padrão, o pagamento é chamado diretamente"""
+        self.sistema = SistemaEcommerce()
+        assert self.sistema.disjuntor is None and self.sistema.retentativas is None
+        self.sistema.sistema_pagamento.processar_pagamento = self.provedor
+        self.sistema.adicionar_produto(Produto(1, "Teclado", "", 100.00, 10, "Eletrônicos"))
+        self.produto = self.sistema.obter_produto(1)
+        self.provedor.latencia = 5.0
+        for _ in range(5):
+            self.checkout()
+        self.provedor.erro = ConnectionError()
+        for _ in range(5):
+            with pytest.raises(ConnectionError):
+                self.checkout()
+        assert self.provedor.chamadas == 10 and len(self.sistema.pedidos) == 5
+
+    def test_checkout_assincrono_com_gateway_lento(self):
+        """O gateway local com latência alta abre o circuito também no checkout assíncrono"""
+        gateway = GatewayLocal(latencia=0.02)
+        self.sistema.gateway = ClientePagamentos(gateway)
+        self.sistema.disjuntor = Disjuntor(minimo_chamadas=2, limite_latencia=0.005)
+
+        async def checkouts():
+            for _ in range(2):
+                carrinho = Carrinho()
+                carrinho.adicionar_item(self.produto, 1)
+                await self.sistema.criar_pedido_async(carrinho, MetodoPagamento.PIX, "Rua A")
+            carrinho = Carrinho()
+            carrinho.adicionar_item(self.produto, 1)
+            await self.sistema.criar_pedido_async(carrinho, MetodoPagamento.PIX, "Rua A")
+
+        with pytest.raises(CircuitoAbertoError):
+            asyncio.run(checkouts())
+        assert gateway.chamadas == 2 and self.produto.quantidade_estoque == 8
+
+    def test_falhas_do_gateway_sao_repetidas_no_assincrono(self):
+        """GatewayIndisponivelError é uma falha de conexão e recebe novas tentativas"""
+        gateway = GatewayLocal(taxa_erro=1.0)
+        self.sistema.gateway = ClientePagamentos(gateway)
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.produto, 1)
+
+        with pytest.raises(GatewayIndisponivelError):
+            asyncio.run(self.sistema.criar_pedido_async(carrinho, MetodoPagamento.PIX, "Rua A"))
+        assert gateway.chamadas == 3 and self.produto.quantidade_estoque == 10
@@ -0,0 +1,189 @@
+# test_gateway.py - Testes do gateway de pagamento assíncrono
+import asyncio
+import time
+
+import pytest
+from src.ecommerce import (MetodoPagamento, Produto, Carrinho, SistemaEcommerce, StatusPedido,
+                           EstoqueInsuficienteError)
+from src.gateway import (ClientePagamentos, GatewayIndisponivelError, GatewayLocal, GatewayPagamento,
+                         TempoEsgotadoGatewayError)
+
+
+class TestClientePagamentos:
+    """Testes de concorrência limitada, timeout e reuso de conexões"""
+
+    def test_resultado_igual_ao_sistema_de_pagamento(self):
+        """O gateway local responde como SistemaPagamento.processar_pagamento"""
+        gateway = GatewayLocal()
+        cliente = ClientePagamentos(gateway)
+
+        resultado = asyncio.run(cliente.processar_pagamento(1000.00, MetodoPagamento.CARTAO_PARCELADO, 3))
+
+        assert resultado == gateway.sistema_pagamento.processar_pagamento(1000.00, MetodoPagamento.CARTAO_PARCELADO, 3)
+
+    def test_limite_de_concorrencia(self):
+        """Nunca há mais chamadas em andamento que o limite do semáforo"""
+        gateway = GatewayLocal(latencia=0.01)
+        cliente = ClientePagamentos(gateway, max_simultaneos=5)
+
+        async def lote():
+            return await asyncio.gather(*(cliente.processar_pagamento(10.0, MetodoPagamento.PIX)
+                                          for _ in range(20)))
+
+        resultados = asyncio.run(lote())
+
+        assert len(resultados) == 20 and all(r["aprovado"] for r in resultados)
+        assert gateway.pico_em_andamento == 5
+        assert gateway.conexoes_criadas == 5
+
+    def test_vazao_acompanha_io_em_andamento(self):
+        """Chamadas concorrentes se sobrepõem em vez de somar latências"""
+        cliente = ClientePagamentos(GatewayLocal(latencia=0.05), max_simultaneos=50)
+
+        async def lote():
+            await asyncio.gather(*(cliente.processar_pagamento(10.0, MetodoPagamento.PIX) for _ in range(50)))
+
+        inicio = time.perf_counter()
+        asyncio.run(lote())
+        assert time.perf_counter() - inicio < 50 * 0.05 / 5
+
+    def test_reuso_de_conexoes(self):
+        """Chamadas em sequência reaproveitam a mesma conexão, inclusive entre laços de eventos"""
+        gateway = GatewayLocal()
+        cliente = ClientePagamentos(gateway)
+
+        async def sequencia():
+            for _ in range(10):
+                await cliente.processar_pagamento(10.0, MetodoPagamento.CARTAO_VISTA)
+
+        asyncio.run(sequencia())
+        assert (gateway.chamadas, gateway.conexoes_criadas) == (10, 1)
+        asyncio.run(sequencia())
+        assert gateway.chamadas == 20
+
+    def test_timeout_descarta_conexao(self):
+        """Uma chamada lenta estoura o timeout e sua conexão não volta ao pool"""
+        gateway = GatewayLocal(latencia=1.0)
+        cliente = ClientePagamentos(gateway, timeout=0.02)
+
+        with pytest.raises(TempoEsgotadoGatewayError):
+            asyncio.run(cliente.processar_pagamento(10.0, MetodoPagamento.PIX))
+
+        gateway.latencia = 0
+        asyncio.run(cliente.processar_pagamento(10.0, MetodoPagamento.PIX))
+        assert gateway.conexoes_criadas == 2
+
+    def test_taxa_de_erro(self):
+        """Com taxa de erro configurada, parte das chamadas falha"""
+        cliente = ClientePagamentos(GatewayLocal(taxa_erro=0.5, semente=7))
+
+        async def lote():
+            return await asyncio.gather(*(cliente.processar_pagamento(10.0, MetodoPagamento.PIX) for _ in range(100)),
+                                        return_exceptions=True)
+
+        resultados = asyncio.run(lote())
+        erros = sum(isinstance(r, GatewayIndisponivelError) for r in resultados)
+        assert 20 < erros < 80
+
+    def test_parametros_invalidos(self):
+        """Limites, timeout, latência e taxa de erro são validados"""
+        with pytest.raises(ValueError):
+            ClientePagamentos(GatewayLocal(), max_simultaneos=0)
+        with pytest.raises(ValueError):
+            ClientePagamentos(GatewayLocal(), timeout=0)
+        with pytest.raises(ValueError):
+            GatewayLocal(taxa_erro=1.5)
+
+    def test_gateway_sem_conectar_falha_na_criacao(self):
+        """Um gateway que não implementa conectar é recusado ao ser criado, não na primeira chamada"""
+        class GatewayIncompleto(GatewayPagamento):
+            pass
+
+        with pytest.raises(TypeError):
+            GatewayIncompleto()
+
+
+class TestCheckoutAssincrono:
+    """Testes de criar_pedido_async com o gateway"""
+
+    def setup_method(self):
+        """Configura sistema com um produto e um carrinho"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Mouse", "Mouse", 50.00, 10, "Eletrônicos"))
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_item(self.sistema.obter_produto(1), 2)
+
+    def test_pedido_pago(self):
+        """Pagamento aprovado no gateway cria o pedido e baixa o estoque"""
+        id_pedido = asyncio.run(self.sistema.criar_pedido_async(self.carrinho, MetodoPagamento.PIX, "Rua A"))
+
+        pedido = self.sistema.obter_pedido(id_pedido)
+        assert pedido.status == StatusPedido.PAGO
+        assert pedido.valor_total == 100.00
+        assert self.sistema.obter_produto(1).quantidade_estoque == 8
+        assert self.carrinho.itens == {}
+
+    def test_falha_no_gateway_nao_cria_pedido(self):
+        """Erro de comunicação não cria pedido nem altera estoque ou carrinho"""
+        self.sistema.gateway = ClientePagamentos(GatewayLocal(taxa_erro=1.0))
+
+        with pytest.raises(GatewayIndisponivelError):
+            asyncio.run(self.sistema.criar_pedido_async(self.carrinho, MetodoPagamento.PIX, "Rua A"))
+
+        assert self.sistema.pedidos == {}
+        assert self.sistema.obter_produto(1).quantidade_estoque == 10
+        assert self.carrinho.itens[1].quantidade == 2
+        assert self.sistema.reservas.reservado(1) == 0
+
+    def test_falha_mantem_reservas_anteriores(self):
+        """Só as unidades reservadas pelo checkout são devolvidas quando o pagamento falha"""
+        self.sistema.gateway = ClientePagamentos(GatewayLocal(taxa_erro=1.0))
+        self.sistema.reservar_item(self.carrinho, self.sistema.obter_produto(1), 1)
+
+        with pytest.raises(GatewayIndisponivelError):
+            asyncio.run(self.sistema.criar_pedido_async(self.carrinho, MetodoPagamento.PIX, "Rua A"))
+
+        assert self.carrinho.itens[1].quantidade == 3
+        assert self.sistema.reservas.reservas_de(self.carrinho) == {1: 1}
+
+    def test_ultima_unidade_disputada(self):
+        """Dois checkouts da última unidade: um paga e o outro falha antes de chamar o gateway"""
+        gateway = GatewayLocal(latencia=0.02)
+        self.sistema.gateway = ClientePagamentos(gateway)
+        self.sistema.adicionar_produto(Produto(2, "Cabo", "Cabo", 5.00, 1, "Eletrônicos"))
+        carrinhos = []
+        for _ in range(2):
+            carrinho = Carrinho()
+            carrinho.adicionar_item(self.sistema.obter_produto(2), 1)
+            carrinhos.append(carrinho)
+
+        async def checkouts():
+            return await asyncio.gather(*(self.sistema.criar_pedido_async(c, MetodoPagamento.PIX, "Rua A")
+                                          for c in carrinhos), return_exceptions=True)
+
+        resultados = asyncio.run(checkouts())
+
+        assert isinstance(resultados[0], str) and isinstance(resultados[1], EstoqueInsuficienteError)
+        assert gateway.chamadas == 1 and len(self.sistema.pedidos) == 1
+        assert self.sistema.obter_produto(2).quantidade_estoque == 0
+        assert self.sistema.reservas.reservado(2) == 0
+        assert carrinhos[1].itens[2].quantidade == 1
+
+    def test_checkouts_concorrentes(self):
+        """Vários checkouts aguardam o gateway ao mesmo tempo no mesmo laço"""
+        self.sistema.gateway = ClientePagamentos(GatewayLocal(latencia=0.02))
+        carrinhos = []
+        for _ in range(5):
+            carrinho = Carrinho()
+            carrinho.adicionar_item(self.sistema.obter_produto(1), 1)
+            carrinhos.append(carrinho)
+
+        async def checkouts():
+            return await asyncio.gather(*(self.sistema.criar_pedido_async(c, MetodoPagamento.PIX, "Rua A")
+                                          for c in carrinhos))
+
+        ids = asyncio.run(checkouts())
+
+        assert len(set(ids)) == 5
+        assert self.sistema.obter_produto(1).quantidade_estoque == 5
+        assert self.sistema.gateway.gateway.pico_em_andamento == 5
@@ -0,0 +1,159 @@
+# test_idempotencia.py - Testes das chaves de idempotência no checkout e no pagamento
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce, SistemaPagamento
+from src.gateway import ClientePagamentos, GatewayLocal
+from src.idempotencia import CacheIdempotencia, ChaveIdempotenciaReutilizadaError
+from tests.conftest import RelogioFalso
+
+
+class TestCacheIdempotencia:
+    """Testes do cache de resultados por chave"""
+
+    def setup_method(self):
+        """Configura cache com relógio controlado"""
+        self.relogio = RelogioFalso()
+        self.cache = CacheIdempotencia(max_chaves=3, ttl=60, relogio=self.relogio)
+        self.execucoes = 0
+
+    def operacao(self):
+        self.execucoes += 1
+        return f"resultado-{self.execucoes}"
+
+    def test_nova_tentativa_reaproveita_resultado(self):
+        """A operação roda uma vez por chave"""
+        assert self.cache.executar("a", 1, self.operacao) == "resultado-1"
+        assert self.cache.executar("a", 1, self.operacao) == "resultado-1"
+        assert self.cache.executar("b", 1, self.operacao) == "resultado-2"
+        assert self.execucoes == 2
+        assert self.cache.estatisticas()["acertos"] == 1
+
+    def test_chave_com_outros_parametros(self):
+        """Reusar a chave em outra requisição é recusado sem executar"""
+        self.cache.executar("a", ("PIX", 10), self.operacao)
+        with pytest.raises(ChaveIdempotenciaReutilizadaError):
+            self.cache.executar("a", ("PIX", 20), self.operacao)
+        assert self.execucoes == 1
+
+    def test_falhas_nao_sao_guardadas(self):
+        """Depois de uma exceção a próxima tentativa executa de novo"""
+        def falha():
+            raise RuntimeError("gateway fora do ar")
+
+        with pytest.raises(RuntimeError):
+            self.cache.executar("a", 1, falha)
+        assert "a" not in self.cache
+        assert self.cache.executar("a", 1, self.operacao) == "resultado-1"
+
+    def test_expiracao_e_limite(self):
+        """Resultados expiram após o TTL e os menos usados saem acima do limite"""
+        for chave in "abc":
+            self.cache.executar(chave, 1, self.operacao)
+        self.cache.executar("a", 1, self.operacao)  # "a" passa a ser o mais recente
+        self.cache.executar("d", 1, self.operacao)
+        assert "b" not in self.cache and "a" in self.cache and len(self.cache) == 3
+
+        self.relogio.agora = 61
+        assert self.cache.executar("a", 1, self.operacao) == "resultado-5"
+        estatisticas = self.cache.estatisticas()
+        assert (estatisticas["despejados"], estatisticas["expirados"]) == (1, 1)
+
+    def test_tentativas_simultaneas_esperam_a_primeira(self):
+        """Threads com a mesma chave recebem o resultado de uma única execução"""
+        cache = CacheIdempotencia()
+        liberar = threading.Event()
+
+        def lenta():
+            liberar.wait()
+            return self.operacao()
+
+        resultados = []
+        threads = [threading.Thread(target=lambda: resultados.append(cache.executar("a", 1, lenta)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while cache.estatisticas()["aguardados"] < 4:
+            time.sleep(0.001)
+        liberar.set()
+        for thread in threads:
+            thread.join()
+
+        assert resultados == ["resultado-1"] * 5 and self.execucoes == 1
+
+    def test_parametros_invalidos(self):
+        """Limite e TTL devem ser positivos"""
+        with pytest.raises(ValueError):
+            CacheIdempotencia(max_chaves=0)
+
+
+class TestCheckoutIdempotente:
+    """Testes de criar_pedido e processar_pagamento com chave de idempotência"""
+
+    def setup_method(self):
+        """Configura sistema com um produto e um carrinho"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Notebook", "Notebook", 1000.00, 10, "Eletrônicos"))
+        self.produto = self.sistema.obter_produto(1)
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_item(self.produto, 2)
+
+    def test_nova_tentativa_retorna_o_mesmo_pedido(self):
+        """A repetição não cobra, não baixa estoque e não cria outro pedido"""
+        with patch.object(self.sistema.sistema_pagamento, "processar_pagamento",
+                          wraps=self.sistema.sistema_pagamento.processar_pagamento) as pagamento:
+            id_pedido = self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A",
+                                                  chave_idempotencia="checkout-1")
+            repetido = self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A",
+                                                 chave_idempotencia="checkout-1")
+
+        assert repetido == id_pedido
+        pagamento.assert_called_once()
+        assert self.produto.quantidade_estoque == 8
+        assert len(self.sistema.pedidos) == 1
+
+    def test_chave_reusada_em_outro_checkout(self):
+        """A mesma chave com outro método de pagamento é recusada"""
+        self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A", chave_idempotencia="k")
+        with pytest.raises(ChaveIdempotenciaReutilizadaError):
+            self.sistema.criar_pedido(self.carrinho, MetodoPagamento.CARTAO_VISTA, "Rua A",
+                                      chave_idempotencia="k")
+
+    def test_pagamento_recusado_pode_ser_repetido(self):
+        """Um checkout que falhou não fica registrado na chave"""
+        with patch.object(self.sistema.sistema_pagamento, "processar_pagamento",
+                          return_value={"aprovado": False}):
+            with pytest.raises(Exception):
+                self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A", chave_idempotencia="k")
+
+        id_pedido = self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A", chave_idempotencia="k")
+        assert self.sistema.obter_pedido(id_pedido) is not None
+
+    def test_checkout_assincrono_com_tentativas_simultaneas(self):
+        """Tentativas concorrentes do mesmo checkout fazem uma só chamada ao gateway"""
+        gateway = GatewayLocal(latencia=0.01)
+        self.sistema.gateway = ClientePagamentos(gateway)
+
+        async def tentativas():
+            return await asyncio.gather(*(self.sistema.criar_pedido_async(
+                self.carrinho, MetodoPagamento.PIX, "Rua A", chave_idempotencia="k") for _ in range(5)))
+
+        ids = asyncio.run(tentativas())
+
+        assert len(set(ids)) == 1 and gateway.chamadas == 1
+        assert self.produto.quantidade_estoque == 8
+
+    def test_pagamento_com_chave(self):
+        """processar_pagamento com chave devolve o mesmo resultado sem recalcular"""
+        pagamento = SistemaPagamento()
+        primeiro = pagamento.processar_pagamento(1000.00, MetodoPagamento.CARTAO_PARCELADO, 3,
+                                                 chave_idempotencia="p-1")
+        pagamento.taxa_juros = 0.10
+        repetido = pagamento.processar_pagamento(1000.00, MetodoPagamento.CARTAO_PARCELADO, 3,
+                                                 chave_idempotencia="p-1")
+
+        assert repetido is primeiro
+        assert pagamento.idempotencia.estatisticas()["acertos"] == 1
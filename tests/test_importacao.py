@@ -0,0 +1,165 @@
+# test_importacao.py - Testes da importação em massa do catálogo
+import json
+import time
+import pytest
+from src.ecommerce import Produto, SistemaEcommerce
+from src.importacao import em_lotes, validar_registro
+
+
+class TestImportacaoCatalogo:
+    """Testes de SistemaEcommerce.importar_produtos com CSV e JSONL"""
+
+    def setup_method(self):
+        """Configura sistema vazio"""
+        self.sistema = SistemaEcommerce()
+
+    def escrever(self, caminho, texto):
+        caminho.write_text(texto, encoding="utf-8")
+        return str(caminho)
+
+    def test_importar_csv(self, tmp_path):
+        """Linhas válidas de um CSV vão para o catálogo e os índices"""
+        caminho = self.escrever(tmp_path / "catalogo.csv", (
+            "id,nome,descricao,preco,quantidade_estoque,categoria\n"
+            "1,Notebook,Notebook Dell,2500.00,10,Eletrônicos\n"
+            "2,Mouse,Mouse sem fio,50.00,5,Eletrônicos\n"
+            "3,Livro,,80.00,3,Livros\n"
+        ))
+
+        relatorio = self.sistema.importar_produtos(caminho)
+
+        assert relatorio.importados == 3
+        assert relatorio.rejeitados == 0
+        assert self.sistema.obter_produto(1).obter_informacoes() == {
+            "id": 1, "nome": "Notebook", "descricao": "Notebook Dell",
+            "preco": 2500.00, "estoque": 10, "categoria": "Eletrônicos"
+        }
+        assert [p.id for p in self.sistema.buscar_por_categoria("Eletrônicos")] == [2, 1]
+        assert [p.id for p in self.sistema.buscar_produtos("mouse")] == [2]
+
+    def test_importar_jsonl_com_linhas_invalidas(self, tmp_path):
+        """Linhas inválidas são relatadas com o número da linha e não interrompem a carga"""
+        linhas = [
+            json.dumps({"id": 1, "nome": "Notebook", "descricao": "Dell", "preco": 2500, "estoque": 10,
+                        "categoria": "Eletrônicos"}),
+            "{não é json",
+            json.dumps({"id": 2, "nome": "Mouse", "preco": -1, "quantidade_estoque": 5, "categoria": "X"}),
+            json.dumps({"id": 3, "nome": "Teclado", "preco": 150, "quantidade_estoque": 2}),
+            "",
+            json.dumps({"id": "4", "nome": "Monitor", "preco": "800.5", "quantidade_estoque": "7",
+                        "categoria": "Eletrônicos"}),
+        ]
+        caminho = self.escrever(tmp_path / "catalogo.jsonl", "\n".join(linhas) + "\n")
+
+        relatorio = self.sistema.importar_produtos(caminho)
+
+        assert relatorio.importados == 2
+        assert relatorio.rejeitados == 3
+        assert [erro.numero_linha for erro in relatorio.erros] == [2, 3, 4]
+        assert "categoria" in relatorio.erros[2].mensagem
+        assert self.sistema.obter_produto(4).preco == 800.5
+        assert len(self.sistema.produtos) == 2
+
+    def test_id_repetido_substitui(self, tmp_path):
+        """Ids já existentes ou repetidos no arquivo substituem o produto"""
+        self.sistema.adicionar_produto(Produto(1, "Antigo", "Desc", 10.00, 1, "Velha"))
+        caminho = self.escrever(tmp_path / "catalogo.csv", (
+            "id,nome,descricao,preco,quantidade_estoque,categoria\n"
+            "1,Novo,Desc,20.00,2,Nova\n"
+            "2,Mouse,Desc,50.00,5,Nova\n"
+            "2,Mouse 2,Desc,60.00,5,Nova\n"
+        ))
+
+        self.sistema.importar_produtos(caminho, tamanho_lote=2)
+
+        assert len(self.sistema.produtos) == 2
+        assert self.sistema.obter_produto(1).nome == "Novo"
+        assert self.sistema.buscar_por_categoria("Velha") == []
+        assert [(p.id, p.preco) for p in self.sistema.buscar_por_categoria("Nova")] == [(1, 20.00), (2, 60.00)]
+
+    def test_valores_fora_de_64_bits_sao_rejeitados(self, tmp_path):
+        """Ids e estoques enormes viram linhas inválidas sem corromper o catálogo"""
+        caminho = self.escrever(tmp_path / "catalogo.csv", (
+            "id,nome,descricao,preco,quantidade_estoque,categoria\n"
+            "1,Notebook,,2500.00,10,Eletrônicos\n"
+            "99999999999999999999,Gigante,,1.00,1,Eletrônicos\n"
+            "2,Mouse,,50.00,99999999999999999999,Eletrônicos\n"
+            "3,Livro,,80.00,3,Livros\n"
+        ))
+
+        relatorio = self.sistema.importar_produtos(caminho)
+
+        assert (relatorio.importados, relatorio.rejeitados) == (2, 2)
+        assert "64 bits" in relatorio.erros[0].mensagem
+        assert {len(getattr(self.sistema.produtos, coluna)) for coluna in ("ids", "precos", "nomes")} == {2}
+        assert self.sistema.obter_produto(3).nome == "Livro"
+
+    def test_byte_invalido_no_meio_do_jsonl(self, tmp_path):
+        """Um byte que não é UTF-8 rejeita só a própria linha"""
+        caminho = tmp_path / "catalogo.jsonl"
+        registro = '{"id": %d, "nome": "Produto", "preco": 10, "quantidade_estoque": 1, "categoria": "C"}\n'
+        caminho.write_bytes((registro % 1).encode() + (registro % 2).encode()[:-3] + b"\xff}\n"
+                            + (registro % 3).encode())
+
+        relatorio = self.sistema.importar_produtos(str(caminho))
+
+        assert (relatorio.importados, relatorio.rejeitados) == (2, 1)
+        assert relatorio.erros[0].numero_linha == 2 and "UTF-8" in relatorio.erros[0].mensagem
+        assert sorted(self.sistema.produtos) == [1, 3]
+
+    def test_byte_invalido_e_erro_de_csv_no_meio_do_csv(self, tmp_path):
+        """UTF-8 inválido e linhas que o módulo csv recusa viram erros de linha, e a carga continua"""
+        caminho = tmp_path / "catalogo.csv"
+        caminho.write_bytes(
+            b"id,nome,descricao,preco,quantidade_estoque,categoria\n"
+            b"1,Notebook,,2500.00,10,Eletr\xc3\xb4nicos\n"
+            b"2,Mouse \xff,,50.00,5,Eletr\xc3\xb4nicos\n"
+            b"3,Teclado," + b"x" * 200_000 + b",150.00,2,Eletr\xc3\xb4nicos\n"
+            b"4,Livro,,80.00,3,Livros\n")
+
+        relatorio = self.sistema.importar_produtos(str(caminho))
+
+        assert (relatorio.importados, relatorio.rejeitados) == (2, 2)
+        assert [erro.numero_linha for erro in relatorio.erros] == [3, 4]
+        assert "UTF-8" in relatorio.erros[0].mensagem and "CSV" in relatorio.erros[1].mensagem
+        assert sorted(self.sistema.produtos) == [1, 4]
+        assert self.sistema.obter_produto(1).categoria == "Eletrônicos"
+
+    def test_formato_desconhecido(self, tmp_path):
+        """Formato inválido é rejeitado antes de ler o arquivo"""
+        with pytest.raises(ValueError):
+            self.sistema.importar_produtos(str(tmp_path / "x.xml"), formato="xml")
+
+    @pytest.mark.parametrize("registro", [
+        {"id": "abc", "nome": "X", "preco": 1, "quantidade_estoque": 1, "categoria": "C"},
+        {"id": 1.5, "nome": "X", "preco": 1, "quantidade_estoque": 1, "categoria": "C"},
+        {"id": 1, "nome": "X", "preco": "nan", "quantidade_estoque": 1, "categoria": "C"},
+        {"id": 1, "nome": "X", "preco": 1, "quantidade_estoque": -2, "categoria": "C"},
+        {"id": 1, "nome": "", "preco": 1, "quantidade_estoque": 1, "categoria": "C"},
+        {"id": 2 ** 63, "nome": "X", "preco": 1, "quantidade_estoque": 1, "categoria": "C"},
+        {"id": 1, "nome": "X", "preco": 1, "quantidade_estoque": "1" + "0" * 30, "categoria": "C"},
+    ])
+    def test_validacao_registros(self, registro):
+        """Registros com campos inválidos lançam ValueError"""
+        with pytest.raises(ValueError):
+            validar_registro(registro)
+
+    def test_em_lotes(self):
+        """Agrupamento preserva a ordem e o lote final parcial"""
+        assert list(em_lotes(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+    def test_desempenho_importacao(self, tmp_path):
+        """Importação em lote é mais rápida que adicionar produto a produto"""
+        caminho = tmp_path / "catalogo.csv"
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write("id,nome,descricao,preco,quantidade_estoque,categoria\n")
+            for i in range(20000):
+                arquivo.write(f"{i},Produto {i},Descrição {i},{10 + i % 500}.90,100,Categoria {i % 20}\n")
+
+        start_time = time.time()
+        relatorio = self.sistema.importar_produtos(str(caminho), tamanho_lote=5000)
+        tempo_importacao = time.time() - start_time
+
+        assert relatorio.importados == 20000
+        assert self.sistema.contar_por_categoria("Categoria 7") == 1000
+        assert tempo_importacao < 3.0
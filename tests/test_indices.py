@@ -0,0 +1,138 @@
+# test_indices.py - Testes dos índices secundários por categoria e preço
+import random
+import time
+import pytest
+from src import indices
+from src.ecommerce import Produto, SistemaEcommerce
+from src.indices import ListaPrecos
+
+
+class TestIndiceCategoriaPreco:
+    """Testes de buscar_por_categoria e do índice que a sustenta"""
+
+    def setup_method(self):
+        """Configura catálogo com duas categorias"""
+        self.sistema = SistemaEcommerce()
+        dados = [
+            (1, "Notebook", 2500.00, "Eletrônicos"),
+            (2, "Mouse", 50.00, "Eletrônicos"),
+            (3, "Teclado", 150.00, "Eletrônicos"),
+            (4, "Fone", 150.00, "Eletrônicos"),
+            (5, "Livro", 80.00, "Livros"),
+        ]
+        for id, nome, preco, categoria in dados:
+            self.sistema.adicionar_produto(Produto(id, nome, f"Desc {nome}", preco, 10, categoria))
+
+    def ids(self, produtos):
+        return [produto.id for produto in produtos]
+
+    def test_busca_por_categoria_ordenada_por_preco(self):
+        """Produtos da categoria vêm em ordem crescente de preço"""
+        produtos = self.sistema.buscar_por_categoria("Eletrônicos")
+        assert self.ids(produtos) == [2, 3, 4, 1]
+        assert self.sistema.buscar_por_categoria("Inexistente") == []
+
+    def test_busca_por_faixa_de_preco(self):
+        """Faixa de preço inclusiva nos dois extremos"""
+        assert self.ids(self.sistema.buscar_por_categoria("Eletrônicos", preco_max=200.00)) == [2, 3, 4]
+        assert self.ids(self.sistema.buscar_por_categoria("Eletrônicos", preco_min=150.00)) == [3, 4, 1]
+        assert self.ids(self.sistema.buscar_por_categoria("Eletrônicos", 100.00, 150.00)) == [3, 4]
+        assert self.sistema.contar_por_categoria("Eletrônicos", preco_max=200.00) == 3
+
+    def test_paginacao(self):
+        """inicio e limite paginam dentro da faixa"""
+        pagina1 = self.sistema.buscar_por_categoria("Eletrônicos", inicio=0, limite=2)
+        pagina2 = self.sistema.buscar_por_categoria("Eletrônicos", inicio=2, limite=2)
+        pagina3 = self.sistema.buscar_por_categoria("Eletrônicos", inicio=4, limite=2)
+        assert self.ids(pagina1) == [2, 3]
+        assert self.ids(pagina2) == [4, 1]
+        assert pagina3 == []
+        with pytest.raises(ValueError):
+            self.sistema.buscar_por_categoria("Eletrônicos", inicio=-1)
+
+    def test_indice_acompanha_mudanca_de_preco(self):
+        """Alterar o preço pelo Produto reposiciona a linha no índice"""
+        self.sistema.obter_produto(1).preco = 10.00
+        assert self.ids(self.sistema.buscar_por_categoria("Eletrônicos")) == [1, 2, 3, 4]
+
+    def test_indice_acompanha_substituicao_e_categoria(self):
+        """Substituir um produto pelo id ou mudar sua categoria move a linha de categoria"""
+        self.sistema.adicionar_produto(Produto(5, "Livro", "Desc", 90.00, 10, "Eletrônicos"))
+        assert self.sistema.buscar_por_categoria("Livros") == []
+        assert self.ids(self.sistema.buscar_por_categoria("Eletrônicos", 80.00, 100.00)) == [5]
+
+        self.sistema.obter_produto(2).categoria = "Acessórios"
+        assert self.ids(self.sistema.buscar_por_categoria("Acessórios")) == [2]
+        assert 2 not in self.ids(self.sistema.buscar_por_categoria("Eletrônicos"))
+
+    def test_desempenho_busca_categoria(self):
+        """Busca paginada em catálogo grande não percorre todos os produtos"""
+        sistema = SistemaEcommerce()
+        for i in range(20000):
+            sistema.produtos.inserir(i, f"Produto {i}", "Desc", float(i % 1000), 10, f"Categoria {i % 10}")
+
+        start_time = time.time()
+        for _ in range(1000):
+            pagina = sistema.buscar_por_categoria("Categoria 3", preco_max=200.00, inicio=20, limite=20)
+        tempo_busca = time.time() - start_time
+
+        assert len(pagina) == 20
+        assert all(produto.categoria == "Categoria 3" and produto.preco <= 200.00 for produto in pagina)
+        assert tempo_busca < 0.5
+
+
+class TestListaPrecos:
+    """Testes da lista em blocos contra uma lista ordenada simples"""
+
+    def setup_method(self):
+        """Configura lista vazia e a referência ordenada"""
+        self.lista = ListaPrecos()
+        self.referencia = []
+
+    def conferir(self, aleatorio):
+        pares = list(self.lista.percorrer())
+        assert pares == self.referencia and len(self.lista) == len(pares)
+        precos = [preco for preco, _ in pares]
+        preco_min, preco_max = sorted(aleatorio.choice(precos + [-1.0, 99.0]) for _ in range(2))
+        inicio, fim = self.lista.faixa(preco_min, preco_max)
+        assert [linha for _, linha in pares[inicio:fim]] == [
+            linha for preco, linha in pares if preco_min <= preco <= preco_max]
+        assert self.lista.fatia(inicio, fim) == [linha for _, linha in pares[inicio:fim]]
+        chave = aleatorio.choice(pares)
+        assert list(self.lista.percorrer(self.lista.apos(*chave))) == [par for par in pares if par > chave]
+
+    def test_operacoes_aleatorias_com_blocos_pequenos(self, monkeypatch):
+        """Inclusões e exclusões que dividem e esvaziam blocos mantêm a ordem e as posições"""
+        monkeypatch.setattr(indices, "TAMANHO_BLOCO", 4)
+        aleatorio = random.Random(7)
+        for linha in range(300):
+            preco = float(aleatorio.randrange(40))
+            self.lista.inserir(preco, linha)
+            self.referencia.append((preco, linha))
+            if aleatorio.random() < 0.3:
+                par = self.referencia.pop(aleatorio.randrange(len(self.referencia)))
+                self.lista.remover(*par)
+            self.referencia.sort()
+            if linha % 10 == 0 and self.referencia:
+                self.conferir(aleatorio)
+
+        assert len(self.lista._linhas) > 10
+        for par in list(self.referencia):
+            self.lista.remover(*par)
+        assert len(self.lista) == 0 and self.lista.faixa(None, None) == (0, 0)
+        assert list(self.lista.percorrer()) == []
+
+    def test_atualizacoes_unitarias_em_categoria_grande(self):
+        """Trocar o preço de um produto não desloca a categoria inteira"""
+        sistema = SistemaEcommerce()
+        sistema.produtos.inserir_lote((i, f"P{i}", "", float(i), 1, "Geral") for i in range(200_000))
+        sistema.buscar_por_categoria("Geral", limite=1)
+
+        start_time = time.time()
+        for i in range(0, 200_000, 20):
+            sistema.obter_produto(i).preco = float(200_000 - i)
+        tempo = time.time() - start_time
+
+        assert sistema.contar_por_categoria("Geral") == 200_000
+        assert [p.id for p in sistema.buscar_por_categoria("Geral", preco_max=1.0)] == [1]
+        assert tempo < 1.0
@@ -0,0 +1,166 @@
+# test_pagamentos.py - Testes do processamento de pagamentos em lote
+import pytest
+from src.ecommerce import Carrinho, FormaPagamento, MetodoPagamento, Produto, SistemaEcommerce, SistemaPagamento
+
+
+class TestPagamentosEmLote:
+    """Testes do lote colunar de pagamentos"""
+
+    def setup_method(self):
+        """Configura sistema de pagamento e um lote com todos os métodos"""
+        self.pagamento = SistemaPagamento()
+        self.valores = [100.00, 250.50, 999.99, 10.00]
+        self.metodos = [MetodoPagamento.PIX, MetodoPagamento.CARTAO_VISTA,
+                        MetodoPagamento.CARTAO_PARCELADO, MetodoPagamento.CARTAO_PARCELADO]
+        self.parcelas = [1, 1, 12, 3]
+
+    def test_igual_ao_processamento_individual(self):
+        """Cada linha aprovada tem os mesmos valores de processar_pagamento"""
+        lote = self.pagamento.processar_pagamentos(self.valores, self.metodos, self.parcelas)
+
+        assert len(lote) == 4
+        assert list(lote.aprovados) == [1, 1, 1, 1]
+        assert lote.erros == {}
+        for linha, argumentos in enumerate(zip(self.valores, self.metodos, self.parcelas)):
+            assert lote.resultado(linha) == self.pagamento.processar_pagamento(*argumentos)
+
+    def test_linhas_invalidas_nao_interrompem_o_lote(self):
+        """Parcelas fora da faixa e métodos desconhecidos são recusados linha a linha"""
+        lote = self.pagamento.processar_pagamentos([100.00, 100.00, 100.00],
+                                                   [MetodoPagamento.CARTAO_PARCELADO, "boleto", MetodoPagamento.PIX],
+                                                   [13, 1, 1])
+
+        assert list(lote.aprovados) == [0, 0, 1]
+        assert set(lote.erros) == {0, 1}
+        assert "parcelas" in lote.erros[0]
+        assert lote.resultado(0) is None
+        assert lote.valores_finais[0] == 0.0
+        assert lote.resultado(2) == {"valor_final": 90.00, "aprovado": True}
+
+    def test_totais_por_metodo(self):
+        """Linhas aprovadas são agrupadas por método"""
+        lote = self.pagamento.processar_pagamentos(self.valores, self.metodos, self.parcelas)
+        totais = lote.totais_por_metodo()
+
+        assert totais[MetodoPagamento.PIX] == (1, 90.00)
+        assert totais[MetodoPagamento.CARTAO_VISTA] == (1, 250.50)
+        assert totais[MetodoPagamento.CARTAO_PARCELADO][0] == 2
+
+    def test_parcelas_padrao_e_iteraveis(self):
+        """Sem coluna de parcelas todas usam 1; geradores também são aceitos"""
+        lote = self.pagamento.processar_pagamentos((v for v in [10.0, 20.0]), iter([MetodoPagamento.PIX] * 2))
+        assert list(lote.valores_finais) == [9.0, 18.0]
+        assert list(lote.valores_parcela) == [0.0, 0.0]
+
+    def test_colunas_de_tamanhos_diferentes(self):
+        """Colunas desalinhadas são um erro do lote inteiro"""
+        with pytest.raises(ValueError):
+            self.pagamento.processar_pagamentos([1.0, 2.0], [MetodoPagamento.PIX])
+
+
+class PagamentoBoleto(FormaPagamento):
+    """Forma de exemplo registrada fora do núcleo: boleto com tarifa fixa"""
+
+    metodo = "boleto"
+    tarifa = 3.50
+
+    def processar(self, valor, parcelas):
+        if parcelas != 1:
+            raise ValueError("Boleto não é parcelado")
+        return {"valor_final": valor + self.tarifa, "aprovado": True}
+
+    def regra_lote(self, parcelas):
+        return "Boleto não é processado em lote"
+
+
+class TestRegistroFormasPagamento:
+    """Testes do registro de formas de pagamento"""
+
+    def setup_method(self):
+        """Configura sistema de pagamento com as formas padrão"""
+        self.pagamento = SistemaPagamento()
+
+    def test_formas_padrao(self):
+        """Os três métodos vêm registrados e calculam como antes"""
+        assert set(self.pagamento.metodos) == set(MetodoPagamento)
+        assert self.pagamento.processar_pagamento(100.00, MetodoPagamento.PIX) == {"valor_final": 90.00,
+                                                                                  "aprovado": True}
+        resultado = self.pagamento.processar_pagamento(1000.00, MetodoPagamento.CARTAO_PARCELADO, 3)
+        assert resultado == {"valor_total": 1000.00 * (1 + 0.05 * 2), "valor_parcela": 1000.00 * (1 + 0.05 * 2) / 3,
+                             "parcelas": 3, "aprovado": True}
+
+    def test_metodo_desconhecido(self):
+        """Um método sem forma registrada é um erro, não um None silencioso"""
+        with pytest.raises(ValueError, match="Método de pagamento inválido"):
+            self.pagamento.processar_pagamento(100.00, "boleto")
+
+    def test_nova_forma_sem_alterar_o_sistema(self):
+        """Uma forma registrada passa a ser atendida por processar_pagamento"""
+        self.pagamento.registrar_forma(PagamentoBoleto())
+
+        assert self.pagamento.processar_pagamento(100.00, "boleto") == {"valor_final": 103.50, "aprovado": True}
+        with pytest.raises(ValueError):
+            self.pagamento.processar_pagamento(100.00, "boleto", 2)
+        assert self.pagamento.estatisticas()["boleto"] == {"processados": 1, "recusados": 1}
+
+        lote = self.pagamento.processar_pagamentos([10.0, 10.0], ["boleto", MetodoPagamento.PIX])
+        assert lote.erros == {0: "Boleto não é processado em lote"}
+
+    def test_forma_registrada_no_checkout(self):
+        """criar_pedido entrega à forma o total em float, como nos pagamentos avulsos"""
+        boleto = PagamentoBoleto()
+        sistema = SistemaEcommerce()
+        sistema.sistema_pagamento.registrar_forma(boleto)
+        sistema.adicionar_produto(Produto(1, "Caneta", "", 0.10, 100, "Papelaria"))
+        carrinho = Carrinho()
+        carrinho.adicionar_item(sistema.obter_produto(1), 3)
+
+        id_pedido = sistema.criar_pedido(carrinho, "boleto", "Rua A")
+
+        pedido = sistema.obter_pedido(id_pedido)
+        assert pedido.metodo_pagamento == "boleto" and pedido.valor_total == 0.30
+        assert boleto.processados == 1
+
+    def test_falhas_da_forma_contam_como_recusas(self):
+        """Exceções que não são ValueError também entram em recusados"""
+        class BoletoForaDoAr(PagamentoBoleto):
+            def processar(self, valor, parcelas):
+                raise ConnectionError("Banco emissor fora do ar")
+
+        self.pagamento.registrar_forma(BoletoForaDoAr())
+        with pytest.raises(ConnectionError):
+            self.pagamento.processar_pagamento(100.00, "boleto")
+        assert self.pagamento.forma("boleto").recusados == 1
+
+    def test_forma_sem_processar(self):
+        """processar é abstrato: uma forma que não o define não pode ser criada"""
+        class Incompleta(FormaPagamento):
+            metodo = "incompleta"
+
+        with pytest.raises(TypeError):
+            Incompleta()
+
+    def test_formas_padrao_da_classe(self):
+        """Formas acrescentadas em FORMAS_PADRAO valem para os sistemas criados depois"""
+        class SistemaComBoleto(SistemaPagamento):
+            FORMAS_PADRAO = SistemaPagamento.FORMAS_PADRAO + (PagamentoBoleto,)
+
+        assert "boleto" in SistemaComBoleto().metodos
+        assert "boleto" not in self.pagamento.metodos
+
+    def test_contadores_e_mudanca_de_taxas(self):
+        """Cada forma conta os próprios pagamentos e acompanha as taxas do sistema"""
+        self.pagamento.processar_pagamento(100.00, MetodoPagamento.CARTAO_PARCELADO, 2)
+        with pytest.raises(ValueError):
+            self.pagamento.processar_pagamento(100.00, MetodoPagamento.CARTAO_PARCELADO, 13)
+
+        self.pagamento.taxa_juros = 0.10
+        self.pagamento.desconto_pix = 0.20
+
+        forma = self.pagamento.forma(MetodoPagamento.CARTAO_PARCELADO)
+        assert (forma.processados, forma.recusados) == (1, 1)
+        assert self.pagamento.processar_pagamento(100.00, MetodoPagamento.CARTAO_PARCELADO, 2)["valor_total"] == \
+            100.00 * (1 + 0.10)
+        assert self.pagamento.processar_pagamento(100.00, MetodoPagamento.PIX)["valor_final"] == 80.00
+        lote = self.pagamento.processar_pagamentos([100.00], [MetodoPagamento.PIX])
+        assert lote.valores_finais[0] == 80.00
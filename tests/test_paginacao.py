@@ -0,0 +1,161 @@
+# test_paginacao.py - Testes da paginação por cursor de produtos e pedidos
+import time
+from datetime import datetime, timedelta
+import pytest
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, MetodoPagamento
+
+
+class TestPaginacaoProdutos:
+    """Testes de listar_produtos por id, por categoria e por preço"""
+
+    def setup_method(self):
+        """Configura catálogo com ids fora de ordem e duas categorias"""
+        self.sistema = SistemaEcommerce()
+        dados = [
+            (5, 300.00, "Eletrônicos"), (1, 100.00, "Livros"), (3, 100.00, "Eletrônicos"),
+            (2, 50.00, "Eletrônicos"), (4, 20.00, "Livros"),
+        ]
+        for id, preco, categoria in dados:
+            self.sistema.adicionar_produto(Produto(id, f"Produto {id}", "", preco, 10, categoria))
+
+    def todas_as_paginas(self, limite, **filtros):
+        paginas, cursor = [], None
+        while True:
+            pagina = self.sistema.listar_produtos(cursor, limite, **filtros)
+            paginas.append([produto.id for produto in pagina])
+            cursor = pagina.proximo_cursor
+            if cursor is None:
+                return paginas
+
+    def test_por_id(self):
+        """Páginas em ordem de id, e a última sem cursor"""
+        assert self.todas_as_paginas(2) == [[1, 2], [3, 4], [5]]
+        assert self.todas_as_paginas(5) == [[1, 2, 3, 4, 5]]
+
+    def test_por_preco_e_categoria(self):
+        """Ordem de preço global ou dentro da categoria, com empates por ordem de inclusão"""
+        assert self.todas_as_paginas(2, ordem="preco") == [[4, 2], [1, 3], [5]]
+        assert self.todas_as_paginas(2, ordem="preco", categoria="Eletrônicos") == [[2, 3], [5]]
+        assert self.todas_as_paginas(2, ordem="preco", categoria="Outra") == [[]]
+
+    def test_inclusoes_entre_paginas(self):
+        """Produtos incluídos durante a paginação não repetem nem pulam os demais"""
+        primeira = self.sistema.listar_produtos(limite=2)
+        self.sistema.adicionar_produto(Produto(0, "Antes", "", 1.00, 1, "Livros"))
+        self.sistema.adicionar_produto(Produto(9, "Depois", "", 1.00, 1, "Livros"))
+        segunda = self.sistema.listar_produtos(primeira.proximo_cursor, limite=10)
+
+        assert [p.id for p in segunda] == [3, 4, 5, 9]
+
+    def test_cursores_invalidos(self):
+        """Cursor de outra ordem, ordem desconhecida e limite inválido são rejeitados"""
+        cursor = self.sistema.listar_produtos(limite=1, ordem="preco").proximo_cursor
+        with pytest.raises(ValueError):
+            self.sistema.listar_produtos(cursor, ordem="id")
+        with pytest.raises(ValueError):
+            self.sistema.listar_produtos(ordem="nome")
+        with pytest.raises(ValueError):
+            self.sistema.listar_produtos(categoria="Livros")
+        with pytest.raises(ValueError):
+            self.sistema.listar_produtos(limite=0)
+
+    @pytest.mark.parametrize("ordem,cursor", [
+        ("preco", "preco:1.0"), ("preco", "preco:x:1"), ("preco", "preco:1.0:x"), ("preco", "preco:1.0:2:3"),
+        ("preco", "preco:nan:1"), ("preco", "preco:"), ("id", "id:"), ("id", "id:1:2"), ("id", "id:1.5"),
+    ])
+    def test_cursor_malformado(self, ordem, cursor):
+        """Campos faltando, sobrando ou que não convertem são sempre ValueError"""
+        with pytest.raises(ValueError):
+            self.sistema.listar_produtos(cursor, ordem=ordem)
+
+    def test_paginas_profundas(self):
+        """Uma página no fim do catálogo custa o mesmo que a primeira"""
+        sistema = SistemaEcommerce()
+        sistema.produtos.inserir_lote((i, f"P{i}", "", float(i % 100), 1, "Teste") for i in range(200000))
+        sistema.listar_produtos(limite=1)
+        sistema.listar_produtos(limite=1, ordem="preco")
+
+        start_time = time.time()
+        for _ in range(100):
+            fim = sistema.listar_produtos("id:199900", limite=50)
+            fundo = sistema.listar_produtos("preco:98.0:199000", limite=50, ordem="preco")
+        tempo = time.time() - start_time
+
+        assert [p.id for p in fim][:2] == [199901, 199902]
+        assert all(p.preco >= 98.0 for p in fundo)
+        assert tempo < 0.5
+
+
+class TestPaginacaoPedidos:
+    """Testes de listar_pedidos"""
+
+    def setup_method(self):
+        """Cria cinco pedidos"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Mouse", "", 50.00, 100, "Eletrônicos"))
+        self.ids = []
+        for _ in range(5):
+            carrinho = Carrinho()
+            carrinho.adicionar_item(self.sistema.obter_produto(1), 1)
+            self.ids.append(self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1"))
+
+    def carrinho_novo(self):
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.sistema.obter_produto(1), 1)
+        return carrinho
+
+    def test_pedidos_em_ordem_de_criacao(self):
+        """Páginas seguem a ordem de criação e pedidos novos entram no fim"""
+        primeira = self.sistema.listar_pedidos(limite=3)
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.sistema.obter_produto(1), 1)
+        novo = self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1")
+        segunda = self.sistema.listar_pedidos(primeira.proximo_cursor, limite=3)
+
+        assert [p.id_pedido for p in primeira] == self.ids[:3]
+        assert [p.id_pedido for p in segunda] == self.ids[3:] + [novo]
+        assert segunda.proximo_cursor is None
+
+    def test_pedidos_desde(self):
+        """`desde` começa no primeiro pedido criado a partir da data"""
+        data = self.sistema.obter_pedido(self.ids[2]).data_criacao
+        pagina = self.sistema.listar_pedidos(desde=data, limite=10)
+        assert [p.id_pedido for p in pagina][0] in self.ids[:3]
+        assert pagina.itens[-1].id_pedido == self.ids[-1]
+        assert len(self.sistema.listar_pedidos(desde=datetime.max)) == 0
+        assert len(self.sistema.pedidos) == 5
+
+    def test_pedidos_guardados_fora_da_ordem_de_criacao(self):
+        """Um pedido criado antes e pago depois entra na posição da sua data de criação"""
+        lento, rapido = (self.sistema._preparar_pedido(self.carrinho_novo(), MetodoPagamento.PIX, "Rua A")
+                         for _ in range(2))
+        self.sistema.pedidos[rapido.id_pedido] = rapido
+        primeira = self.sistema.listar_pedidos(limite=5)
+        self.sistema.pedidos[lento.id_pedido] = lento
+
+        ordem = [p.data_criacao for p in self.sistema.listar_pedidos(limite=10)]
+        assert ordem == sorted(ordem) and len(ordem) == 7
+        assert [p.id_pedido for p in self.sistema.listar_pedidos(desde=lento.data_criacao)] == [
+            lento.id_pedido, rapido.id_pedido]
+        assert [p.id_pedido for p in self.sistema.listar_pedidos(primeira.proximo_cursor)] == [
+            lento.id_pedido, rapido.id_pedido]
+
+    def test_remocoes_mantem_a_ordem(self):
+        """del, pop e update passam pela ordem de criação"""
+        pedidos = self.sistema.pedidos
+        del pedidos[self.ids[0]]
+        pedidos.pop(self.ids[1])
+        pedido = pedidos[self.ids[2]]
+        pedido.data_criacao += timedelta(days=1)
+        pedidos.update({self.ids[2]: pedido})
+
+        assert [p.id_pedido for p in self.sistema.listar_pedidos()] == self.ids[3:] + [self.ids[2]]
+        assert len(pedidos.ordem) == len(pedidos) == 3
+
+    def test_cursor_invalido(self):
+        """Cursores de pedido malformados são recusados"""
+        with pytest.raises(ValueError):
+            self.sistema.listar_pedidos("pedido:abc:1")
+        for cursor in ("pedido:1", "pedido:1:2:3", f"pedido:{10 ** 30}:1"):
+            with pytest.raises(ValueError):
+                self.sistema.listar_pedidos(cursor)
@@ -0,0 +1,128 @@
+# test_promocoes.py - Testes do motor de promoções e cupons
+import pytest
+from src.ecommerce import Carrinho, MetodoPagamento, Produto, SistemaEcommerce
+from src.promocoes import (Cupom, CupomInvalidoError, DescontoCategoria, LeveXPagueY, MotorPromocoes,
+                           PrecoPorQuantidade)
+
+
+class TestMotorPromocoes:
+    """Testes das regras compiladas por categoria"""
+
+    def setup_method(self):
+        """Configura produtos de três categorias"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Caderno", "", 10.00, 100, "Papelaria"))
+        self.sistema.adicionar_produto(Produto(2, "Café", "", 9.99, 100, "Mercado"))
+        self.sistema.adicionar_produto(Produto(3, "Cabo", "", 5.00, 100, "Eletrônicos"))
+        self.carrinho = Carrinho()
+
+    def adicionar(self, produto_id, quantidade):
+        self.carrinho.adicionar_item(self.sistema.obter_produto(produto_id), quantidade)
+
+    def test_desconto_por_categoria(self):
+        """O desconto vale só para a categoria e é arredondado para baixo"""
+        motor = MotorPromocoes([DescontoCategoria(0.15, "Mercado")])
+        self.adicionar(1, 1)
+        self.adicionar(2, 1)
+
+        precificacao = motor.precificar(self.carrinho)
+
+        assert precificacao.descontos_por_item == {2: 149}
+        assert precificacao.subtotal == 1999
+        assert precificacao.total == 1850
+
+    def test_faixas_por_quantidade(self):
+        """Vale a maior faixa atingida, e faixas piores que o desconto fixo são ignoradas"""
+        motor = MotorPromocoes([PrecoPorQuantidade({3: 0.05, 10: 0.20}, "Papelaria"),
+                                PrecoPorQuantidade({5: 0.02}, "Papelaria"),
+                                DescontoCategoria(0.03, "Papelaria")])
+        for quantidade, desconto in [(1, 30), (3, 150), (9, 450), (10, 2000), (50, 10000)]:
+            self.carrinho.limpar_carrinho()
+            self.adicionar(1, quantidade)
+            assert motor.precificar(self.carrinho).desconto_promocoes == desconto
+
+    def test_leve_x_pague_y(self):
+        """Cada grupo completo ganha as unidades grátis; vale o melhor par leve/pague"""
+        motor = MotorPromocoes([LeveXPagueY(3, 2, "Mercado"), LeveXPagueY(5, 3, "Mercado")])
+        self.adicionar(2, 7)  # 3x2: 2 grátis; 5x3: 2 grátis
+        assert motor.precificar(self.carrinho).desconto_promocoes == 2 * 999
+        self.carrinho.adicionar_item(self.sistema.obter_produto(2), 3)  # 10: 3 grátis x 4 grátis
+        assert motor.precificar(self.carrinho).desconto_promocoes == 4 * 999
+
+    def test_melhor_promocao_por_linha_sem_acumular(self):
+        """Regras gerais valem para todas as categorias, e cada linha leva só a melhor"""
+        motor = MotorPromocoes([DescontoCategoria(0.10), LeveXPagueY(2, 1, "Eletrônicos")])
+        self.adicionar(1, 2)
+        self.adicionar(3, 2)
+
+        precificacao = motor.precificar(self.carrinho)
+
+        assert precificacao.descontos_por_item == {1: 200, 3: 500}
+
+    def test_cupons(self):
+        """Cupons valem depois das promoções, respeitam mínimo e categoria e não passam do elegível"""
+        motor = MotorPromocoes([DescontoCategoria(0.10, "Papelaria"),
+                                Cupom("DEZ", percentual=0.10),
+                                Cupom("CAFE50", valor=50, categoria="Mercado"),
+                                Cupom("GRANDE", valor=5, minimo=100)])
+        self.adicionar(1, 5)  # 50,00 - 5,00 de promoção
+        self.adicionar(2, 2)  # 19,98
+
+        assert motor.precificar(self.carrinho, "DEZ").desconto_cupom == 649
+        assert motor.precificar(self.carrinho, "CAFE50").desconto_cupom == 1998
+        with pytest.raises(CupomInvalidoError):
+            motor.precificar(self.carrinho, "GRANDE")
+        with pytest.raises(CupomInvalidoError):
+            motor.precificar(self.carrinho, "NAOEXISTE")
+
+    def test_regras_novas_recompilam(self):
+        """Adicionar uma regra depois de precificar muda o próximo cálculo"""
+        motor = MotorPromocoes()
+        self.adicionar(3, 1)
+        assert motor.precificar(self.carrinho).total == 500
+        motor.adicionar(DescontoCategoria(0.5, "Eletrônicos"))
+        assert motor.precificar(self.carrinho).total == 250
+
+    @pytest.mark.parametrize("criar", [
+        lambda: DescontoCategoria(1.5),
+        lambda: LeveXPagueY(2, 2),
+        lambda: PrecoPorQuantidade({0: 0.1}),
+        lambda: Cupom("X", percentual=0.1, valor=5),
+    ])
+    def test_regras_invalidas(self, criar):
+        """Parâmetros fora do domínio são recusados"""
+        with pytest.raises(ValueError):
+            criar()
+
+
+class TestPromocoesNoCheckout:
+    """Testes da cotação e do pedido com promoções"""
+
+    def setup_method(self):
+        """Configura sistema com um produto em promoção"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Notebook", "", 1000.00, 10, "Eletrônicos"))
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_item(self.sistema.obter_produto(1), 2)
+
+    def test_sem_promocoes_o_total_nao_muda(self):
+        """Sem regras a cotação continua sobre o total do carrinho"""
+        assert self.sistema.cotar_checkout(self.carrinho).valor == 2000.00
+
+    def test_cotacao_e_pedido_com_desconto(self):
+        """A cotação e o pedido usam o total com promoções e cupom"""
+        self.sistema.promocoes.adicionar(DescontoCategoria(0.10, "Eletrônicos"))
+        self.sistema.promocoes.adicionar(Cupom("CEM", valor=100))
+
+        assert self.carrinho.calcular_total_promocional(self.sistema.promocoes) == 180000
+        cotacao = self.sistema.cotar_checkout(self.carrinho, "CEM")
+        assert cotacao.valor == 1700.00 and cotacao.pix == 1530.00
+
+        id_pedido = self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A", cupom="CEM")
+        assert self.sistema.obter_pedido(id_pedido).valor_total == 1700.00
+
+    def test_cupom_invalido_nao_cria_pedido(self):
+        """Um cupom inexistente interrompe o checkout antes do pagamento"""
+        with pytest.raises(CupomInvalidoError):
+            self.sistema.criar_pedido(self.carrinho, MetodoPagamento.PIX, "Rua A", cupom="NADA")
+        assert self.sistema.obter_produto(1).quantidade_estoque == 10
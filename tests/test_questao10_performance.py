@@ -3,12 +3,41 @@ import pytest
 import unittest
 import time
 import threading
+import tracemalloc
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.ecommerce import (
-    Produto, Carrinho, SistemaEcommerce, SistemaPagamento,
+    Produto, Carrinho, ItemCarrinho, Pedido, SistemaEcommerce, SistemaPagamento,
     MetodoPagamento, StatusPedido
 )
 
+
+class ProdutoLegado:
+    """Produto com __dict__, base de comparação dos objetos compactos"""
+    
+    def __init__(self, id, nome, descricao, preco, quantidade_estoque, categoria):
+        self.id = id
+        self.nome = nome
+        self.descricao = descricao
+        self.preco = preco
+        self.quantidade_estoque = quantidade_estoque
+        self.categoria = categoria
+
+
+class PedidoLegado:
+    """Pedido com __dict__, base de comparação dos objetos compactos"""
+    
+    def __init__(self, id_pedido, itens, metodo_pagamento, valor_total, endereco_entrega):
+        self.id_pedido = id_pedido
+        self.itens = itens
+        self.metodo_pagamento = metodo_pagamento
+        self.valor_total = valor_total
+        self.endereco_entrega = endereco_entrega
+        self.status = StatusPedido.PENDENTE
+        self.data_criacao = datetime.now()
+        self.data_pagamento = None
+        self.data_envio = None
+
 # ============= TESTES COM PYTEST =============
 
 class TestPerformancePytest:
@@ -78,6 +107,38 @@ class TestPerformancePytest:
         assert len(produtos) == 1000
         assert tempo_criacao < 0.5  # Criação deve ser muito rápida
     
+    @pytest.mark.parametrize("classe,criar,criar_legado,fator", [
+        # No Python 3.11 os atributos de um objeto com __dict__ ficam em linha até
+        # o __dict__ ser pedido, então o Produto com __slots__ fica do mesmo tamanho
+        (Produto, lambda i: Produto(i, "Produto", "Descrição", 50.0, 100, "Categoria"),
+         lambda i: ProdutoLegado(i, "Produto", "Descrição", 50.0, 100, "Categoria"), 1.05),
+        (ItemCarrinho, lambda i: ItemCarrinho(None, i), lambda i: {"produto": None, "quantidade": i}, 0.5),
+        (Pedido, lambda i: Pedido("id", {}, MetodoPagamento.PIX, 100.0, "Endereço"),
+         lambda i: PedidoLegado("id", {}, MetodoPagamento.PIX, 100.0, "Endereço"), 0.85),
+    ])
+    def test_memoria_e_vazao_objetos_compactos(self, classe, criar, criar_legado, fator):
+        """Compara bytes por objeto (tracemalloc) com o equivalente de __dict__ e mede a vazão de criação"""
+        num_objetos = 10000
+        
+        def medir(construir):
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            objetos = [construir(i) for i in range(num_objetos)]
+            bytes_por_objeto = (tracemalloc.get_traced_memory()[0] - base) / num_objetos
+            tracemalloc.stop()
+            return bytes_por_objeto, objetos
+        
+        bytes_legado, _ = medir(criar_legado)
+        bytes_por_objeto, _ = medir(criar)
+        start_time = time.time()
+        objetos = [criar(i) for i in range(num_objetos)]
+        tempo_criacao = time.time() - start_time
+        
+        assert "__slots__" in vars(classe)
+        assert len(objetos) == num_objetos
+        assert bytes_por_objeto <= bytes_legado * fator
+        assert tempo_criacao < 0.5
+    
     @pytest.mark.parametrize("num_produtos", [10, 50, 100, 200, 500])
     def test_performance_carrinho_escalonavel(self, num_produtos):
         """Testa se performance do carrinho escala bem com diferentes quantidades"""
@@ -101,6 +162,40 @@ class TestPerformancePytest:
         tempo_max_esperado = num_produtos * 0.001  # 1ms por produto
         assert tempo_total <= tempo_max_esperado
         assert len(carrinho.itens) == num_produtos
+    
+    @pytest.mark.parametrize("num_linhas", [500, 5000])
+    def test_total_incremental_carrinhos_grandes(self, num_linhas):
+        """Recalcular o total após cada alteração não deve varrer o carrinho inteiro"""
+        carrinho = Carrinho()
+        produtos = [
+            Produto(i, f"Produto {i}", f"Desc {i}", 10.0 + i % 7, 10000, "B2B")
+            for i in range(num_linhas)
+        ]
+        for produto in produtos:
+            carrinho.adicionar_item(produto, 2)
+        
+        def total_por_varredura():
+            return sum(item.produto.preco * item.quantidade for item in carrinho.itens.values())
+        
+        # Linha de base: o total recalculado varrendo todos os itens a cada operação
+        start_time = time.perf_counter()
+        for i in range(200):
+            total_por_varredura()
+        tempo_varredura = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        for i in range(200):
+            carrinho.adicionar_item(produtos[i], 1)
+            carrinho.calcular_valor_total()
+            carrinho.remover_item(i, 1)
+            carrinho.calcular_valor_total()
+        tempo_incremental = time.perf_counter() - start_time
+        
+        assert carrinho.calcular_valor_total() == total_por_varredura()
+        produtos[0].preco = 99.0
+        assert carrinho.calcular_valor_total() == total_por_varredura()
+        # 400 operações com total incremental custam menos que 200 varreduras
+        assert tempo_incremental < tempo_varredura
 
 # ============= TESTES COM UNITTEST =============
 
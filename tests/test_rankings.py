@@ -0,0 +1,81 @@
+# test_rankings.py - Testes dos rankings de estoque baixo e mais vendidos
+import time
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, MetodoPagamento
+from src.rankings import Ranking
+
+
+class TestRankings:
+    """Testes de produtos_com_estoque_baixo e mais_vendidos"""
+
+    def setup_method(self):
+        """Configura catálogo com estoques variados"""
+        self.sistema = SistemaEcommerce()
+        dados = [(1, "Notebook", 10), (2, "Mouse", 3), (3, "Teclado", 0), (4, "Monitor", 7), (5, "Fone", 3)]
+        for id, nome, estoque in dados:
+            self.sistema.adicionar_produto(Produto(id, nome, f"Desc {nome}", 100.00, estoque, "Eletrônicos"))
+
+    def ids(self, produtos):
+        return [produto.id for produto in produtos]
+
+    def comprar(self, quantidades):
+        carrinho = Carrinho()
+        for id, quantidade in quantidades.items():
+            carrinho.adicionar_item(self.sistema.obter_produto(id), quantidade)
+        return self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1")
+
+    def test_estoque_baixo_por_limiar_e_top_k(self):
+        """Consulta por limiar e pelos k menores estoques"""
+        assert self.ids(self.sistema.produtos_com_estoque_baixo(3)) == [3, 2, 5]
+        assert self.ids(self.sistema.produtos_com_estoque_baixo(maximo=None, limite=4)) == [3, 2, 5, 4]
+        assert self.ids(self.sistema.produtos_com_estoque_baixo(3, limite=2)) == [3, 2]
+
+    def test_estoque_baixo_acompanha_alteracoes(self):
+        """Vendas, reposições e cancelamentos reordenam o ranking"""
+        self.sistema.produtos_com_estoque_baixo()
+        id_pedido = self.comprar({1: 9})
+        self.sistema.obter_produto(3).quantidade_estoque = 20
+        self.sistema.adicionar_produto(Produto(6, "Cabo", "Cabo", 5.00, 2, "Acessórios"))
+
+        assert self.ids(self.sistema.produtos_com_estoque_baixo(3)) == [1, 6, 2, 5]
+
+        self.sistema.cancelar_pedido(id_pedido)
+        self.sistema.ajustar_estoques({2: 10})
+        assert self.ids(self.sistema.produtos_com_estoque_baixo(3)) == [6, 5]
+
+    def test_mais_vendidos(self):
+        """Pedidos somam unidades vendidas e cancelamentos as estornam"""
+        self.comprar({1: 2, 2: 1})
+        id_pedido = self.comprar({2: 2, 4: 5})
+
+        assert [(p.id, n) for p, n in self.sistema.mais_vendidos()] == [(4, 5), (2, 3), (1, 2)]
+        assert [p.id for p, _ in self.sistema.mais_vendidos(limite=1)] == [4]
+
+        self.sistema.cancelar_pedido(id_pedido)
+        assert [(p.id, n) for p, n in self.sistema.mais_vendidos()] == [(1, 2), (2, 1)]
+
+    def test_consultas_repetidas_nao_perdem_entradas(self):
+        """O heap devolve as entradas válidas após cada consulta"""
+        ranking = Ranking({0: 5, 1: 2, 2: 9}.get)
+        for linha, valor in ((0, 5), (1, 2), (2, 9), (1, 2)):
+            ranking.atualizar(linha, valor)
+
+        assert ranking.primeiros(2) == [(1, 2), (0, 5)]
+        assert ranking.primeiros() == [(1, 2), (0, 5), (2, 9)]
+        assert ranking.primeiros(ate=5) == [(1, 2), (0, 5)]
+
+    def test_performance_consultas(self):
+        """Atualizações e consultas não percorrem o catálogo"""
+        sistema = SistemaEcommerce()
+        sistema.produtos.inserir_lote((i, f"P{i}", "", 10.0, 100 + i % 1000, "Teste") for i in range(100000))
+        sistema.produtos_com_estoque_baixo()
+
+        start_time = time.time()
+        for i in range(0, 100000, 100):
+            sistema.obter_produto(i).atualizar_estoque(99)
+        for _ in range(100):
+            baixos = sistema.produtos_com_estoque_baixo(5, limite=20)
+        tempo = time.time() - start_time
+
+        assert len(baixos) == 20
+        assert all(produto.quantidade_estoque <= 5 for produto in baixos)
+        assert tempo < 0.5
@@ -0,0 +1,124 @@
+# test_reajuste.py - Testes de reajuste de preços e ajuste de estoques em massa
+import time
+import pytest
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, EstoqueInsuficienteError
+
+
+class TestReajusteEmMassa:
+    """Testes de reajustar_precos e ajustar_estoques"""
+
+    def setup_method(self):
+        """Configura catálogo com duas categorias e os índices já montados"""
+        self.sistema = SistemaEcommerce()
+        dados = [
+            (1, "Notebook", 2500.00, 10, "Eletrônicos"),
+            (2, "Mouse", 50.00, 5, "Eletrônicos"),
+            (3, "Teclado", 150.00, 8, "Eletrônicos"),
+            (4, "Livro", 80.00, 3, "Livros"),
+        ]
+        for id, nome, preco, estoque, categoria in dados:
+            self.sistema.adicionar_produto(Produto(id, nome, f"Desc {nome}", preco, estoque, categoria))
+        self.sistema.buscar_por_categoria("Eletrônicos")
+        self.sistema.buscar_produtos("mouse")
+
+    def precos(self):
+        return {id: self.sistema.obter_produto(id).preco for id in (1, 2, 3, 4)}
+
+    def test_desconto_por_categoria(self):
+        """10% de desconto só na categoria escolhida"""
+        assert self.sistema.reajustar_precos(0.9, categoria="Eletrônicos") == 3
+        assert self.precos() == {1: 2250.00, 2: 45.00, 3: 135.00, 4: 80.00}
+
+    def test_reajuste_geral_arredondado(self):
+        """Reajuste do catálogo inteiro, arredondado em centavos"""
+        self.sistema.reajustar_precos(1.05, acrescimo=0.333)
+        assert self.precos() == {1: 2625.33, 2: 52.83, 3: 157.83, 4: 84.33}
+
+    def test_reajuste_por_produtos(self):
+        """produto_ids restringe o reajuste, também combinado com a categoria"""
+        self.sistema.reajustar_precos(acrescimo=10, produto_ids=[2, 4])
+        assert self.precos() == {1: 2500.00, 2: 60.00, 3: 150.00, 4: 90.00}
+
+        assert self.sistema.reajustar_precos(2, categoria="Livros", produto_ids=[2, 4]) == 1
+        assert self.precos()[4] == 180.00
+
+        with pytest.raises(ValueError):
+            self.sistema.reajustar_precos(0.5, produto_ids=[99])
+
+    def test_preco_negativo_nao_grava_nada(self):
+        """Um resultado negativo cancela o reajuste inteiro"""
+        with pytest.raises(ValueError):
+            self.sistema.reajustar_precos(acrescimo=-60)
+        assert self.precos() == {1: 2500.00, 2: 50.00, 3: 150.00, 4: 80.00}
+
+    def test_indices_e_caches_acompanham(self):
+        """Índice de preço, cache JSON e totais de carrinho refletem o reajuste"""
+        import json
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.sistema.obter_produto(2), 2)
+        antes = self.sistema.obter_produto_json(2)
+
+        # Mouse passa a custar mais que o Teclado, que tem desconto
+        self.sistema.reajustar_precos(4, produto_ids=[2])
+        self.sistema.reajustar_precos(0.5, produto_ids=[3])
+
+        ids = [p.id for p in self.sistema.buscar_por_categoria("Eletrônicos", preco_max=199.99)]
+        assert ids == [3]
+        assert [p.id for p in self.sistema.buscar_por_categoria("Eletrônicos")] == [3, 2, 1]
+        assert json.loads(self.sistema.obter_produto_json(2))["preco"] == 200.00
+        assert self.sistema.obter_produto_json(2) != antes
+        assert carrinho.calcular_valor_total() == 400.00
+
+    def test_empates_formados_pelo_reajuste(self):
+        """Preços que ficam iguais após o arredondamento mantêm as linhas ordenadas"""
+        self.sistema.adicionar_produto(Produto(5, "Cabo", "Cabo", 50.004, 1, "Eletrônicos"))
+        self.sistema.adicionar_produto(Produto(6, "Hub", "Hub", 50.001, 1, "Eletrônicos"))
+        self.sistema.reajustar_precos(1.0, categoria="Eletrônicos")
+
+        assert [p.id for p in self.sistema.buscar_por_categoria("Eletrônicos", 50.00, 50.00)] == [2, 5, 6]
+        self.sistema.obter_produto(5).preco = 10.00
+        assert [p.id for p in self.sistema.buscar_por_categoria("Eletrônicos", 50.00, 50.00)] == [2, 6]
+
+    def test_ajuste_de_estoques(self):
+        """Deltas de estoque são aplicados de uma vez, tudo ou nada"""
+        assert self.sistema.ajustar_estoques({1: -4, 4: 7}) == 2
+        assert self.sistema.obter_produto(1).quantidade_estoque == 6
+        assert self.sistema.obter_produto(4).quantidade_estoque == 10
+
+        with pytest.raises(EstoqueInsuficienteError, match=r"\[2\]"):
+            self.sistema.ajustar_estoques({1: 1, 2: -6})
+        assert self.sistema.obter_produto(1).quantidade_estoque == 6
+
+        with pytest.raises(ValueError):
+            self.sistema.ajustar_estoques({99: 1})
+
+    @pytest.mark.parametrize("deltas,erro", [
+        ({1: 5, 2: 2.5}, TypeError),
+        ({1: 5, 2: 2 ** 63}, OverflowError),
+        ({1: 5, 2: "3"}, TypeError),
+    ])
+    def test_ajuste_invalido_nao_grava_nada(self, deltas, erro):
+        """Um delta inválido no meio do lote não deixa estoques gravados nem caches desatualizados"""
+        json_antes = self.sistema.obter_produto_json(1)
+        with pytest.raises(erro):
+            self.sistema.ajustar_estoques(deltas)
+
+        assert self.sistema.obter_produto(1).quantidade_estoque == 10
+        assert self.sistema.obter_produto(2).quantidade_estoque == 5
+        assert self.sistema.obter_produto_json(1) == json_antes
+
+        self.sistema.ajustar_estoques({1: 5})
+        assert b'"estoque": 15' in self.sistema.obter_produto_json(1)
+
+    def test_performance_reajuste_em_massa(self):
+        """Reajustar 100k produtos deve ser rápido"""
+        sistema = SistemaEcommerce()
+        sistema.produtos.inserir_lote((i, f"P{i}", "", 10.0 + i % 500, 1, "Teste") for i in range(100000))
+        sistema.buscar_por_categoria("Teste", limite=1)
+
+        start_time = time.time()
+        sistema.reajustar_precos(0.9)
+        tempo = time.time() - start_time
+
+        assert sistema.obter_produto(1).preco == 9.90
+        assert tempo < 1.0
@@ -0,0 +1,175 @@
+# test_reservas.py - Testes das reservas de estoque e da roda de temporizadores
+import time
+import pytest
+from src.ecommerce import (
+    Produto, Carrinho, SistemaEcommerce, MetodoPagamento, EstoqueInsuficienteError
+)
+from src.reservas import GerenciadorReservas, RodaTemporizadores
+from tests.conftest import RelogioFalso
+
+
+class TestRodaTemporizadores:
+    """Testes de agendamento, cancelamento e expiração na roda"""
+
+    def test_expira_no_tique_certo(self):
+        """Chaves expiram no primeiro avanço que alcança o prazo, inclusive após várias voltas"""
+        roda = RodaTemporizadores(resolucao=1.0, tamanho=8)
+        roda.agendar("curta", 3)
+        roda.agendar("longa", 20)
+
+        assert roda.avancar(2) == []
+        assert roda.avancar(3) == ["curta"]
+        assert roda.avancar(19) == []
+        assert roda.avancar(20) == ["longa"]
+        assert len(roda) == 0
+
+    def test_cancelar_e_reagendar(self):
+        """Cancelar tira a chave da roda e agendar de novo substitui o prazo"""
+        roda = RodaTemporizadores(resolucao=1.0, tamanho=8)
+        roda.agendar("a", 5)
+        roda.agendar("b", 5)
+        roda.cancelar("a")
+        roda.agendar("b", 12)
+
+        assert roda.avancar(10) == []
+        assert roda.avancar(12) == ["b"]
+
+    def test_pausa_longa(self):
+        """Um avanço que pula muitas voltas expira tudo que venceu e preserva o resto"""
+        roda = RodaTemporizadores(resolucao=1.0, tamanho=4)
+        for segundo in range(1, 30):
+            roda.agendar(segundo, segundo)
+
+        assert sorted(roda.avancar(17)) == list(range(1, 18))
+        assert sorted(roda.avancar(29)) == list(range(18, 30))
+
+
+class TestReservasEstoque:
+    """Testes de reservar_item e do consumo das reservas em criar_pedido"""
+
+    def setup_method(self):
+        """Configura produto com 5 unidades e reservas de 60 segundos"""
+        self.relogio = RelogioFalso()
+        self.sistema = SistemaEcommerce()
+        self.sistema.reservas = GerenciadorReservas(duracao=60, relogio=self.relogio)
+        self.produto = Produto(1, "Console", "Console em promoção", 2000.00, 5, "Games")
+        self.sistema.adicionar_produto(self.produto)
+
+    def test_reserva_bloqueia_outros_carrinhos(self):
+        """Unidades reservadas não podem ser prometidas a outro carrinho"""
+        primeiro, segundo = Carrinho(), Carrinho()
+        self.sistema.reservar_item(primeiro, self.produto, 4)
+
+        with pytest.raises(EstoqueInsuficienteError):
+            self.sistema.reservar_item(segundo, self.produto, 2)
+        assert segundo.itens == {}
+        assert self.sistema.reservas.disponivel(self.produto) == 1
+        assert self.produto.quantidade_estoque == 5
+
+    def test_carrinho_sem_reserva_nao_leva_unidades_reservadas(self):
+        """O checkout de quem não reservou falha antes do pagamento"""
+        self.sistema.reservar_item(Carrinho(), self.produto, 4)
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.produto, 2)
+
+        with pytest.raises(EstoqueInsuficienteError):
+            self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1")
+        assert self.produto.quantidade_estoque == 5
+
+    def test_pedido_consome_reservas(self):
+        """criar_pedido baixa o estoque e encerra as reservas do carrinho"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 2)
+        self.sistema.reservar_item(carrinho, self.produto, 2)
+        self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1")
+
+        assert self.produto.quantidade_estoque == 1
+        assert self.sistema.reservas.reservado(1) == 0
+        assert len(self.sistema.reservas) == 0
+
+    def test_reserva_expira(self):
+        """Sem renovação, a reserva expira e as unidades voltam a ficar livres"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 5)
+        self.relogio.agora = 59
+        assert self.sistema.reservas.disponivel(self.produto) == 0
+        self.relogio.agora = 61
+        assert self.sistema.reservas.disponivel(self.produto) == 5
+        assert self.sistema.reservas.reservas_de(carrinho) == {}
+
+    def test_renovacao_e_liberacao(self):
+        """Reservar de novo renova o prazo; liberar devolve as unidades"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 1)
+        self.relogio.agora = 50
+        self.sistema.reservar_item(carrinho, self.produto, 1)
+        self.relogio.agora = 100
+        assert self.sistema.reservas.reservas_de(carrinho) == {1: 2}
+
+        self.sistema.reservas.liberar(carrinho)
+        assert self.sistema.reservas.disponivel(self.produto) == 5
+
+    def test_liberacao_parcial(self):
+        """Liberar uma quantidade devolve só essas unidades; o resto segue reservado"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 3)
+        self.sistema.reservas.liberar(carrinho, 1, 2)
+        assert self.sistema.reservas.reservas_de(carrinho) == {1: 1}
+        assert self.sistema.reservas.disponivel(self.produto) == 4
+
+        self.sistema.reservas.liberar(carrinho, 1, 5)
+        assert self.sistema.reservas.reservas_de(carrinho) == {}
+        assert len(self.sistema.reservas) == 0
+
+    def test_liberar_quantidade_invalida(self):
+        """Liberar zero ou menos unidades é um erro, e não a liberação da linha inteira"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 2)
+        for quantidade in (0, -1):
+            with pytest.raises(ValueError):
+                self.sistema.reservas.liberar(carrinho, 1, quantidade)
+        assert self.sistema.reservas.reservas_de(carrinho) == {1: 2}
+
+    def test_remover_item_devolve_reserva(self):
+        """Remover unidades do carrinho devolve as reservadas além da nova quantidade da linha"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 3)
+
+        carrinho.remover_item(1, 1)
+        assert self.sistema.reservas.reservas_de(carrinho) == {1: 2}
+        assert self.sistema.reservas.disponivel(self.produto) == 3
+
+        carrinho.remover_item(1)
+        assert self.sistema.reservas.reservas_de(carrinho) == {}
+        assert self.sistema.reservas.disponivel(self.produto) == 5
+
+    def test_alteracoes_em_lote_e_limpeza_devolvem_reserva(self):
+        """Diminuir linhas em lote ou limpar o carrinho também devolve as unidades reservadas"""
+        carrinho = Carrinho()
+        self.sistema.reservar_item(carrinho, self.produto, 4)
+
+        carrinho.definir_quantidades({1: 1})
+        assert self.sistema.reservas.reservas_de(carrinho) == {1: 1}
+
+        carrinho.limpar_carrinho()
+        assert self.sistema.reservas.disponivel(self.produto) == 5
+
+    def test_milhares_de_reservas(self):
+        """Reservar e expirar milhares de itens custa O(1) por reserva"""
+        sistema = SistemaEcommerce()
+        sistema.reservas = GerenciadorReservas(duracao=900, relogio=self.relogio)
+        produtos = [Produto(i, f"P{i}", "", 10.0, 10, "Teste") for i in range(5000)]
+        for produto in produtos:
+            sistema.adicionar_produto(produto)
+
+        start_time = time.time()
+        carrinhos = [Carrinho() for _ in range(5000)]
+        for carrinho, produto in zip(carrinhos, produtos):
+            sistema.reservar_item(carrinho, produto, 3)
+        self.relogio.agora = 1000
+        livres = sistema.reservas.disponivel(produtos[0])
+        tempo = time.time() - start_time
+
+        assert livres == 10
+        assert len(sistema.reservas) == 0
+        assert tempo < 1.0
@@ -0,0 +1,80 @@
+# test_serializacao.py - Testes do cache de produtos codificados em JSON
+import json
+import pytest
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, MetodoPagamento
+from src.serializacao import CacheSerializacao, codificar_produto
+
+
+class TestCacheSerializacao:
+    """Testes de obter_produto_json, serializar_produtos e da invalidação do cache"""
+
+    def setup_method(self):
+        """Configura catálogo com dois produtos"""
+        self.sistema = SistemaEcommerce()
+        self.notebook = Produto(1, "Notebook", "Notebook Dell", 2500.00, 10, "Eletrônicos")
+        self.mouse = Produto(2, "Mouse", "Mouse óptico", 50.00, 5, "Eletrônicos")
+        self.sistema.adicionar_produto(self.notebook)
+        self.sistema.adicionar_produto(self.mouse)
+
+    def test_json_igual_a_obter_informacoes(self):
+        """O JSON codificado corresponde ao dict de obter_informacoes"""
+        codificado = self.sistema.obter_produto_json(2)
+
+        assert json.loads(codificado) == self.mouse.obter_informacoes()
+        assert "óptico".encode("utf-8") in codificado
+        assert self.sistema.obter_produto_json(99) is None
+
+    def test_entrada_reaproveitada(self):
+        """Leituras repetidas devolvem os mesmos bytes sem recodificar"""
+        primeiro = self.sistema.obter_produto_json(1)
+        assert self.sistema.obter_produto_json(1) is primeiro
+        assert len(self.sistema.serializacao) == 1
+
+    @pytest.mark.parametrize("atributo,valor", [
+        ("preco", 2200.00),
+        ("quantidade_estoque", 3),
+        ("nome", "Notebook Pro"),
+        ("descricao", "Notebook Dell i7"),
+        ("categoria", "Informática"),
+    ])
+    def test_alteracao_invalida_apenas_o_produto(self, atributo, valor):
+        """Mudar um campo descarta só a entrada do produto alterado"""
+        self.sistema.obter_produto_json(1)
+        mouse = self.sistema.obter_produto_json(2)
+
+        setattr(self.notebook, atributo, valor)
+
+        assert json.loads(self.sistema.obter_produto_json(1)) == self.notebook.obter_informacoes()
+        assert self.sistema.obter_produto_json(2) is mouse
+
+    def test_venda_e_substituicao_invalidam(self):
+        """Pedidos e a substituição do produto pelo mesmo id atualizam o JSON"""
+        self.sistema.obter_produto_json(1)
+        carrinho = Carrinho()
+        carrinho.adicionar_item(self.notebook, 2)
+        self.sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1")
+        assert json.loads(self.sistema.obter_produto_json(1))["estoque"] == 8
+
+        self.sistema.adicionar_produto(Produto(1, "Ultrabook", "Novo", 4000.00, 1, "Eletrônicos"))
+        assert json.loads(self.sistema.obter_produto_json(1))["nome"] == "Ultrabook"
+
+    def test_serializar_pagina(self):
+        """Uma página de produtos vira um array JSON na ordem recebida"""
+        avulso = Produto(3, "Cabo", "Cabo USB", 10.00, 1, "Acessórios")
+        pagina = self.sistema.buscar_por_categoria("Eletrônicos") + [avulso]
+
+        codificado = self.sistema.serializar_produtos(pagina)
+
+        assert json.loads(codificado) == [p.obter_informacoes() for p in pagina]
+        assert self.sistema.serializar_produtos([]) == b"[]"
+        assert codificar_produto(avulso) == self.sistema.serializacao.codificar(avulso)
+
+    def test_capacidade(self):
+        """Ao atingir a capacidade, as entradas mais antigas são descartadas"""
+        cache = CacheSerializacao(self.sistema.produtos, capacidade=1)
+        cache.codificar(self.notebook)
+        cache.codificar(self.mouse)
+        assert len(cache) == 1
+
+        with pytest.raises(ValueError):
+            CacheSerializacao(self.sistema.produtos, capacidade=0)
@@ -0,0 +1,219 @@
+# test_sessoes.py - Testes do registro de carrinhos por sessão
+import pytest
+from src.ecommerce import Carrinho, ItemCarrinho, Produto, SistemaEcommerce
+from src.sessoes import (CarrinhoInvalidoError, RegistroCarrinhos, desserializar_carrinho,
+                         serializar_carrinho)
+from tests.conftest import RelogioFalso
+
+
+class TestRegistroCarrinhos:
+    """Testes de despejo LRU, expiração por ociosidade e gravação em disco"""
+
+    def setup_method(self):
+        """Configura sistema com dois produtos e um relógio falso"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Mouse", "Mouse", 50.00, 100, "Eletrônicos"))
+        self.sistema.adicionar_produto(Produto(2, "Cabo", "Cabo", 10.00, 100, "Acessórios"))
+        self.relogio = RelogioFalso()
+
+    def registro(self, **opcoes):
+        return RegistroCarrinhos(self.sistema.obter_produto, relogio=self.relogio, **opcoes)
+
+    def test_mesma_sessao_mesmo_carrinho(self):
+        """Acessos repetidos devolvem o mesmo carrinho e contam acertos"""
+        registro = self.registro()
+        carrinho = registro.obter("a")
+        carrinho.adicionar_item(self.sistema.obter_produto(1), 2)
+
+        assert registro.obter("a") is carrinho
+        estatisticas = registro.estatisticas()
+        assert (estatisticas["acertos"], estatisticas["faltas"], estatisticas["linhas"]) == (1, 1, 1)
+
+    def test_despejo_lru_por_quantidade(self):
+        """Acima do limite, o carrinho usado há mais tempo sai"""
+        registro = self.registro(max_carrinhos=2)
+        registro.obter("a")
+        registro.obter("b")
+        registro.obter("a")
+        registro.obter("c")
+
+        assert "b" not in registro
+        assert "a" in registro and "c" in registro
+        assert registro.estatisticas()["despejados"] == 1
+
+    def test_despejo_por_linhas(self):
+        """O orçamento de linhas também provoca despejos"""
+        registro = self.registro(max_linhas=2)
+        carrinho = registro.obter("a")
+        carrinho.adicionar_itens([(self.sistema.obter_produto(1), 1), (self.sistema.obter_produto(2), 1)])
+        registro.obter("b").adicionar_item(self.sistema.obter_produto(1), 1)
+        registro.obter("a")
+        registro.obter("b")
+
+        assert "a" not in registro
+        assert registro.estatisticas()["linhas"] == 1
+
+    def test_expiracao_por_ociosidade(self):
+        """Carrinhos ociosos além do TTL expiram no próximo acesso ao registro"""
+        registro = self.registro(ttl_ocioso=60)
+        registro.obter("a")
+        self.relogio.agora = 50
+        registro.obter("b")
+        self.relogio.agora = 100
+        registro.obter("b")
+
+        assert "a" not in registro and "b" in registro
+        assert registro.estatisticas()["expirados"] == 1
+
+    def test_gravacao_em_disco_e_reidratacao(self, tmp_path):
+        """Carrinhos despejados voltam do disco com os mesmos itens e total"""
+        registro = self.registro(max_carrinhos=1, diretorio=str(tmp_path))
+        carrinho = registro.obter("a")
+        carrinho.adicionar_itens([(self.sistema.obter_produto(1), 2), (self.sistema.obter_produto(2), 3)])
+        registro.obter("b")
+        self.sistema.obter_produto(1).preco = 40.00
+
+        reidratado = registro.obter("a")
+
+        assert reidratado is not carrinho
+        assert {id: item.quantidade for id, item in reidratado.itens.items()} == {1: 2, 2: 3}
+        assert reidratado.calcular_valor_total() == 110.00
+        estatisticas = registro.estatisticas()
+        assert (estatisticas["gravados_em_disco"], estatisticas["reidratados"]) == (1, 1)
+
+    def test_descartar(self, tmp_path):
+        """descartar apaga o carrinho da memória e do disco"""
+        registro = self.registro(max_carrinhos=1, diretorio=str(tmp_path))
+        registro.obter("a").adicionar_item(self.sistema.obter_produto(1), 1)
+        registro.obter("b")
+        registro.descartar("a")
+        registro.descartar("b")
+
+        assert len(registro) == 0
+        assert registro.obter("a").itens == {}
+        assert list(tmp_path.iterdir()) == []
+
+    def test_mesclar_sessoes(self, tmp_path):
+        """O carrinho do visitante entra no da conta, mesmo vindo do disco, e a sessão de origem some"""
+        registro = self.registro(max_carrinhos=1, diretorio=str(tmp_path))
+        registro.obter("visitante").adicionar_item(self.sistema.obter_produto(1), 2)
+        registro.obter("conta").adicionar_item(self.sistema.obter_produto(1), 1)
+
+        carrinho = registro.mesclar_sessoes("visitante", "conta")
+
+        assert registro.obter("conta") is carrinho
+        assert carrinho.itens[1].quantidade == 3
+        assert "visitante" not in registro
+        assert list(tmp_path.iterdir()) == []
+        assert registro.estatisticas()["linhas"] == 1
+
+    def test_produto_fora_do_catalogo_descartado_na_reidratacao(self, tmp_path):
+        """Linhas de produtos fora do catálogo são descartadas ao voltar do disco, e o resto funciona"""
+        registro = self.registro(max_carrinhos=1, diretorio=str(tmp_path), existe=self.sistema.produtos.__contains__)
+        avulso = Produto(99, "Avulso", "Fora do catálogo", 5.00, 10, "Outros")
+        registro.obter("a").adicionar_itens([(self.sistema.obter_produto(1), 1), (avulso, 2)])
+        registro.obter("b")
+
+        reidratado = registro.obter("a")
+
+        assert reidratado.descartados == {99: 2}
+        assert list(reidratado.itens) == [1]
+        assert reidratado.calcular_valor_total() == 50.00
+        assert registro.estatisticas()["linhas_descartadas"] == 1
+
+    def test_arquivo_invalido_fica_em_disco(self, tmp_path):
+        """Um arquivo que não desserializa não é apagado antes da falha"""
+        registro = self.registro(max_carrinhos=1, diretorio=str(tmp_path))
+        registro.obter("a").adicionar_item(self.sistema.obter_produto(1), 1)
+        registro.obter("b")
+        (arquivo,) = tmp_path.iterdir()
+        arquivo.write_bytes(b"XX")
+
+        with pytest.raises(CarrinhoInvalidoError):
+            registro.obter("a")
+        assert arquivo.exists()
+
+    def test_parametros_invalidos(self):
+        """Limites e TTL precisam ser positivos"""
+        with pytest.raises(ValueError):
+            self.registro(max_carrinhos=0)
+        with pytest.raises(ValueError):
+            self.registro(ttl_ocioso=0)
+
+    def test_registro_do_sistema(self):
+        """SistemaEcommerce oferece um registro com os limites padrão"""
+        assert self.sistema.carrinhos.obter("x") is self.sistema.carrinhos.obter("x")
+
+
+class TestFormatoCarrinho:
+    """Testes do formato binário de carrinho e da reidratação sob demanda"""
+
+    def setup_method(self):
+        """Configura sistema com dois produtos e um carrinho com ambos"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(1, "Mouse", "Mouse", 50.00, 100, "Eletrônicos"))
+        self.sistema.adicionar_produto(Produto(2, "Cabo", "Cabo", 10.00, 100, "Acessórios"))
+        self.carrinho = Carrinho()
+        self.carrinho.adicionar_itens([(self.sistema.obter_produto(1), 2), (self.sistema.obter_produto(2), 3)])
+
+    def test_ida_e_volta(self):
+        """Ids, quantidades e total sobrevivem à serialização"""
+        restaurado = self.sistema.restaurar_carrinho(self.sistema.serializar_carrinho(self.carrinho))
+
+        assert {id: item.quantidade for id, item in restaurado.itens.items()} == {1: 2, 2: 3}
+        assert restaurado.calcular_valor_total() == 130.00
+        assert restaurado.itens[1]["produto"] == self.sistema.obter_produto(1)
+
+    def test_tamanho_compacto(self):
+        """Caso comum: 8 bytes de cabeçalho e 6 bytes por linha"""
+        assert len(serializar_carrinho(self.carrinho)) == 8 + 2 * 6
+
+    def test_valores_largos(self):
+        """Ids negativos ou grandes e quantidades altas usam colunas de 8 bytes"""
+        carrinho = Carrinho()
+        carrinho._restaurar({-1: ItemCarrinho(None, 70_000), 2 ** 40: ItemCarrinho(None, 1)})
+
+        restaurado = desserializar_carrinho(serializar_carrinho(carrinho), lambda produto_id: None)
+
+        assert {id: item.quantidade for id, item in restaurado.itens.items()} == {-1: 70_000, 2 ** 40: 1}
+
+    def test_produtos_buscados_sob_demanda(self):
+        """O catálogo só é consultado para as linhas usadas"""
+        consultados = []
+
+        def obter_produto(produto_id):
+            consultados.append(produto_id)
+            return self.sistema.obter_produto(produto_id)
+
+        restaurado = desserializar_carrinho(serializar_carrinho(self.carrinho), obter_produto)
+        restaurado.adicionar_item(self.sistema.obter_produto(2), 1)
+        serializar_carrinho(restaurado)
+        assert consultados == []
+
+        restaurado.itens[1].produto
+        restaurado.itens[1].produto
+        assert consultados == [1]
+
+    def test_produto_fora_do_catalogo(self):
+        """Uma linha cujo produto sumiu falha só quando o produto é usado"""
+        restaurado = desserializar_carrinho(serializar_carrinho(self.carrinho), lambda produto_id: None)
+
+        assert restaurado.itens[1].quantidade == 2
+        with pytest.raises(LookupError):
+            restaurado.calcular_valor_total()
+
+    def test_restaurar_descarta_produto_fora_do_catalogo(self):
+        """Pelo sistema, a linha de um produto fora do catálogo é relatada em vez de falhar a cada uso"""
+        self.carrinho.adicionar_item(Produto(99, "Avulso", "Fora do catálogo", 5.00, 10, "Outros"), 1)
+
+        restaurado = self.sistema.restaurar_carrinho(self.sistema.serializar_carrinho(self.carrinho))
+
+        assert restaurado.descartados == {99: 1}
+        assert restaurado.calcular_valor_total() == 130.00
+
+    @pytest.mark.parametrize("dados", [b"", b"XX\x01\x00\x00\x00\x00\x00", b"CR\x09\x00\x00\x00\x00\x00",
+                                       b"CR\x01\x00\x01\x00\x00\x00\x01"])
+    def test_dados_invalidos(self, dados):
+        """Mágico, versão ou tamanho errados são recusados"""
+        with pytest.raises(CarrinhoInvalidoError):
+            desserializar_carrinho(dados, self.sistema.obter_produto)
@@ -0,0 +1,97 @@
+# test_snapshot.py - Testes dos snapshots binários do catálogo
+import time
+import pytest
+from src.ecommerce import Produto, Carrinho, SistemaEcommerce, MetodoPagamento
+from src.snapshot import SnapshotInvalidoError, VERSAO
+
+
+class TestSnapshotCatalogo:
+    """Testes de salvar_snapshot e SistemaEcommerce.de_snapshot"""
+
+    def setup_method(self):
+        """Configura catálogo com produtos acentuados e ids fora de ordem"""
+        self.sistema = SistemaEcommerce()
+        self.sistema.adicionar_produto(Produto(30, "Câmera", "Câmera digital", 1200.00, 4, "Fotografia"))
+        self.sistema.adicionar_produto(Produto(10, "Notebook", "Notebook Dell", 2500.00, 10, "Eletrônicos"))
+        self.sistema.adicionar_produto(Produto(20, "Mouse", "", 50.00, 5, "Eletrônicos"))
+
+    def salvar(self, tmp_path):
+        caminho = str(tmp_path / "catalogo.snap")
+        self.sistema.salvar_snapshot(caminho)
+        return caminho
+
+    def test_snapshot_preserva_produtos(self, tmp_path):
+        """Produtos lidos do snapshot têm os mesmos dados do catálogo original"""
+        sistema = SistemaEcommerce.de_snapshot(self.salvar(tmp_path))
+
+        assert len(sistema.produtos) == 3
+        for id in (10, 20, 30):
+            assert sistema.obter_produto(id).obter_informacoes() == \
+                self.sistema.obter_produto(id).obter_informacoes()
+        assert sistema.obter_produto(99) is None
+        assert list(sistema.produtos) == [30, 10, 20]
+
+    def test_alteracoes_vao_para_sobreposicao(self, tmp_path):
+        """Vendas alteram só a camada em memória; o arquivo continua igual"""
+        caminho = self.salvar(tmp_path)
+        sistema = SistemaEcommerce.de_snapshot(caminho)
+
+        carrinho = Carrinho()
+        carrinho.adicionar_item(sistema.obter_produto(10), 3)
+        sistema.criar_pedido(carrinho, MetodoPagamento.PIX, "Rua A, 1")
+
+        assert sistema.obter_produto(10).quantidade_estoque == 7
+        assert SistemaEcommerce.de_snapshot(caminho).obter_produto(10).quantidade_estoque == 10
+
+    def test_produtos_novos_e_indices(self, tmp_path):
+        """Produtos adicionados depois da abertura convivem com os do arquivo"""
+        sistema = SistemaEcommerce.de_snapshot(self.salvar(tmp_path))
+        sistema.adicionar_produto(Produto(40, "Teclado", "Teclado mecânico", 150.00, 8, "Eletrônicos"))
+        sistema.adicionar_produto(Produto(20, "Mouse Gamer", "Mouse", 90.00, 5, "Eletrônicos"))
+
+        assert len(sistema.produtos) == 4
+        assert sistema.obter_produto(40).nome == "Teclado"
+        assert [p.id for p in sistema.buscar_por_categoria("Eletrônicos")] == [20, 40, 10]
+        assert [p.id for p in sistema.buscar_produtos("camera")] == [30]
+
+    def test_snapshot_de_snapshot(self, tmp_path):
+        """Um catálogo aberto de snapshot, com alterações, pode ser salvo de novo"""
+        sistema = SistemaEcommerce.de_snapshot(self.salvar(tmp_path))
+        sistema.obter_produto(30).preco = 999.00
+        caminho = str(tmp_path / "novo.snap")
+        sistema.salvar_snapshot(caminho)
+
+        assert SistemaEcommerce.de_snapshot(caminho).obter_produto(30).preco == 999.00
+
+    def test_arquivos_invalidos(self, tmp_path):
+        """Arquivos que não são snapshots, ou de outra versão, são rejeitados"""
+        caminho = tmp_path / "invalido.snap"
+        caminho.write_bytes(b"x" * 64)
+        with pytest.raises(SnapshotInvalidoError):
+            SistemaEcommerce.de_snapshot(str(caminho))
+
+        caminho.write_bytes(b"")
+        with pytest.raises(SnapshotInvalidoError):
+            SistemaEcommerce.de_snapshot(str(caminho))
+
+        dados = bytearray(open(self.salvar(tmp_path), "rb").read())
+        dados[8] = VERSAO + 1
+        caminho.write_bytes(bytes(dados))
+        with pytest.raises(SnapshotInvalidoError, match="Versão"):
+            SistemaEcommerce.de_snapshot(str(caminho))
+
+    def test_abertura_nao_depende_do_tamanho(self, tmp_path):
+        """Abrir o snapshot não percorre as linhas do catálogo"""
+        sistema = SistemaEcommerce()
+        for i in range(50000):
+            sistema.produtos.inserir(i, f"Produto {i}", "Desc", 10.0, 1, "Teste")
+        caminho = str(tmp_path / "grande.snap")
+        sistema.salvar_snapshot(caminho)
+
+        start_time = time.time()
+        aberto = SistemaEcommerce.de_snapshot(caminho)
+        produto = aberto.obter_produto(43210)
+        tempo_abertura = time.time() - start_time
+
+        assert produto.nome == "Produto 43210"
+        assert tempo_abertura < 0.05